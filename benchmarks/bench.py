@@ -0,0 +1,590 @@
+# bench.py
+# IL0373 驱动基准测试：同一组场景可在 CPython (il0373_sim 模拟面板 + 模拟 machine 模块) 和 MicroPython 上运行，
+# 结果以 JSON 输出，便于记录并比对每次性能改动的效果。
+#
+# CPython (在仓库根目录):
+#     python3 benchmarks/bench.py                       # 打印结果表
+#     python3 benchmarks/bench.py --json out.json       # 同时写出 JSON
+#     python3 benchmarks/bench.py --compare old.json    # 与之前的结果对比
+#     python3 benchmarks/bench.py --only cjk_100,update_mem --repeat 20
+#
+# 不依赖字体的场景同时在中文版 (il0373_cn) 和英文版 (il0373) 驱动上运行，英文版的结果名称带 "_en" 后缀；
+# --only 中写不带后缀的名称时两个驱动都运行。
+#
+# MicroPython (把 bench.py 与 il0373_cn.py、字体文件、config.py、main.py 一起上传到开发板；
+# 同时上传 il0373.py 和 fonts.py 才会测量英文版驱动):
+#     import bench
+#     bench.run(json_path="bench.json")               # 使用 config.py 中的引脚驱动真实屏幕
+#     bench.run(sim=True)                               # 另外上传 il0373_sim.py，只测量纯计算部分
+import gc
+import sys
+import time
+
+IS_MICROPYTHON = sys.implementation.name == "micropython"
+
+# 每个操作重复的默认次数，可由 --repeat 覆盖
+DEFAULT_REPEAT = 10
+
+# 100 个常用汉字，超过默认字形缓存 (2048 字节，约 85 个字形)，因此也会测到缓存未命中的路径
+CJK_100 = ("的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可也你"
+           "说年天气晴多云雨雪风温度湿压体感日出落周星期今明后早晚空质量东南西北小阴雷阵"
+           "雾霾沙尘")
+
+# OpenWeatherMap 当前天气接口的典型返回，用于渲染完整的天气钟画面
+SAMPLE_WEATHER = {
+    "name": "武汉",
+    "weather": [{"main": "Clouds", "description": "多云"}],
+    "main": {"temp": 23.4, "feels_like": 24.1, "humidity": 68, "pressure": 1012},
+    "wind": {"speed": 3.2},
+    "sys": {"sunrise": 1760652000, "sunset": 1760693400},
+}
+
+
+# --- 计时与内存统计 (兼容 CPython / MicroPython) ---
+
+if IS_MICROPYTHON:
+    def _ticks_us():
+        return time.ticks_us()
+
+    def _elapsed_us(start):
+        return time.ticks_diff(time.ticks_us(), start)
+
+    def _gc_collections():
+        return None # MicroPython 不提供回收次数统计
+
+    def _alloc_bytes(op):
+        # 关闭 GC 后 mem_alloc 的增量即为本次操作分配的全部字节 (包括已成为垃圾的临时对象)
+        gc.collect()
+        gc.disable()
+        try:
+            before = gc.mem_alloc()
+            op()
+            return gc.mem_alloc() - before
+        except MemoryError:
+            return None
+        finally:
+            gc.enable()
+
+    ALLOC_MODE = "mem_alloc"
+else:
+    import tracemalloc
+
+    def _ticks_us():
+        return time.perf_counter_ns()
+
+    def _elapsed_us(start):
+        return (time.perf_counter_ns() - start) / 1000
+
+    def _gc_collections():
+        return sum(stat["collections"] for stat in gc.get_stats())
+
+    def _alloc_bytes(op):
+        # CPython 无法统计累计分配量，这里记录操作期间 Python 对象占用的峰值增量
+        gc.collect()
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            op()
+            return tracemalloc.get_traced_memory()[1] - base
+        finally:
+            tracemalloc.stop()
+
+    ALLOC_MODE = "tracemalloc_peak"
+
+
+class _Quiet():
+    """CPython 上屏蔽驱动的 print 输出，避免终端 I/O 计入耗时"""
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _quiet():
+    if IS_MICROPYTHON:
+        return None
+    previous = sys.stdout
+    sys.stdout = _Quiet()
+    return previous
+
+
+def _restore(previous):
+    if previous is not None:
+        sys.stdout = previous
+
+
+# --- 测试环境 ---
+
+def _host_setup():
+    # 在 CPython 上准备模块搜索路径、模拟的 machine 模块以及 weather_dock/main.py 用到的网络模块
+    import os
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for sub in ("", "chinese", "weather_dock"):
+        path = os.path.join(root, sub)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    os.chdir(os.path.join(root, "chinese")) # 字体文件按相对路径加载
+    for name in ("urequests", "network", "ntptime"):
+        if name not in sys.modules:
+            sys.modules[name] = type(sys)(name)
+
+
+def _make_epd(sim, driver="cn"):
+    # driver 为 "cn" (il0373_cn，BMF 字体) 或 "en" (il0373，fonts.py 点阵字体)
+    if driver == "cn":
+        from il0373_cn import IL0373, Rotate, Color, LogLevel
+        options = {"font_index_in_ram": True}
+    else:
+        from il0373 import IL0373, Rotate, Color, LogLevel
+        options = {}
+    if sim:
+        from il0373_sim import SimPanel, install_machine
+        panel = SimPanel(keep_log=False)
+        install_machine(panel)
+        return IL0373(*panel.pins(), rotate=Rotate.ROTATE_0, bg_color=Color.WHITE, log_level=LogLevel.OFF,
+                      **options), panel
+
+    from machine import Pin, SPI
+    import config
+    spi = SPI(config.SPI_ID, baudrate=4_000_000, polarity=0, phase=0,
+              sck=Pin(config.SCK_PIN), mosi=Pin(config.MOSI_PIN))
+    epd = IL0373(spi, Pin(config.DC_PIN, Pin.OUT), Pin(config.BUSY_PIN, Pin.IN), Pin(config.CS_PIN, Pin.OUT),
+                 Pin(config.RES_PIN, Pin.OUT), rotate=Rotate.ROTATE_0, bg_color=Color.WHITE, log_level=LogLevel.OFF,
+                 **options)
+    return epd, None
+
+
+def _driver(epd):
+    # epd 所属的驱动模块，两个驱动通用的场景从这里取 Color 等定义
+    import il0373_cn
+    if isinstance(epd, il0373_cn.IL0373):
+        return il0373_cn
+    import il0373
+    return il0373
+
+
+# --- 场景 ---
+# 每个场景函数接收 epd，完成准备工作后返回 (op, 每次调用包含的操作数)；
+# 在两个驱动上都运行的场景通过 _driver(epd) 取常量，不能使用 BMF 字体相关的方法
+
+def _fill_screen(epd):
+    Color = _driver(epd).Color
+    colors = (Color.BLACK, Color.WHITE)
+    state = [0]
+
+    def op():
+        state[0] ^= 1
+        epd.clear(colors[state[0]])
+    return op, 1
+
+
+def _fill_rect(epd):
+    Color = _driver(epd).Color
+
+    def op():
+        epd.draw_rectangle(0, 0, epd.paint.width - 1, epd.paint.height - 1, Color.BLACK, filled=True)
+    return op, 1
+
+
+def _draw_line(epd):
+    Color = _driver(epd).Color
+    last = epd.paint.width - 1
+
+    def op():
+        for i in range(0, epd.paint.width, 8):
+            epd.draw_line(0, i, last, last - i, Color.BLACK)
+    return op, len(range(0, epd.paint.width, 8))
+
+
+def _draw_circle(epd):
+    Color = _driver(epd).Color
+
+    def op():
+        epd.draw_circle(76, 76, 60, Color.BLACK)
+    return op, 1
+
+
+def _draw_circle_filled(epd):
+    Color = _driver(epd).Color
+
+    def op():
+        epd.draw_circle(76, 76, 60, Color.BLACK, filled=True)
+    return op, 1
+
+
+def _cjk_100(epd):
+    from il0373_cn import Color
+    per_line = (epd.paint.width - 2) // (epd.font_width + 1)
+    lines = [CJK_100[i:i + per_line] for i in range(0, len(CJK_100), per_line)]
+
+    def op():
+        y = 0
+        for line in lines:
+            epd.show_string(line, 1, y, color=Color.BLACK)
+            y += epd.font_width + 2
+    return op, len(CJK_100)
+
+
+def _show_string_multiplier(multiplier):
+    def factory(epd):
+        from il0373_cn import Color
+        text = "12:34 晴"
+
+        def op():
+            epd.show_string(text, 2, 40, multiplier=multiplier, color=Color.BLACK)
+        return op, len(text)
+    return factory
+
+
+def _string_width(epd):
+    texts = ("2026-10-17", "周六", "体感: 24.1°C", "气压: 1012hPa", "12:34")
+
+    def op():
+        for text in texts:
+            epd.get_string_display_width(text)
+            epd.get_string_display_width(text, multiplier=2)
+    return op, len(texts) * 2
+
+
+def _clock_bold(epd):
+    # 旧的时钟绘制方式：2 倍放大，在 4 个 1 像素偏移上各画一次模拟加粗
+    from il0373_cn import Color
+
+    def op():
+        for dx, dy in ((0, 0), (0, 1), (1, 0), (1, 1)):
+            epd.show_string("12:34", 40 + dx, 33 + dy, multiplier=2, color=Color.BLACK)
+    return op, 1
+
+
+def _clock_atlas(epd):
+    from il0373_cn import Color, GlyphStyle
+    atlas = epd.glyph_atlas("0123456789:", 2, GlyphStyle.BOLD)
+
+    def op():
+        epd.show_glyphs(atlas, "12:34", 40, 33, Color.BLACK)
+    return op, 1
+
+
+def _icon_packed(epd):
+    # 16x16 打包图标放大 2 倍绘制 (天气图标的用法)
+    driver = _driver(epd)
+    Color = driver.Color
+    icon, width, _ = driver.pack_bitmap([[(r * c + r) & 1 for c in range(16)] for r in range(16)])
+
+    def op():
+        epd.show_bitmap(icon, 8, 60, multiplier=2, color=Color.BLACK, width=width)
+    return op, 1
+
+
+def _bench_path(name):
+    # 测试文件的路径：CPython 写到临时目录，开发板写到根目录
+    if IS_MICROPYTHON:
+        return name
+    import os
+    import tempfile
+    return os.path.join(tempfile.gettempdir(), name)
+
+
+def _write_pbm(width, height):
+    # 生成一张条纹 PBM 测试图片，返回路径
+    path = _bench_path("bench_img.pbm")
+    stride = (width + 7) // 8
+    with open(path, "wb") as f:
+        f.write(("P4\n%d %d\n" % (width, height)).encode())
+        for row in range(height):
+            f.write(bytes(((row * 7 + i) * 37) & 0xFF for i in range(stride)))
+    return path
+
+
+def _show_img(width, height, x_start, y_start):
+    def factory(epd):
+        path = _write_pbm(width, height)
+
+        def op():
+            epd.show_img(path, x_start, y_start)
+        return op, 1
+    return factory
+
+
+def _rotation(rotate):
+    def factory(epd):
+        driver = _driver(epd)
+        Color = driver.Color
+        epd.set_rotate(rotate)
+        # 英文版的点阵字体只有 ASCII 字符
+        text = "温度 23.4°C" if driver.__name__ == "il0373_cn" else "Temp 23.4 C"
+
+        def op():
+            epd.show_string(text, 4, 4, color=Color.BLACK)
+            epd.show_string("12:34", 20, 30, multiplier=2, color=Color.BLACK)
+            epd.draw_line(0, 70, epd.paint.width - 1, 90, Color.BLACK)
+            epd.draw_circle(110, 110, 25, Color.BLACK)
+            epd.draw_rectangle(10, 100, 60, 140, Color.BLACK, filled=True)
+        return op, 1
+    return factory
+
+
+def _update_mem(epd):
+    def op():
+        epd.update_mem()
+    return op, 1
+
+
+def _gray_icon(epd):
+    # 48x48 的 2bpp 灰度图标：拆分位平面并绘制到 GrayPaint
+    gray = epd.gray_paint()
+    data = bytes((i * 37) & 0xFF for i in range(12 * 48))
+
+    def op():
+        gray.show_gray(data, 48, 48, 20, 20)
+    return op, 1
+
+
+def _frame_file(epd):
+    # 随便画一帧并保存为快照
+    Color = _driver(epd).Color
+    epd.draw_circle(76, 76, 50, Color.BLACK, filled=True)
+    epd.show_string("12:34", 46, 64, multiplier=2, color=Color.WHITE)
+    path = _bench_path("bench_frame.epf")
+    epd.save_frame(path)
+    return path
+
+
+def _load_frame(epd):
+    path = _frame_file(epd)
+
+    def op():
+        epd.load_frame(path)
+    return op, 1
+
+
+def _show_frame(epd):
+    path = _frame_file(epd)
+
+    def op():
+        epd.show_frame(path)
+    return op, 1
+
+
+def _update_gray(epd):
+    Color = _driver(epd).Color
+    gray = epd.gray_paint()
+    gray.draw_rectangle(0, 0, 75, 151, Color.LIGHT_GRAY, filled=True)
+
+    def op():
+        epd.update_gray(gray)
+    return op, 1
+
+
+class _FixedTime():
+    """代替 main 模块中的 time，固定 localtime() 的返回值，保证每次渲染的内容一致"""
+    def __init__(self, fixed):
+        self._fixed = fixed
+
+    def localtime(self, *args):
+        return time.localtime(*args) if args else self._fixed
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def _weather_frame(epd):
+    import main
+    # 交替两个相邻的分钟，每次渲染都会像实际运行时一样产生一次时钟区域的局刷
+    minutes = (_FixedTime((2026, 10, 17, 12, 34, 56, 5, 290)), _FixedTime((2026, 10, 17, 12, 35, 56, 5, 290)))
+    state = [0]
+
+    def op():
+        state[0] ^= 1
+        main.time = minutes[state[0]]
+        try:
+            main.display_clock_and_weather(epd, SAMPLE_WEATHER)
+        finally:
+            main.time = time
+    return op, 1
+
+
+# (名称, 场景, 默认重复次数 (None 表示使用 DEFAULT_REPEAT), 是否也在英文版驱动上运行)
+SCENARIOS = [
+    ("fill_screen", _fill_screen, None, True),
+    ("fill_rect_full", _fill_rect, None, True),
+    ("draw_line", _draw_line, None, True),
+    ("draw_circle", _draw_circle, None, True),
+    ("draw_circle_filled", _draw_circle_filled, None, True),
+    ("cjk_100", _cjk_100, None, False),
+    ("show_string_x2", _show_string_multiplier(2), None, False),
+    ("show_string_x3", _show_string_multiplier(3), None, False),
+    ("string_width", _string_width, None, False),
+    ("clock_bold", _clock_bold, None, False),
+    ("clock_atlas", _clock_atlas, None, False),
+    ("icon_packed", _icon_packed, None, True),
+    ("show_img_bg", _show_img(152, 152, 0, 0), None, True), # 整屏背景，按字节整行复制
+    ("show_img_logo", _show_img(50, 30, 3, 5), None, True), # 未对齐的小图标，逐行经 show_packed
+    ("rotate_0", _rotation(0), None, True),
+    ("rotate_90", _rotation(1), None, True),
+    ("rotate_180", _rotation(2), None, True),
+    ("rotate_270", _rotation(3), None, True),
+    ("update_mem", _update_mem, None, True),
+    ("gray_icon", _gray_icon, None, True),
+    ("update_gray", _update_gray, 3, True), # 每次包含一次灰度全刷
+    ("load_frame", _load_frame, None, True),
+    ("show_frame", _show_frame, 3, True), # 每次包含一次全刷
+    ("weather_frame", _weather_frame, 3, False), # 每次包含一次局刷，在真实屏幕上约 0.5 秒
+]
+
+
+def _measure(op, repeat):
+    op() # 预热：加载字形、建立缓存等一次性开销不计入结果
+    gc.collect()
+    collections = _gc_collections()
+    start = _ticks_us()
+    for _ in range(repeat):
+        op()
+    elapsed = _elapsed_us(start)
+    if collections is not None:
+        collections = _gc_collections() - collections
+    return elapsed, collections, _alloc_bytes(op)
+
+
+def _run_scenario(results, name, factory, epd, count):
+    previous = _quiet()
+    try:
+        epd.set_rotate(0)
+        epd.clear(0xff)
+        epd.clear_update_records()
+        try:
+            op, ops = factory(epd)
+            elapsed, collections, alloc = _measure(op, count)
+        except ImportError as e: # 例如开发板上没有上传 main.py
+            results.append({"name": name, "skipped": str(e)})
+            return
+    finally:
+        _restore(previous)
+    results.append({
+        "name": name,
+        "repeat": count,
+        "ops": ops,
+        "us_per_op": round(elapsed / (count * ops), 2),
+        "us_per_call": round(elapsed / count, 2),
+        "alloc_bytes": alloc,
+        "gc_collections": collections,
+    })
+    records = epd.get_update_records()
+    if records:
+        # 场景中包含刷新时，附上最后一次刷新的各阶段耗时 (微秒)，区分控制器时间与驱动自身的时间
+        results[-1]["last_update"] = records[-1]
+
+
+def run(only=None, repeat=None, json_path=None, sim=None, verbose=True):
+    """运行基准测试并返回结果字典；only 为场景名称列表，repeat 覆盖所有场景的重复次数"""
+    if sim is None:
+        sim = not IS_MICROPYTHON
+    if not IS_MICROPYTHON:
+        import os
+        if json_path:
+            json_path = os.path.abspath(json_path) # _host_setup 会切换工作目录
+        _host_setup()
+
+    previous = _quiet()
+    try:
+        epd, panel = _make_epd(sim)
+        epd.init()
+        # 英文版驱动使用另一块 (模拟) 面板；开发板上没有 il0373.py / fonts.py 时其场景记为 skipped
+        try:
+            epd_en, panel_en = _make_epd(sim, "en")
+            epd_en.init()
+        except ImportError as e:
+            epd_en, panel_en = None, str(e)
+    finally:
+        _restore(previous)
+
+    results = []
+    for base_name, factory, default_repeat, on_en in SCENARIOS:
+        targets = [(base_name, epd)]
+        if on_en:
+            targets.append((base_name + "_en", epd_en))
+        for name, target in targets:
+            if only and name not in only and base_name not in only:
+                continue
+            if target is None:
+                results.append({"name": name, "skipped": panel_en})
+            else:
+                _run_scenario(results, name, factory, target, repeat or default_repeat or DEFAULT_REPEAT)
+            if verbose:
+                _print_result(results[-1])
+
+    report = {
+        "implementation": sys.implementation.name,
+        "version": ".".join(str(v) for v in sys.implementation.version[:3]),
+        "platform": sys.platform,
+        "backend": "sim" if sim else "hardware",
+        "alloc_mode": ALLOC_MODE,
+        "results": results,
+    }
+    if panel is not None:
+        report["panel"] = panel.summary()
+    if epd_en is not None and panel_en is not None:
+        report["panel_en"] = panel_en.summary()
+    if json_path:
+        import json
+        with open(json_path, "w") as f:
+            json.dump(report, f)
+    return report
+
+
+def _print_result(result):
+    if "skipped" in result:
+        print(f"{result['name']:<20} skipped: {result['skipped']}")
+        return
+    collections = result["gc_collections"]
+    print(f"{result['name']:<20} {result['us_per_op']:>12.2f} us/op {result['us_per_call']:>12.2f} us/call "
+          f"{str(result['alloc_bytes']):>8} B  gc {'-' if collections is None else collections}")
+
+
+def compare(old, new):
+    """按场景打印两份结果的 us/op 变化，负数表示变快"""
+    before = {r["name"]: r for r in old["results"] if "us_per_op" in r}
+    for result in new["results"]:
+        prev = before.get(result["name"])
+        if prev is None or "us_per_op" not in result or not prev["us_per_op"]:
+            continue
+        change = (result["us_per_op"] - prev["us_per_op"]) / prev["us_per_op"] * 100
+        print(f"{result['name']:<20} {prev['us_per_op']:>12.2f} -> {result['us_per_op']:>12.2f} us/op "
+              f"({change:+.1f}%)")
+
+
+def main(argv):
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="IL0373 driver benchmarks")
+    parser.add_argument("--only", help="comma separated scenario names")
+    parser.add_argument("--repeat", type=int, help="override the repeat count of every scenario")
+    parser.add_argument("--json", dest="json_path", help="write the report to this file ('-' for stdout)")
+    parser.add_argument("--compare", help="previous JSON report to compare against")
+    parser.add_argument("--list", action="store_true", help="list scenario names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, _, _, on_en in SCENARIOS:
+            print(name + " (+ _en)" if on_en else name)
+        return
+
+    import os
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+    only = args.only.split(",") if args.only else None
+    to_stdout = args.json_path == "-"
+    report = run(only=only, repeat=args.repeat, json_path=None if to_stdout else args.json_path,
+                 verbose=not to_stdout)
+    if to_stdout:
+        print(json.dumps(report, indent=2))
+    if compare_path:
+        with open(compare_path) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    if IS_MICROPYTHON:
+        run()
+    else:
+        main(sys.argv[1:])
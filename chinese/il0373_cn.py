@@ -1,7 +1,24 @@
 import time
-from machine import Pin, SPI
 from math import ceil
 import struct # For ufont's struct.pack
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ucollections import OrderedDict
+try:
+    from time import sleep_ms, ticks_ms, ticks_us, ticks_diff
+except ImportError: # CPython (il0373_sim 主机端模拟/基准测试)
+    def sleep_ms(ms):
+        time.sleep(ms / 1000)
+
+    def ticks_ms():
+        return time.perf_counter_ns() // 1000000
+
+    def ticks_us():
+        return time.perf_counter_ns() // 1000
+
+    def ticks_diff(end, start):
+        return end - start
 
 # ==============================================================================
 # Start of ufont.py content (Integrated into il0373.py)
@@ -14,50 +31,8 @@ def _bmf_bytes_to_int(byte):
         i = (i << 8) + _
     return i
 
-def _bmf_byte_to_bit(byte_arr, font_size):
-    """
-    将 BMF 字体文件中读取的字节数组转换为 2D 位图数组 (font_size x font_size)。
-    假设 BMF 字体数据是按行存储的，每行填充到最近的8位字节。
-    例如，12x12 字体，每行12像素，需要2个字节来存储 (2*8=16位)。
-    """
-    if not byte_arr:
-        return [[0 for _ in range(font_size)] for _ in range(font_size)] # Return empty bitmap
-
-    bitmap_2d = []
-    bytes_per_row = ceil(font_size / 8) # 每行需要的字节数 (例如 12px -> 2 bytes)
-    
-    for r_idx in range(font_size): # 遍历每一行
-        row_bits = []
-        # 从 byte_arr 中取出当前行对应的字节
-        # 假设 byte_arr 是连续的，总长度为 bytes_per_row * font_size
-        start_byte_idx = r_idx * bytes_per_row
-        
-        for b_idx in range(bytes_per_row): # 遍历当前行的每个字节
-            if start_byte_idx + b_idx < len(byte_arr):
-                current_byte = byte_arr[start_byte_idx + b_idx]
-            else:
-                current_byte = 0 # Prevent IndexError if byte_arr is too short
-
-            for i in range(7, -1, -1): # 从最高位开始，提取每个像素
-                if len(row_bits) < font_size: # 确保只提取 font_size 个像素
-                    row_bits.append((current_byte >> i) & 1)
-                else:
-                    break # Current row is full
-        bitmap_2d.append(row_bits)
-    
-    # Pad rows if they are shorter than font_size (shouldn't happen if logic is correct)
-    for row in bitmap_2d:
-        while len(row) < font_size:
-            row.append(0)
-
-    # Pad with empty rows if bitmap_2d has fewer than font_size rows
-    while len(bitmap_2d) < font_size:
-        bitmap_2d.append([0 for _ in range(font_size)])
-
-    return bitmap_2d
-
 class BMFont:
-    def __init__(self, font_file_path):
+    def __init__(self, font_file_path, cache_bytes=2048, index_in_ram=False):
         self.font_file_path = font_file_path
         self.font = None # Will be opened on first access
         self.bmf_info = None
@@ -66,6 +41,18 @@ class BMFont:
         self.start_bitmap = 0
         self.font_size = 0
         self.bitmap_size = 0
+        # 点阵 LRU 缓存：以码位为键，按点阵字节数计入 cache_bytes 预算，0 表示禁用缓存
+        self.cache_bytes = cache_bytes
+        self.cache_used = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+        # 可选：把码位索引表一次性读入内存 (6881 字约 13KB)，之后查找不再访问文件
+        self.index_in_ram = index_in_ram
+        self._index = None # 大端 2 字节码位序列 (memoryview)
+        self._dense_ranges = [] # [(first_code, last_code, first_index), ...] 连续码位段，O(1) 直接计算下标
+        # 字符墨迹度量表：码位 -> (左侧空白列数 << 8) | 墨迹宽度，首次用到时计算，之后测量无需解码点阵
+        self._metrics = {}
         self._load_font_info()
 
     def _load_font_info(self):
@@ -84,6 +71,8 @@ class BMFont:
             self.start_bitmap = _bmf_bytes_to_int(self.bmf_info[4:7])
             self.font_size = self.bmf_info[7]
             self.bitmap_size = self.bmf_info[8]
+            if self.index_in_ram:
+                self._load_index()
             self.font.seek(0) # Reset file pointer after reading info
         except Exception as e:
             if self.font:
@@ -91,10 +80,53 @@ class BMFont:
             self.font = None # Indicate font loading failed
             raise e
 
+    def _load_index(self, min_dense_run=32):
+        self.font.seek(0x10, 0)
+        self._index = memoryview(self.font.read(self.start_bitmap - 0x10))
+        index = self._index
+
+        # 找出长度不小于 min_dense_run 的连续码位段 (如 ASCII)，这些字符直接按偏移计算下标
+        self._dense_ranges = []
+        count = len(index) // 2
+        run_start = 0
+        run_code = (index[0] << 8) | index[1] if count else 0
+        prev_code = run_code
+        for i in range(1, count + 1):
+            code = (index[2 * i] << 8) | index[2 * i + 1] if i < count else -1
+            if code == prev_code + 1:
+                prev_code = code
+                continue
+            if i - run_start >= min_dense_run:
+                self._dense_ranges.append((run_code, prev_code, run_start))
+            run_start = i
+            run_code = prev_code = code
+
+    def _get_index_in_ram(self, word_code):
+        for first_code, last_code, first_index in self._dense_ranges:
+            if first_code <= word_code <= last_code:
+                return first_index + word_code - first_code
+
+        index = self._index
+        low = 0
+        high = len(index) // 2 - 1
+        while low <= high:
+            mid = (low + high) >> 1
+            target_code = (index[2 * mid] << 8) | index[2 * mid + 1]
+            if word_code == target_code:
+                return mid
+            elif word_code < target_code:
+                high = mid - 1
+            else:
+                low = mid + 1
+        return -1
+
     def _get_index(self, word):
         if not self.font: return -1 # Font not loaded
         
         word_code = ord(word)
+        if self._index is not None:
+            return self._get_index_in_ram(word_code)
+
         start = 0x10 # Start of index table
         end = self.start_bitmap - 2 # End of index table
         
@@ -126,39 +158,131 @@ class BMFont:
 
     def get_bitmap(self, word):
         """
-        获取点阵图 (字节列表)
+        获取点阵图 (字节序列)，优先从 LRU 缓存读取
+        :param word: 字
+        :return: 字节序列，如果失败则返回一个默认的问号点阵
+        """
+        code = ord(word)
+        cache = self._cache
+        bitmap = cache.get(code)
+        if bitmap is not None:
+            self.cache_hits += 1
+            # 重新插入，移到最近使用的一端 (MicroPython 的 OrderedDict 没有 move_to_end)
+            del cache[code]
+            cache[code] = bitmap
+            return bitmap
+
+        self.cache_misses += 1
+        bitmap = self._read_bitmap(word)
+        size = len(bitmap)
+        if size > self.cache_bytes:
+            return bitmap
+        while self.cache_used + size > self.cache_bytes:
+            oldest = next(iter(cache))
+            self.cache_used -= len(cache.pop(oldest))
+        cache[code] = bitmap
+        self.cache_used += size
+        return bitmap
+
+    def _measure_ink(self, bitmap):
+        # 直接在打包的行字节上计算墨迹范围，返回 (左侧空白列数, 墨迹宽度)，空白字符返回 (0, 0)
+        size = self.font_size
+        bytes_per_row = (size + 7) // 8
+        ink = 0
+        for offset in range(0, min(len(bitmap), size * bytes_per_row) - bytes_per_row + 1, bytes_per_row):
+            row = 0
+            for i in range(offset, offset + bytes_per_row):
+                row = (row << 8) | bitmap[i]
+            ink |= row
+        ink >>= bytes_per_row * 8 - size # 去掉每行末尾的填充位
+        if not ink:
+            return 0, 0
+
+        left = 0
+        while not (ink >> (size - 1 - left)) & 1:
+            left += 1
+        right = 0
+        while not (ink >> right) & 1:
+            right += 1
+        return left, size - left - right
+
+    def _get_metrics(self, word):
+        code = ord(word)
+        packed = self._metrics.get(code)
+        if packed is None:
+            left, width = self._measure_ink(self.get_bitmap(word))
+            packed = (left << 8) | width
+            self._metrics[code] = packed
+        return packed
+
+    def get_ink(self, word):
+        """
+        获取字符的墨迹范围
         :param word: 字
-        :return: 字节列表，如果失败则返回一个默认的问号点阵
+        :return: (左侧空白列数, 墨迹宽度)，空白字符返回 (0, 0)
         """
+        packed = self._get_metrics(word)
+        return packed >> 8, packed & 0xFF
+
+    def get_ink_width(self, word):
+        # 只返回墨迹宽度，用于测量字符串宽度，不创建元组
+        return self._get_metrics(word) & 0xFF
+
+    def cache_info(self):
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "entries": len(self._cache),
+            "used_bytes": self.cache_used,
+            "budget_bytes": self.cache_bytes,
+        }
+
+    def clear_cache(self):
+        self._cache = OrderedDict()
+        self.cache_used = 0
+        self._metrics = {}
+
+    def _read_bitmap(self, word):
         if not self.font:
             # Return a default "question mark" or empty bitmap
             # This is a placeholder for a 12x12 font, 12*12/8 = 18 bytes
-            return [0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00] # Empty or simple error
+            return bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]) # Empty or simple error
             
         index = self._get_index(word)
         if index == -1:
             # Default "question mark" bitmap for 12x12
             # This is a simplified 12x12 question mark
-            return [0x00, 0x00, 0x00, 0x00, 0x00, 0x00, # 6 bytes for top 4 rows
+            return bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, # 6 bytes for top 4 rows
                     0x0C, 0x03, 0x0C, 0x03, 0x0C, 0x03, # ? top
                     0x0C, 0x03, 0x00, 0x00, 0x00, 0x00, # ? bottom
-                    0x00, 0x00, 0x00, 0x00, 0x00, 0x00] # 6 bytes for bottom 4 rows
+                    0x00, 0x00, 0x00, 0x00, 0x00, 0x00]) # 6 bytes for bottom 4 rows
         
         self.font.seek(self.start_bitmap + index * self.bitmap_size, 0)
-        return list(self.font.read(self.bitmap_size)) # Return as list of integers for byte_to_bit
+        return self.font.read(self.bitmap_size)
 
 # ==============================================================================
 # End of ufont.py content
 # ==============================================================================
 
 
+def _import_asyncio():
+    # 只有 update_async() 才需要 asyncio，按需导入以免同步使用时占用内存
+    try:
+        import asyncio
+    except ImportError:
+        import uasyncio as asyncio
+    return asyncio
+
 class TimeoutError(Exception):
     def __init__(self, msg):
         super().__init__(msg)
         
 class Color():
-    BLACK = 0x00 # 对应缓冲区中的 1
-    WHITE = 0xff # 对应缓冲区中的 0
+    BLACK = 0x00 # 对应缓冲区中的 0 (面板极性)
+    WHITE = 0xff # 对应缓冲区中的 1 (面板极性)
+    # 4 级灰度，只用于 GrayPaint：低 2 位为灰度码 (11 白、10 浅灰、01 深灰、00 黑)，普通 Paint 中按白色处理
+    LIGHT_GRAY = 0xAA
+    DARK_GRAY = 0x55
     
 class Rotate():
     ROTATE_0 = 0
@@ -166,6 +290,23 @@ class Rotate():
     ROTATE_180 = 2
     ROTATE_270 = 3
 
+class LogLevel():
+    OFF = 0     # 不输出任何信息 (默认)
+    SUMMARY = 1 # 每次刷新输出一行各阶段耗时
+    VERBOSE = 2 # 输出每个步骤的调试信息
+
+class PowerPolicy():
+    ALWAYS_SLEEP = 0 # 每次刷新后关闭高压并深度睡眠，下次刷新需要复位并重新初始化
+    TIMEOUT = 1      # 刷新后只关闭高压，保留寄存器和 LUT；距上次刷新超过 sleep_after 秒后深度睡眠
+                     # (update_async() 会安排后台任务检查；只用同步 update() 时需要周期调用 sleep_if_idle())
+    UNTIL_IDLE = 2   # 与 TIMEOUT 相同，但 paint 上有尚未刷新的绘制时不算空闲：应用正在准备下一帧，
+                     # 控制器保持热启动状态，直到画面刷新之后再空闲 sleep_after 秒才深度睡眠
+
+class GlyphStyle():
+    NORMAL = 0
+    BOLD = 1    # 与在 (0,0) (1,0) (0,1) (1,1) 四个偏移各画一次相同，宽高各增加 1 像素
+    OUTLINE = 2 # 只保留字形外侧 1 像素的轮廓，宽高各增加 2 像素，向左上偏移 1 像素绘制
+
 class Screen():
     def __init__(self, width=152, height=152): # 默认值直接设为152x152
         self.width = width
@@ -179,64 +320,171 @@ class Screen():
         print(f"screen width bytes: {self.width_bytes}")
         print(f"screen height bytes: {self.height_bytes}")
 
+def _make_reverse_table():
+    table = bytearray(256)
+    for i in range(256):
+        r = 0
+        for b in range(8):
+            if i & (1 << b):
+                r |= 0x80 >> b
+        table[i] = r
+    return bytes(table)
+
+_REVERSE_TABLE = _make_reverse_table() # 字节位序翻转表，用于 180 度旋转时的行写入
+
+def _reverse_bits(bits, nbits):
+    # 翻转 nbits 位整数的位序
+    bits <<= (-nbits) & 7
+    r = 0
+    while nbits > 0:
+        r = (r << 8) | _REVERSE_TABLE[bits & 0xFF]
+        bits >>= 8
+        nbits -= 8
+    return r
+
+def _expand_bits(bits, nbits, multiplier):
+    # 按位展开：每一位重复 multiplier 次，用于位图放大
+    out = 0
+    block = (1 << multiplier) - 1
+    for i in range(nbits - 1, -1, -1):
+        out <<= multiplier
+        if (bits >> i) & 1:
+            out |= block
+    return out
+
 class Paint():
     def __init__(self, screen=Screen(), rotate=Rotate.ROTATE_0, bg_color=Color.WHITE): # 默认旋转0度
         self.screen = screen
-        self.img = bytearray(self.screen.width_bytes * self.screen.height_bytes)
-        self.rotate = rotate
+        self.img = bytearray(b'\xff' * (self.screen.width_bytes * self.screen.height_bytes)) # 初始为白色
         self.bg_color = bg_color
-        
-        # Paint对象的逻辑尺寸，用于绘图函数的坐标转换
-        if self.rotate == Rotate.ROTATE_0 or self.rotate == Rotate.ROTATE_180:
-            self.width = self.screen.width
-            self.height = self.screen.height
-        else: # ROTATE_90 or ROTATE_270
-            self.width = self.screen.height # 旋转后宽度变为原高度
-            self.height = self.screen.width # 旋转后高度变为原宽度
+        # 自上次 update() 以来被修改的物理区域 [x_start, y_start, x_end, y_end]，None 表示没有变化
+        self.dirty = None
+        # Paint对象的逻辑尺寸及坐标变换，用于绘图函数的坐标转换
+        self.set_rotate(rotate)
         
     def __repr__(self):
         self.screen.__repr__()
         print(f"rotate: {self.rotate}")
         print(f"background color: 0x{self.bg_color:02x}")
             
+    def set_rotate(self, rotate):
+        # 旋转只在这里解析一次：预先计算逻辑坐标到物理坐标的仿射变换
+        # px = px0 + x * px_dx + y * px_dy，py = py0 + x * py_dx + y * py_dy
+        self.rotate = rotate
+        w = self.screen.width
+        h = self.screen.height
+        if rotate == Rotate.ROTATE_90 or rotate == Rotate.ROTATE_270:
+            self.width = h # 旋转后宽度变为原高度
+            self.height = w # 旋转后高度变为原宽度
+        else:
+            self.width = w
+            self.height = h
+
+        if rotate == Rotate.ROTATE_90: # GxEPD case 1
+            self._xform = (w - 1, 0, -1, 0, 1, 0)
+        elif rotate == Rotate.ROTATE_180: # GxEPD case 2
+            self._xform = (w - 1, -1, 0, h - 1, 0, -1)
+        elif rotate == Rotate.ROTATE_270: # GxEPD case 3
+            self._xform = (0, 0, 1, h - 1, -1, 0)
+        else:
+            self._xform = (0, 1, 0, 0, 0, 1)
+
+        # 同一变换在缓冲区位地址空间中的形式：bit = origin + x * dx + y * dy，
+        # 字节地址为 bit >> 3，位掩码为 0x80 >> (bit & 7)
+        px0, px_dx, px_dy, py0, py_dx, py_dy = self._xform
+        row_bits = self.screen.width_bytes * 8
+        self._bit_origin = py0 * row_bits + px0
+        self._bit_dx = py_dx * row_bits + px_dx
+        self._bit_dy = py_dy * row_bits + px_dy
+
+    def _inside(self, x_start, y_start, x_end, y_end):
+        # 逻辑坐标矩形是否完全在画布内，完全在内时绘图循环可以跳过逐点裁剪
+        return (x_start >= 0 and y_start >= 0 and x_end < self.width and y_end < self.height
+                and x_start <= x_end and y_start <= y_end)
+
     def clear(self, color):
         self.bg_color = color
-        fill_byte = 0x00 if color == Color.WHITE else 0xFF
-        for i in range(len(self.img)):
+        # 缓冲区按面板极性存储：1 为白色，0 为黑色，可直接发送到 RAM 无需取反。
+        # 与绘图方法一致，只有 BLACK 是黑色，灰度颜色在 1 位画布上按白色处理
+        fill_byte = 0x00 if color == Color.BLACK else 0xFF
+        # 先填充第一行，再按 1、2、4... 行倍增复制，整屏只需少量切片赋值
+        row_bytes = self.screen.width_bytes
+        total = len(self.img)
+        mv = memoryview(self.img)
+        for i in range(row_bytes):
             self.img[i] = fill_byte
+        filled = row_bytes
+        while filled < total:
+            n = min(filled, total - filled)
+            mv[filled:filled + n] = mv[0:n]
+            filled += n
+        self.dirty = [0, 0, self.screen.width - 1, self.screen.height - 1]
     
+    def mark_dirty(self, x_start, y_start, x_end, y_end):
+        # 逻辑坐标矩形 (含端点) 裁剪并转换为物理坐标后并入脏区域
+        if x_start > x_end:
+            x_start, x_end = x_end, x_start
+        if y_start > y_end:
+            y_start, y_end = y_end, y_start
+        if x_start < 0:
+            x_start = 0
+        if y_start < 0:
+            y_start = 0
+        if x_end >= self.width:
+            x_end = self.width - 1
+        if y_end >= self.height:
+            y_end = self.height - 1
+        if x_start > x_end or y_start > y_end:
+            return
+
+        px0, py0 = self._convert_coor(x_start, y_start)
+        px1, py1 = self._convert_coor(x_end, y_end)
+        if px0 > px1:
+            px0, px1 = px1, px0
+        if py0 > py1:
+            py0, py1 = py1, py0
+
+        dirty = self.dirty
+        if dirty is None:
+            self.dirty = [px0, py0, px1, py1]
+            return
+        if px0 < dirty[0]:
+            dirty[0] = px0
+        if py0 < dirty[1]:
+            dirty[1] = py0
+        if px1 > dirty[2]:
+            dirty[2] = px1
+        if py1 > dirty[3]:
+            dirty[3] = py1
+
+    def reset_dirty(self):
+        self.dirty = None
+
     def _convert_coor(self, x_pos, y_pos):
+        # 确保坐标在 Paint 对象的逻辑尺寸内，逻辑坐标合法时变换后一定在物理屏幕内
         if x_pos < 0 or y_pos < 0 or x_pos >= self.width or y_pos >= self.height:
             return -1, -1 # Invalid coordinates
-
-        px, py = x_pos, y_pos
-        
-        if self.rotate == Rotate.ROTATE_0:
-            pass
-        elif self.rotate == Rotate.ROTATE_90:
-            px, py = self.screen.width - y_pos - 1, x_pos
-        elif self.rotate == Rotate.ROTATE_180:
-            px, py = self.screen.width - x_pos - 1, self.screen.height - y_pos - 1
-        elif self.rotate == Rotate.ROTATE_270:
-            px, py = y_pos, self.screen.height - x_pos - 1
-            
-        if px < 0 or py < 0 or px >= self.screen.width or py >= self.screen.height:
-            return -1, -1
-            
-        return px, py
+        px0, px_dx, px_dy, py0, py_dx, py_dy = self._xform
+        return px0 + x_pos * px_dx + y_pos * px_dy, py0 + x_pos * py_dx + y_pos * py_dy
     
     def draw_point(self, x_pos, y_pos, color=Color.BLACK):
-        px, py = self._convert_coor(x_pos, y_pos)
-        if px == -1 or py == -1:
+        self.mark_dirty(x_pos, y_pos, x_pos, y_pos)
+        self._draw_point(x_pos, y_pos, color)
+
+    def _draw_point(self, x_pos, y_pos, color=Color.BLACK):
+        # 不更新脏区域，由调用它的绘图函数统一标记
+        if x_pos < 0 or y_pos < 0 or x_pos >= self.width or y_pos >= self.height:
             return
-        
-        addr = px // 8 + py * self.screen.width_bytes
-        bit_mask = (1 << (7 - px % 8))
-        
+        self._plot(x_pos, y_pos, color)
+
+    def _plot(self, x_pos, y_pos, color):
+        # 不做裁剪，调用者需保证坐标在画布内
+        bit = self._bit_origin + x_pos * self._bit_dx + y_pos * self._bit_dy
+        # 缓冲区为面板极性：黑色清除对应位，白色设置对应位
         if color == Color.BLACK:
-            self.img[addr] |= bit_mask
+            self.img[bit >> 3] &= ~(0x80 >> (bit & 7))
         else:
-            self.img[addr] &= ~bit_mask
+            self.img[bit >> 3] |= 0x80 >> (bit & 7)
             
     def draw_line(self, x_start, y_start, x_end, y_end, color=Color.BLACK):
         dx = abs(x_end - x_start)
@@ -244,24 +492,101 @@ class Paint():
         sx = 1 if x_start < x_end else -1
         sy = 1 if y_start < y_end else -1
         err = dx - dy
+        self.mark_dirty(x_start, y_start, x_end, y_end)
+        if not self._inside(min(x_start, x_end), min(y_start, y_end), max(x_start, x_end), max(y_start, y_end)):
+            # 线段部分超出画布，逐点裁剪
+            while True:
+                self._draw_point(x_start, y_start, color)
+                if x_start == x_end and y_start == y_end:
+                    break
+                e2 = 2 * err
+                if e2 > -dy:
+                    err -= dy
+                    x_start += sx
+                if e2 < dx:
+                    err += dx
+                    y_start += sy
+            return
 
+        # 整条线都在画布内：直接在位地址空间中步进，不再逐点裁剪和转换坐标
+        img = self.img
+        black = color == Color.BLACK
+        bit = self._bit_origin + x_start * self._bit_dx + y_start * self._bit_dy
+        step_x = self._bit_dx * sx
+        step_y = self._bit_dy * sy
         while True:
-            self.draw_point(x_start, y_start, color)
+            if black:
+                img[bit >> 3] &= ~(0x80 >> (bit & 7))
+            else:
+                img[bit >> 3] |= 0x80 >> (bit & 7)
             if x_start == x_end and y_start == y_end:
                 break
             e2 = 2 * err
             if e2 > -dy:
                 err -= dy
                 x_start += sx
+                bit += step_x
             if e2 < dx:
                 err += dx
                 y_start += sy
+                bit += step_y
             
+    def _fill_span(self, py, px_start, px_end, color):
+        # 物理坐标的一段水平线 (含端点，需已裁剪)：中间整字节直接写入，两端字节用掩码
+        img = self.img
+        row = py * self.screen.width_bytes
+        col_start = row + (px_start >> 3)
+        col_end = row + (px_end >> 3)
+        left_mask = 0xFF >> (px_start & 7)
+        right_mask = (0xFF << (7 - (px_end & 7))) & 0xFF
+        if col_start == col_end:
+            left_mask &= right_mask
+
+        if color == Color.BLACK:
+            img[col_start] &= ~left_mask
+            if col_start == col_end:
+                return
+            for i in range(col_start + 1, col_end):
+                img[i] = 0x00
+            img[col_end] &= ~right_mask
+        else:
+            img[col_start] |= left_mask
+            if col_start == col_end:
+                return
+            for i in range(col_start + 1, col_end):
+                img[i] = 0xFF
+            img[col_end] |= right_mask
+
+    def _fill_rect(self, x_start, y_start, x_end, y_end, color):
+        # 逻辑坐标矩形 (含端点)：裁剪一次，转换为物理矩形后按行写入
+        if x_start > x_end:
+            x_start, x_end = x_end, x_start
+        if y_start > y_end:
+            y_start, y_end = y_end, y_start
+        if x_start < 0:
+            x_start = 0
+        if y_start < 0:
+            y_start = 0
+        if x_end >= self.width:
+            x_end = self.width - 1
+        if y_end >= self.height:
+            y_end = self.height - 1
+        if x_start > x_end or y_start > y_end:
+            return
+
+        px0, py0 = self._convert_coor(x_start, y_start)
+        px1, py1 = self._convert_coor(x_end, y_end)
+        if px0 > px1:
+            px0, px1 = px1, px0
+        if py0 > py1:
+            py0, py1 = py1, py0
+        for py in range(py0, py1 + 1):
+            self._fill_span(py, px0, px1, color)
+
     def draw_rectangle(self, x_start, y_start, x_end, y_end, color=Color.BLACK, filled=False):
         if filled:
-            for y in range(min(y_start, y_end), max(y_start, y_end) + 1):
-                for x in range(min(x_start, x_end), max(x_start, x_end) + 1):
-                    self.draw_point(x, y, color)
+            self.mark_dirty(x_start, y_start, x_end, y_end)
+            self._fill_rect(x_start, y_start, x_end, y_end, color)
         else:
             self.draw_line(x_start, y_start, x_start, y_end, color)
             self.draw_line(x_start, y_start, x_end, y_start, color)
@@ -272,22 +597,25 @@ class Paint():
         x = 0
         y = radius
         d = 3 - 2 * radius
+        self.mark_dirty(x_center - radius, y_center - radius, x_center + radius, y_center + radius)
+        # 整个圆在画布内时使用不裁剪的 _plot
+        plot = self._plot if self._inside(x_center - radius, y_center - radius, x_center + radius, y_center + radius) else self._draw_point
         
         while x <= y:
             if filled:
-                self.draw_line(x_center - x, y_center + y, x_center + x, y_center + y, color)
-                self.draw_line(x_center - x, y_center - y, x_center + x, y_center - y, color)
-                self.draw_line(x_center - y, y_center + x, x_center + y, y_center + x, color)
-                self.draw_line(x_center - y, y_center - x, x_center + y, y_center - x, color)
+                self._fill_rect(x_center - x, y_center + y, x_center + x, y_center + y, color)
+                self._fill_rect(x_center - x, y_center - y, x_center + x, y_center - y, color)
+                self._fill_rect(x_center - y, y_center + x, x_center + y, y_center + x, color)
+                self._fill_rect(x_center - y, y_center - x, x_center + y, y_center - x, color)
             else:
-                self.draw_point(x_center + x, y_center + y, color)
-                self.draw_point(x_center - x, y_center + y, color)
-                self.draw_point(x_center + x, y_center - y, color)
-                self.draw_point(x_center - x, y_center - y, color)
-                self.draw_point(x_center + y, y_center + x, color)
-                self.draw_point(x_center - y, y_center + x, color)
-                self.draw_point(x_center + y, y_center - x, color)
-                self.draw_point(x_center - y, y_center - x, color)
+                plot(x_center + x, y_center + y, color)
+                plot(x_center - x, y_center + y, color)
+                plot(x_center + x, y_center - y, color)
+                plot(x_center - x, y_center - y, color)
+                plot(x_center + y, y_center + x, color)
+                plot(x_center - y, y_center + x, color)
+                plot(x_center + y, y_center - x, color)
+                plot(x_center - y, y_center - x, color)
 
             if d < 0:
                 d = d + 4 * x + 6
@@ -306,19 +634,505 @@ class Paint():
         # This will be overridden by IL0373's BMF rendering
         pass # Not directly used by Paint anymore
             
-    def show_bitmap(self, bitmap, x_start, y_start, multiplier=1, color=Color.BLACK):
-        for r_idx, row in enumerate(bitmap):
-            for c_idx, pixel_val in enumerate(row):
-                if pixel_val == 1:
-                    if multiplier == 1:
-                        self.draw_point(x_start + c_idx, y_start + r_idx, color)
-                    else:
-                        for mr in range(multiplier):
-                            for mc in range(multiplier):
-                                self.draw_point(x_start + c_idx * multiplier + mc, y_start + r_idx * multiplier + mr, color)
+    def show_bitmap(self, bitmap, x_start, y_start, multiplier=1, color=Color.BLACK, width=None):
+        """
+        绘制位图，1 为墨迹，0 保持背景不变。bitmap 可以是按行打包的 1bpp 数据
+        (pack_bitmap() / load_pbm() 的结果，需要给出 width，高度由长度推算)，也可以是 0/1 二维列表。
+        列表会先打包，两种形式都由 show_packed 按字节写入。
+        """
+        if not bitmap:
+            return
+        if width is None:
+            bitmap, width, height = pack_bitmap(bitmap)
+        else:
+            height = len(bitmap) // ((width + 7) // 8)
+        self.show_packed(bitmap, width, height, x_start, y_start, multiplier, color)
     
+    def _blit_bits(self, bits, nbits, px, py, color):
+        # 物理坐标：把 nbits 位 (最高位在最左侧) 写到第 py 行 px 开始处，1 位画 color，0 位保持不变
+        if py < 0 or py >= self.screen.height or not bits:
+            return
+        if px < 0:
+            nbits += px
+            if nbits <= 0:
+                return
+            bits &= (1 << nbits) - 1
+            px = 0
+        overflow = px + nbits - self.screen.width
+        if overflow > 0:
+            bits >>= overflow
+            nbits -= overflow
+            if nbits <= 0:
+                return
+
+        # 左移到字节边界后从最右侧的字节开始逐字节写入
+        end = px + nbits
+        pad = (-end) & 7
+        bits <<= pad
+        img = self.img
+        i = py * self.screen.width_bytes + ((end + pad) >> 3) - 1
+        if color == Color.BLACK:
+            while bits:
+                b = bits & 0xFF
+                if b:
+                    img[i] &= ~b
+                bits >>= 8
+                i -= 1
+        else:
+            while bits:
+                img[i] |= bits & 0xFF
+                bits >>= 8
+                i -= 1
+
+    def _blit_row(self, bits, nbits, x_start, y_pos, color):
+        # 逻辑坐标的一行位图：0/180 度旋转时对应物理行，直接按字节写入；90/270 度时对应物理列，逐点写入
+        px_dx = self._xform[1]
+        if px_dx == 1:
+            self._blit_bits(bits, nbits, x_start, y_pos, color)
+        elif px_dx == -1:
+            self._blit_bits(_reverse_bits(bits, nbits), nbits,
+                            self.screen.width - x_start - nbits, self.screen.height - 1 - y_pos, color)
+        else:
+            x = x_start + nbits - 1
+            while bits:
+                if bits & 1:
+                    self._draw_point(x, y_pos, color)
+                bits >>= 1
+                x -= 1
+
+    def show_packed(self, data, width, height, x_start, y_start, multiplier=1, color=Color.BLACK, src_x=0, stride=None,
+                    invert=False):
+        """
+        绘制按行打包的 1bpp 位图 (每字节最高位在左，1 为墨迹，0 保持背景不变；invert 为 True 时反过来，0 为墨迹)。
+        每行占 stride 字节 (默认 ceil((src_x + width) / 8))，只绘制从第 src_x 列起的 width 列。
+        放大时按位展开，每次最多处理 16 位，避免在 MicroPython 中产生大整数。
+        """
+        if width <= 0 or height <= 0:
+            return
+        if stride is None:
+            stride = (src_x + width + 7) // 8
+        self.mark_dirty(x_start, y_start, x_start + width * multiplier - 1, y_start + height * multiplier - 1)
+
+        chunk = 16 // multiplier or 1
+        # 只处理落在画布内的源行
+        row_first = 0
+        if y_start < 0:
+            row_first = (-y_start) // multiplier
+        row_last = min(height, (self.height - y_start + multiplier - 1) // multiplier)
+        for row in range(row_first, row_last):
+            offset = row * stride
+            y = y_start + row * multiplier
+            for col in range(src_x, src_x + width, chunk):
+                n = min(chunk, src_x + width - col)
+                first = col >> 3
+                last = (col + n - 1) >> 3
+                bits = 0
+                for i in range(offset + first, offset + last + 1):
+                    bits = (bits << 8) | data[i]
+                bits = (bits >> ((last + 1) * 8 - col - n)) & ((1 << n) - 1)
+                if invert:
+                    bits ^= (1 << n) - 1
+                if not bits:
+                    continue
+                if multiplier > 1:
+                    bits = _expand_bits(bits, n, multiplier)
+                x = x_start + (col - src_x) * multiplier
+                for dy in range(multiplier):
+                    self._blit_row(bits, n * multiplier, x, y + dy, color)
+
+    def show_img(self, img_path, x_start, y_start):
+        """
+        从文件逐行解码 1 位 BMP 或二进制 PBM (P4) 图像，不透明地绘制到画布 (黑白像素都写入)。
+        只用一个行缓冲区，整张图片不进入内存，画布外的行不读取。
+        未旋转且 x_start 为 8 的倍数时整行按字节复制到帧缓冲，其余情况逐行交给 show_packed 处理旋转和裁剪。
+        """
+        with open(img_path, "rb") as f:
+            width, height, stride, top_down, invert = _read_img_header(f, img_path)
+            data_start = f.tell()
+            # 可见的图像行 [first, last)，图像第 r 行画在 y_start + r
+            first = max(0, -y_start)
+            last = min(height, self.height - y_start)
+            x_end = x_start + width - 1
+            if first >= last or x_start >= self.width or x_end < 0:
+                return
+            self.mark_dirty(x_start, y_start + first, x_end, y_start + last - 1)
+            # 文件中的行顺序：自上而下，或 (BMP 默认) 自下而上
+            if top_down:
+                f.seek(data_start + first * stride)
+                y = y_start + first
+                dy = 1
+            else:
+                f.seek(data_start + (height - last) * stride)
+                y = y_start + last - 1
+                dy = -1
+
+            buf = bytearray(stride)
+            fast = self._xform[1] == 1 and not (x_start & 7) # 0 度：逻辑行即物理行
+            if fast:
+                vx0 = max(0, x_start)
+                vx1 = min(self.width, x_end + 1)
+                src = (vx0 - x_start) >> 3
+                full = (vx1 - vx0) >> 3
+                tail = (vx1 - vx0) & 7
+                mask = (0xFF00 >> tail) & 0xFF # 最后一个不完整字节中属于图像的高位
+                row_bytes = self.screen.width_bytes
+                dst = vx0 >> 3
+                mv = memoryview(buf)
+                img = self.img
+            for _ in range(last - first):
+                if f.readinto(buf) < stride:
+                    raise TypeError("图像数据不完整: " + img_path)
+                if fast:
+                    d = y * row_bytes + dst
+                    img[d:d + full] = mv[src:src + full]
+                    if invert: # 1 位为黑色：复制后在帧缓冲中就地取反成 1 为白色，每行不分配新对象
+                        for i in range(d, d + full):
+                            img[i] ^= 0xFF
+                    if tail:
+                        b = buf[src + full] ^ 0xFF if invert else buf[src + full]
+                        img[d + full] = (img[d + full] & ~mask) | (b & mask)
+                else:
+                    # 白色像素和黑色像素各画一次，极性由 show_packed 按位处理，行缓冲区不需要改写
+                    self.show_packed(buf, width, 1, x_start, y, 1, Color.WHITE, invert=invert)
+                    self.show_packed(buf, width, 1, x_start, y, 1, Color.BLACK, invert=not invert)
+                y += dy
+
+def pack_bitmap(bitmap):
+    """
+    把 0/1 二维列表位图转换为按行打包的 1bpp 数据 (每字节最高位在左，与 Paint.img 相同，
+    每行 ceil(width / 8) 字节)，返回 (data, width, height)。16x16 的图标从 17 个列表变成 32 字节。
+    """
+    height = len(bitmap)
+    width = max(len(row) for row in bitmap) if height else 0
+    stride = (width + 7) // 8
+    data = bytearray(stride * height)
+    for r_idx, row in enumerate(bitmap):
+        offset = r_idx * stride
+        for c_idx, pixel_val in enumerate(row):
+            if pixel_val == 1:
+                data[offset + (c_idx >> 3)] |= 0x80 >> (c_idx & 7)
+    return bytes(data), width, height
+
+def _read_pbm_header(f, path):
+    # 读取 PBM 文件头，返回 (magic, width, height)，文件指针停在像素数据的第一个字节
+    fields = []
+    token = b""
+    while len(fields) < 3:
+        c = f.read(1)
+        if c == b"#": # 注释一直到行尾
+            while c and c != b"\n":
+                c = f.read(1)
+        if not c:
+            raise TypeError("PBM 文件头不完整: " + path)
+        if c in b" \t\r\n":
+            if token:
+                fields.append(token)
+                token = b""
+        else:
+            token += c
+    if fields[0] != b"P4" and fields[0] != b"P1":
+        raise TypeError("不是 PBM 文件: " + path)
+    return fields[0], int(fields[1]), int(fields[2])
+
+def load_pbm(path):
+    """
+    读取 PBM 图像 (P4 二进制或 P1 文本)，返回与 pack_bitmap() 相同的 (data, width, height)，1 为黑色墨迹。
+    P4 的像素数据本身就是按行打包、最高位在左的格式，直接读入即可。
+    """
+    with open(path, "rb") as f:
+        magic, width, height = _read_pbm_header(f, path)
+        stride = (width + 7) // 8
+        if magic == b"P4":
+            data = f.read(stride * height)
+            if len(data) < stride * height:
+                raise TypeError("PBM 像素数据不完整: " + path)
+            return data, width, height
+        data = bytearray(stride * height)
+        i = 0
+        while i < width * height:
+            c = f.read(1)
+            if not c:
+                raise TypeError("PBM 像素数据不完整: " + path)
+            if c == b"#":
+                while c and c != b"\n":
+                    c = f.read(1)
+            elif c == b"0" or c == b"1":
+                if c == b"1":
+                    row, col = divmod(i, width)
+                    data[row * stride + (col >> 3)] |= 0x80 >> (col & 7)
+                i += 1
+        return bytes(data), width, height
+
+def _read_img_header(f, path):
+    """
+    读取 show_img 支持的图像文件头，文件指针停在像素数据开头。
+    返回 (width, height, stride, top_down, invert)：stride 为文件中每行的字节数，
+    invert 为 True 时像素位 1 表示黑色，需要取反后才是帧缓冲的极性。
+    """
+    magic = f.read(2)
+    if magic == b"P4":
+        f.seek(0)
+        _, width, height = _read_pbm_header(f, path)
+        return width, height, (width + 7) // 8, True, True
+    if magic != b"BM":
+        raise TypeError("只支持 1 位 BMP 和二进制 PBM (P4): " + path)
+    hdr = f.read(52)
+    if len(hdr) < 52:
+        raise TypeError("BMP 文件头不完整: " + path)
+    offset = int.from_bytes(hdr[8:12], "little")
+    dib_size = int.from_bytes(hdr[12:16], "little")
+    width = int.from_bytes(hdr[16:20], "little")
+    height = int.from_bytes(hdr[20:24], "little")
+    bpp = int.from_bytes(hdr[26:28], "little")
+    compression = int.from_bytes(hdr[28:32], "little")
+    if dib_size < 40 or bpp != 1 or compression != 0:
+        raise TypeError("只支持未压缩的 1 位 BMP: " + path)
+    top_down = height >= 0x80000000 # 高度为负数表示自上而下存储
+    if top_down:
+        height = 0x100000000 - height
+    # 调色板 (B, G, R, 0)：位 1 对应的颜色比位 0 暗时取反
+    f.seek(14 + dib_size)
+    palette = f.read(8)
+    invert = sum(palette[4:7]) < sum(palette[0:3])
+    f.seek(offset)
+    return width, height, (width + 31) // 32 * 4, top_down, invert
+
+def _make_gray_split_table():
+    # 2bpp 字节 (4 个像素，最高两位在左) -> 高位平面的 4 位 << 4 | 低位平面的 4 位
+    table = bytearray(256)
+    for i in range(256):
+        hi = 0
+        lo = 0
+        for p in range(4):
+            code = (i >> (6 - 2 * p)) & 3
+            hi = (hi << 1) | (code >> 1)
+            lo = (lo << 1) | (code & 1)
+        table[i] = (hi << 4) | lo
+    return bytes(table)
+
+_GRAY_SPLIT_TABLE = _make_gray_split_table()
+
+def split_gray(data, width, height):
+    """
+    把按行打包的 2bpp 灰度位图 (每像素 2 位，最高位在左；11 白、10 浅灰、01 深灰、00 黑，
+    与 Color 灰度值的低 2 位相同) 拆成两个 1bpp 位平面 (hi, lo)，每行 ceil(width / 8) 字节。
+    查表每次处理 4 个像素；拆分结果可以缓存后反复交给 GrayPaint.show_planes 绘制。
+    """
+    src_stride = (width + 3) // 4
+    stride = (width + 7) // 8
+    hi = bytearray(stride * height)
+    lo = bytearray(stride * height)
+    table = _GRAY_SPLIT_TABLE
+    for row in range(height):
+        src = row * src_stride
+        dst = row * stride
+        for i in range(src_stride):
+            v = table[data[src + i]]
+            j = dst + (i >> 1)
+            if i & 1:
+                hi[j] |= v >> 4
+                lo[j] |= v & 0x0F
+            else:
+                hi[j] = v & 0xF0
+                lo[j] = (v & 0x0F) << 4
+    return hi, lo
+
+def _gray_planes(color):
+    # 灰度值的低 2 位即灰度码：高位决定 hi 平面的颜色，低位决定 lo 平面的颜色
+    return (Color.WHITE if color & 2 else Color.BLACK), (Color.WHITE if color & 1 else Color.BLACK)
+
+class GrayPaint():
+    """
+    4 级灰度画布。2 位灰度码按位平面存放在两个 Paint 中：hi 为高位、lo 为低位，
+    IL0373.update_gray() 把 hi 原样写入 RAM1 (0x10)、lo 写入 RAM2 (0x13)，上传时不需要任何打包。
+    绘图方法与 Paint 相同，颜色可以是 Color.WHITE / LIGHT_GRAY / DARK_GRAY / BLACK，每个图元在两个平面上各画一次。
+    """
+    def __init__(self, screen=Screen(), rotate=Rotate.ROTATE_0, bg_color=Color.WHITE):
+        self.screen = screen
+        self.hi = Paint(screen, rotate=rotate)
+        self.lo = Paint(screen, rotate=rotate)
+        self.set_rotate(rotate)
+        self.clear(bg_color)
+
+    def set_rotate(self, rotate):
+        self.rotate = rotate
+        self.hi.set_rotate(rotate)
+        self.lo.set_rotate(rotate)
+        self.width = self.hi.width
+        self.height = self.hi.height
+
+    def clear(self, color):
+        self.bg_color = color
+        hi, lo = _gray_planes(color)
+        self.hi.clear(hi)
+        self.lo.clear(lo)
+
+    def reset_dirty(self):
+        self.hi.reset_dirty()
+        self.lo.reset_dirty()
+
+    def draw_point(self, x_pos, y_pos, color=Color.BLACK):
+        hi, lo = _gray_planes(color)
+        self.hi.draw_point(x_pos, y_pos, hi)
+        self.lo.draw_point(x_pos, y_pos, lo)
+
+    def draw_line(self, x_start, y_start, x_end, y_end, color=Color.BLACK):
+        hi, lo = _gray_planes(color)
+        self.hi.draw_line(x_start, y_start, x_end, y_end, hi)
+        self.lo.draw_line(x_start, y_start, x_end, y_end, lo)
+
+    def draw_rectangle(self, x_start, y_start, x_end, y_end, color=Color.BLACK, filled=False):
+        hi, lo = _gray_planes(color)
+        self.hi.draw_rectangle(x_start, y_start, x_end, y_end, hi, filled)
+        self.lo.draw_rectangle(x_start, y_start, x_end, y_end, lo, filled)
+
+    def draw_circle(self, x_center, y_center, radius, color=Color.BLACK, filled=False):
+        hi, lo = _gray_planes(color)
+        self.hi.draw_circle(x_center, y_center, radius, hi, filled)
+        self.lo.draw_circle(x_center, y_center, radius, lo, filled)
+
+    def show_bitmap(self, bitmap, x_start, y_start, multiplier=1, color=Color.BLACK, width=None):
+        if bitmap and width is None: # 列表位图只打包一次
+            bitmap, width, _ = pack_bitmap(bitmap)
+        hi, lo = _gray_planes(color)
+        self.hi.show_bitmap(bitmap, x_start, y_start, multiplier, hi, width)
+        self.lo.show_bitmap(bitmap, x_start, y_start, multiplier, lo, width)
+
+    def show_packed(self, data, width, height, x_start, y_start, multiplier=1, color=Color.BLACK, src_x=0, stride=None,
+                    invert=False):
+        # 单色 1bpp 位图：1 位 (invert 时为 0 位) 画成 color，其余位保持不变
+        hi, lo = _gray_planes(color)
+        self.hi.show_packed(data, width, height, x_start, y_start, multiplier, hi, src_x, stride, invert)
+        self.lo.show_packed(data, width, height, x_start, y_start, multiplier, lo, src_x, stride, invert)
+
     def show_img(self, img_path, x_start, y_start):
-        raise NotImplementedError
+        # 黑白图像：两个平面都写入相同内容 (黑为 00，白为 11)
+        self.hi.show_img(img_path, x_start, y_start)
+        self.lo.show_img(img_path, x_start, y_start)
+
+    def show_planes(self, hi, lo, width, height, x_start, y_start, multiplier=1):
+        """
+        不透明地绘制 split_gray() 拆出的一对位平面：先把区域在两个平面上清零 (黑)，
+        再把各自平面中为 1 的位画成白色，整个过程按行成块写入，没有逐像素的 Python 循环。
+        """
+        x_end = x_start + width * multiplier - 1
+        y_end = y_start + height * multiplier - 1
+        for plane, bits in ((self.hi, hi), (self.lo, lo)):
+            plane.draw_rectangle(x_start, y_start, x_end, y_end, Color.BLACK, filled=True)
+            plane.show_packed(bits, width, height, x_start, y_start, multiplier, Color.WHITE)
+
+    def show_gray(self, data, width, height, x_start, y_start, multiplier=1):
+        # 绘制按行打包的 2bpp 灰度位图 (格式见 split_gray)
+        hi, lo = split_gray(data, width, height)
+        self.show_planes(hi, lo, width, height, x_start, y_start, multiplier)
+
+class GlyphAtlas():
+    """
+    预渲染字形图集：启动时把一组字符按 multiplier 倍放大并按 style 加粗或描边，
+    渲染成按行打包、字节对齐的 1bpp 位图。绘制时每个字符只需一次 Paint.show_packed 按行写入字节，
+    不再解码字体、放大或多次叠画；字符步进与 IL0373.show_string 相同，宽度可以直接互换。
+    不在图集中的字符第一次绘制时渲染并加入图集。
+    """
+    def __init__(self, font, chars="0123456789:°C%", multiplier=2, style=GlyphStyle.NORMAL):
+        self.font = font
+        self.multiplier = multiplier
+        self.style = style
+        grow = 1 if style == GlyphStyle.BOLD else 2 if style == GlyphStyle.OUTLINE else 0
+        self.height = font.font_size * multiplier + grow
+        self._glyphs = {}
+        for char in chars:
+            self._render(char)
+
+    def _render(self, char):
+        font = self.font
+        size = font.font_size
+        m = self.multiplier
+        bytes_per_row = (size + 7) // 8
+        min_x, ink = font.get_ink(char)
+        advance = ((ink or size // 2) + 1) * m # 与 show_string 的步进一致：内容宽度 + 1 像素间距，再放大
+
+        # 取出每行的墨迹位并按倍数放大，最高位在左
+        rows = []
+        if ink:
+            data = font.get_bitmap(char)
+            shift = bytes_per_row * 8 - min_x - ink
+            mask = (1 << ink) - 1
+            for row in range(min(size, len(data) // bytes_per_row)):
+                bits = 0
+                for i in range(row * bytes_per_row, (row + 1) * bytes_per_row):
+                    bits = (bits << 8) | data[i]
+                bits = (bits >> shift) & mask
+                if m > 1:
+                    bits = _expand_bits(bits, ink, m)
+                for _ in range(m):
+                    rows.append(bits)
+        width = ink * m
+        offset = 0
+
+        if rows and self.style == GlyphStyle.BOLD:
+            # 右移一列与下移一行的并集
+            wide = [(bits << 1) | bits for bits in rows]
+            rows = [wide[y] | (wide[y - 1] if y else 0) for y in range(len(wide))] + [wide[-1]]
+            width += 1
+        elif rows and self.style == GlyphStyle.OUTLINE:
+            # 3x3 膨胀后去掉字形本身，只剩外侧轮廓
+            wide = [(bits << 2) | (bits << 1) | bits for bits in rows]
+            count = len(rows)
+            outline = []
+            for y in range(count + 2):
+                grown = 0
+                for src in (y - 2, y - 1, y):
+                    if 0 <= src < count:
+                        grown |= wide[src]
+                if 1 <= y <= count:
+                    grown &= ~(rows[y - 1] << 1)
+                outline.append(grown)
+            rows = outline
+            width += 2
+            offset = -1
+
+        stride = (width + 7) // 8
+        packed = bytearray(stride * len(rows))
+        pad = stride * 8 - width
+        for y, bits in enumerate(rows):
+            bits <<= pad
+            base = y * stride
+            for i in range(stride):
+                packed[base + i] = (bits >> (8 * (stride - 1 - i))) & 0xFF
+        glyph = (packed, width, len(rows), offset, advance)
+        self._glyphs[char] = glyph
+        return glyph
+
+    def text_width(self, text):
+        # 与 IL0373.get_string_display_width(text, multiplier) 相同
+        glyphs = self._glyphs
+        width = 0
+        for char in text:
+            glyph = glyphs.get(char) or self._render(char)
+            width += glyph[4]
+        return width
+
+    def bounds(self, text, x_start, y_start):
+        # 绘制 text 实际可能占用的矩形 (含加粗或描边多出的像素)
+        if self.style == GlyphStyle.OUTLINE:
+            return (x_start - 1, y_start - 1, x_start + self.text_width(text), y_start + self.height - 2)
+        extra = 1 if self.style == GlyphStyle.BOLD else 0
+        return (x_start, y_start, x_start + self.text_width(text) - 1 + extra, y_start + self.height - 1)
+
+    def draw(self, paint, text, x_start, y_start, color=Color.BLACK):
+        """在 paint 上绘制 text，返回绘制的宽度 (步进之和)"""
+        glyphs = self._glyphs
+        x = x_start
+        for char in text:
+            glyph = glyphs.get(char) or self._render(char)
+            data, width, height, offset, advance = glyph
+            if width:
+                paint.show_packed(data, width, height, x + offset, y_start + offset, 1, color)
+            x += advance
+        return x - x_start
+
+    def size_bytes(self):
+        return sum(len(glyph[0]) for glyph in self._glyphs.values())
 
 # --- IL0373 LUTs (from GxGDEW0154T8.cpp) ---
 lut_20_vcomDC = bytearray([
@@ -372,9 +1186,127 @@ lut_24_bb = bytearray([
   0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
 ]) # 42 bytes
 
+# Partial screen update LUTs (from GxGDEW0154T8.cpp)
+# Only the first group of each LUT is used, the rest is zero padded to the full LUT length
+_T1 = 30 # charge balance pre-phase
+_T2 = 5  # optional extension
+_T3 = 30 # color change phase (b/w)
+_T4 = 5  # optional extension for one color
+
+lut_20_vcomDC_partial = bytearray([0x00, _T1, _T2, _T3, _T4, 0x01] + [0x00] * 38) # 44 bytes
+lut_21_ww_partial = bytearray([0x18, _T1, _T2, _T3, _T4, 0x01] + [0x00] * 36) # 42 bytes
+lut_22_bw_partial = bytearray([0x5A, _T1, _T2, _T3, _T4, 0x01] + [0x00] * 36) # 42 bytes
+lut_23_wb_partial = bytearray([0xA5, _T1, _T2, _T3, _T4, 0x01] + [0x00] * 36) # 42 bytes
+lut_24_bb_partial = bytearray([0x24, _T1, _T2, _T3, _T4, 0x01] + [0x00] * 36) # 42 bytes
+
+# 4 级灰度 LUT，改编自 Waveshare 4.2 寸 IL0398/IL0373 系列的 4Gray 波形。
+# RAM1 (hi) 和 RAM2 (lo) 的位组合选择 WW/BW/WB/BB 中的一组波形，四组波形分别驱动到白、浅灰、深灰、黑；
+# 不同批次的面板可能需要微调各组的帧数
+lut_20_vcom_gray = bytearray([
+  0x00, 0x0A, 0x00, 0x00, 0x00, 0x01,
+  0x60, 0x14, 0x14, 0x00, 0x00, 0x01,
+  0x00, 0x14, 0x00, 0x00, 0x00, 0x01,
+  0x00, 0x13, 0x0A, 0x01, 0x00, 0x01,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00,
+]) # 44 bytes
+
+lut_21_ww_gray = bytearray([
+  0x40, 0x0A, 0x00, 0x00, 0x00, 0x01,
+  0x90, 0x14, 0x14, 0x00, 0x00, 0x01,
+  0x10, 0x14, 0x0A, 0x00, 0x00, 0x01,
+  0xA0, 0x13, 0x01, 0x00, 0x00, 0x01,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+]) # 42 bytes
+
+lut_22_bw_gray = bytearray([
+  0x40, 0x0A, 0x00, 0x00, 0x00, 0x01,
+  0x90, 0x14, 0x14, 0x00, 0x00, 0x01,
+  0x00, 0x14, 0x0A, 0x00, 0x00, 0x01,
+  0x99, 0x0C, 0x01, 0x03, 0x04, 0x01,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+]) # 42 bytes
+
+lut_23_wb_gray = bytearray([
+  0x40, 0x0A, 0x00, 0x00, 0x00, 0x01,
+  0x90, 0x14, 0x14, 0x00, 0x00, 0x01,
+  0x00, 0x14, 0x0A, 0x00, 0x00, 0x01,
+  0x99, 0x0B, 0x04, 0x04, 0x01, 0x01,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+]) # 42 bytes
+
+lut_24_bb_gray = bytearray([
+  0x80, 0x0A, 0x00, 0x00, 0x00, 0x01,
+  0x90, 0x14, 0x14, 0x00, 0x00, 0x01,
+  0x20, 0x14, 0x0A, 0x00, 0x00, 0x01,
+  0x50, 0x13, 0x01, 0x00, 0x00, 0x01,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+  0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+]) # 42 bytes
+
+# --- 初始化表 ---
+# (命令, 参数) 序列，预先构造好，由 IL0373._write_table 按顺序整体回放
+init_power_table = (
+    (0x01, b'\x03\x00\x2b\x2b\x03'), # POWER SETTING
+    (0x06, b'\x17\x17\x17'),         # BOOST SOFT START A, B, C
+)
+init_panel_table = (
+    (0x00, b'\xbf\x0d'), # PANEL SETTING: LUT from register, VCOM to 0V fast
+    (0x30, b'\x3a'),     # PLL SETTING: 3a 100HZ   29 150Hz 39 200HZ 31 171HZ
+)
+lut_full_table = (
+    (0x82, b'\x08'),       # VCOM_DC setting
+    (0x50, b'\x97'),       # VCOM AND DATA INTERVAL SETTING, value from Arduino driver
+    (0x20, lut_20_vcomDC), # VCOM LUT
+    (0x21, lut_21_ww),     # WW LUT
+    (0x22, lut_22_bw),     # BW LUT
+    (0x23, lut_23_wb),     # WB LUT
+    (0x24, lut_24_bb),     # BB LUT
+)
+lut_partial_table = (
+    (0x82, b'\x08'),               # VCOM_DC setting
+    (0x50, b'\x17'),               # Border floating during partial update, from Arduino driver
+    (0x20, lut_20_vcomDC_partial), # VCOM LUT
+    (0x21, lut_21_ww_partial),     # WW LUT
+    (0x22, lut_22_bw_partial),     # BW LUT
+    (0x23, lut_23_wb_partial),     # WB LUT
+    (0x24, lut_24_bb_partial),     # BB LUT
+)
+lut_gray_table = (
+    (0x82, b'\x08'),          # VCOM_DC setting
+    (0x50, b'\x97'),          # VCOM AND DATA INTERVAL SETTING
+    (0x20, lut_20_vcom_gray), # VCOM LUT
+    (0x21, lut_21_ww_gray),   # WW LUT
+    (0x22, lut_22_bw_gray),   # BW LUT
+    (0x23, lut_23_wb_gray),   # WB LUT
+    (0x24, lut_24_bb_gray),   # BB LUT
+)
+
+# BUSY 等待时间表：等待类型 -> (预计耗时 ms, 超时 ms)，为 1.54 寸面板的近似值。
+# 预计耗时用于自适应轮询，可通过 IL0373.busy_timing 按实例调整
+busy_timing = {
+    "power_on": (80, 2000),   # POWER ON (0x04)
+    "power_off": (40, 2000),  # POWER OFF (0x02)
+    "refresh": (3000, 30000), # DISPLAY REFRESH (0x12)，全刷
+    "partial": (400, 10000),  # DISPLAY REFRESH (0x12)，局刷
+    "gray": (2000, 30000),    # DISPLAY REFRESH (0x12)，4 级灰度
+}
+
+# 画面快照文件 (save_frame / load_frame / show_frame)：4 字节标识 (含版本号) + 宽、高各 2 字节 (大端)，
+# 之后是物理布局的帧缓冲 (1 为白色)，152x152 的屏幕共 8 + 2888 字节
+_FRAME_MAGIC = b"EPF\x01"
 
 class IL0373():
-    def __init__(self, spi, dc, busy, cs, res, width=152, height=152, rotate=Rotate.ROTATE_0, bg_color=Color.WHITE):
+    def __init__(self, spi, dc, busy, cs, res, width=152, height=152, rotate=Rotate.ROTATE_0, bg_color=Color.WHITE, full_refresh_every=10, glyph_cache_bytes=2048, font_index_in_ram=False, log_level=LogLevel.OFF, history=8, double_buffer=False, power_policy=PowerPolicy.ALWAYS_SLEEP, sleep_after=120):
         super().__init__()
         self.spi = spi
         self.dc = dc
@@ -384,8 +1316,43 @@ class IL0373():
         
         self.screen = Screen(width=width, height=height)
         self.paint = Paint(self.screen, rotate=rotate, bg_color=bg_color)
+        # 上一次推送到屏幕的画面，作为 RAM1 的"旧数据"，并用于差分和跳过相同画面
+        self._shown = bytearray(b'\xff' * len(self.paint.img))
+        self._shown_valid = False # 上电后屏幕内容未知，第一次必须全刷
+        # 双缓冲：paint.img 作为后台缓冲区供绘制，update() 时把画面拷贝到前台缓冲区再上传和刷新，
+        # 刷新期间可以继续绘制下一帧；额外占用一帧内存 (2888 字节)
+        self._front = bytearray(len(self.paint.img)) if double_buffer else None
+        # 局刷策略：连续 full_refresh_every 次局刷后强制全刷一次以消除残影，0 表示禁用局刷
+        self.full_refresh_every = full_refresh_every
+        self._partial_count = 0
+        self._lut_mode = None
+        self._resolution = bytes((self.screen.width, self.screen.height >> 8, self.screen.height & 0xFF))
+        # 寄存器/LUT 影子：命令 -> 控制器当前持有的参数，只写入与影子不同的值；硬件复位后清空。
+        # 默认的 ALWAYS_SLEEP 策略每次刷新都要复位，影子总是空的，只有 TIMEOUT / UNTIL_IDLE 的热启动才能跳过写入
+        self._regs = {}
+        # 命令字节和局刷窗口参数的预分配缓冲区，写命令时不再每次分配
+        self._cmd_buf = bytearray(1)
+        self._window_buf = bytearray(7)
+        self.busy_timing = dict(busy_timing)
+        # 调试输出级别，以及最近 history 次刷新的各阶段耗时记录 (环形缓冲区，0 表示不记录)
+        self.log_level = log_level
+        self._records = [None] * history if history > 0 else None
+        self._record_index = 0
+        self._record = None # 正在进行中的刷新记录
+        self._record_start = 0
+        self._text_calls = 0 # 上次刷新以来 show_string 的调用次数和耗时 (微秒)
+        self._text_us = 0
+        self._busy_flag = None # update_async() 使用的 BUSY 上升沿中断标志，第一次使用时创建
+        self._idle_task = None # TIMEOUT / UNTIL_IDLE 策略下 update_async() 之后检查空闲并深度睡眠的后台任务
+        self._async_running = False # 异步刷新流程正在进行，后台任务不能在此期间让控制器睡眠
         
         self.is_sleeping = True 
+        self.refreshing = False # 已发出刷新命令、正在等待面板完成刷新
+        self.is_powered = False # 高压 (booster) 是否开启；只关闭高压而未深度睡眠时寄存器和 LUT 仍然有效
+        # 电源策略 (见 PowerPolicy) 以及 TIMEOUT / UNTIL_IDLE 策略下空闲多少秒后深度睡眠
+        self.power_policy = power_policy
+        self.sleep_after = sleep_after
+        self._last_refresh = ticks_ms() # 空闲计时的起点；UNTIL_IDLE 策略下发现未刷新的绘制时也会更新
         self.cs(1) 
         
         # --- 初始化 BMF 字体 ---
@@ -393,64 +1360,168 @@ class IL0373():
         self.font_width = 0 # Default font width
         self.font_height = 0 # Default font height
         try:
-            self.bmf_font = BMFont("fusion-pixel-12-6881-12.v3.bmf")
+            self.bmf_font = BMFont("fusion-pixel-12-6881-12.v3.bmf", cache_bytes=glyph_cache_bytes,
+                                   index_in_ram=font_index_in_ram)
             self.font_width = self.bmf_font.font_size
             self.font_height = self.bmf_font.font_size
-            print(f"BMF font loaded. Size: {self.font_width}x{self.font_height}")
+            if self.log_level >= LogLevel.VERBOSE:
+                print(f"BMF font loaded. Size: {self.font_width}x{self.font_height}")
         except Exception as e:
+            # 加载失败是错误而不是调试信息，不受 log_level 控制
             print(f"Failed to load BMF font fusion-pixel-12-6880-12.v3.bmf: {e}")
             print("Text display will be unavailable.")
 
-    def read_busy(self, info="wait busy timeout!", timeout=30):
-        st = time.time()
-        print(f"Waiting for BUSY pin to go HIGH (idle)...")
+    def read_busy(self, info="wait busy timeout!", timeout=None, kind=None):
+        """
+        等待 BUSY 变高 (空闲)。kind 为 busy_timing 中的等待类型，决定预计耗时和超时，
+        timeout (秒) 可以覆盖表中的超时。
+        """
+        expected, timeout_ms = self._busy_limits(kind, timeout)
+        start = ticks_us()
+        st = ticks_ms()
+        if self.log_level >= LogLevel.VERBOSE:
+            print(f"Waiting for BUSY pin to go HIGH (idle)...")
         while self.busy.value() == 0:
-            if (time.time() - st) > timeout:
+            elapsed = ticks_diff(ticks_ms(), st)
+            if elapsed > timeout_ms:
                 raise TimeoutError(info)
-            time.sleep_ms(10)
-        print(f"BUSY went HIGH. EPD is idle. Waited {time.time() - st:.2f}s")
+            sleep_ms(self._poll_interval(elapsed, expected))
+        self._busy_done(kind, start)
+
+    async def read_busy_async(self, info="wait busy timeout!", timeout=None, kind=None):
+        """
+        与 read_busy() 相同，但等待期间把控制权让给其他 asyncio 任务。
+        BUSY 引脚支持中断时在其上升沿唤醒，否则按与 read_busy() 相同的自适应间隔轮询。
+        """
+        asyncio = _import_asyncio()
+        expected, timeout_ms = self._busy_limits(kind, timeout)
+        start = ticks_us()
+        st = ticks_ms()
+        flag = self._get_busy_flag(asyncio)
+        if self.log_level >= LogLevel.VERBOSE:
+            print(f"Waiting for BUSY pin to go HIGH (idle, async)...")
+        while self.busy.value() == 0:
+            elapsed = ticks_diff(ticks_ms(), st)
+            if elapsed > timeout_ms:
+                raise TimeoutError(info)
+            if flag is None:
+                await asyncio.sleep(self._poll_interval(elapsed, expected) / 1000)
+            else:
+                try:
+                    await asyncio.wait_for(flag.wait(), (timeout_ms - elapsed) / 1000)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(info)
+        self._busy_done(kind, start)
+
+    def _busy_limits(self, kind, timeout):
+        # 返回 (预计耗时 ms, 超时 ms)；未知类型不做自适应轮询，超时 30 秒
+        expected, timeout_ms = self.busy_timing.get(kind, (0, 30000))
+        if timeout is not None:
+            timeout_ms = timeout * 1000
+        return expected, timeout_ms
+
+    def _poll_interval(self, elapsed, expected):
+        # 距预计完成还远时每次睡掉剩余时间的一半 (最多 100ms)，接近预计时间时每 1ms 检查一次；
+        # 超过预计时间后间隔随超出的时长增长 (每次约为 1.5 倍，最多 50ms)，避免面板偏慢时一直 1ms 轮询
+        left = expected - elapsed
+        if left > 20:
+            return min(left // 2, 100)
+        if left < 0:
+            return min(max(-left // 2, 1), 50)
+        return 1
+
+    def _busy_done(self, kind, start):
+        # 记录这一次等待的类型和实际耗时 (微秒)，并累加到当前刷新记录的 busy 总时长
+        waited = ticks_diff(self._timed("busy", start), start)
+        if self._record is not None:
+            self._record["waits"].append((kind, waited))
+        if self.log_level >= LogLevel.VERBOSE:
+            print(f"BUSY went HIGH. EPD is idle. Waited {waited / 1000:.1f} ms ({kind})")
+
+    def _get_busy_flag(self, asyncio):
+        # 在 BUSY 上升沿注册中断并通过 ThreadSafeFlag 唤醒等待的任务；
+        # CPython、模拟器或不支持中断的引脚返回 None，退回轮询
+        if self._busy_flag is None:
+            self._busy_flag = False
+            try:
+                flag = asyncio.ThreadSafeFlag()
+                self.busy.irq(trigger=self.busy.IRQ_RISING, handler=lambda pin: flag.set())
+                self._busy_flag = flag
+            except (AttributeError, TypeError, ValueError, OSError):
+                pass
+        return self._busy_flag or None
         
     def hw_rst(self):
-        print("hardware resetting...")
+        if self.log_level >= LogLevel.VERBOSE:
+            print("hardware resetting...")
         self.res(0)
-        time.sleep_ms(10)
+        sleep_ms(10)
         self.res(1)
-        time.sleep_ms(10)
-        print("hardware reset signal sent.")
+        sleep_ms(10)
+        # 复位后寄存器和 LUT 恢复默认值，高压关闭
+        self._regs = {}
+        self._lut_mode = None
+        self.is_powered = False
+        if self.log_level >= LogLevel.VERBOSE:
+            print("hardware reset signal sent.")
         
     def write_cmd(self, cmd: int):
+        buf = self._cmd_buf
+        buf[0] = cmd
         self.chip_sel()
         self.dc(0)
-        self.spi.write(cmd.to_bytes(1, 'big'))
+        self.spi.write(buf)
         self.dc(1)
         self.chip_desel()
         
     def write_data(self, data: int):
+        buf = self._cmd_buf
+        buf[0] = data
         self.chip_sel()
         self.dc(1)
-        self.spi.write(data.to_bytes(1, 'big'))
+        self.spi.write(buf)
         self.chip_desel()
 
-    def _Init_FullUpdate(self):
-        self.write_cmd(0x82)
-        self.write_data(0x08)
-        self.write_cmd(0X50)
-        self.write_data(0x97)
-
-        self.write_cmd(0x20)
-        self._write_bytes(lut_20_vcomDC)
-
-        self.write_cmd(0x21)
-        self._write_bytes(lut_21_ww)
+    def write_cmd_data(self, cmd: int, payload):
+        # 命令及其全部参数在一次片选内写出：DC 低发送命令字节，DC 高发送参数
+        buf = self._cmd_buf
+        buf[0] = cmd
+        self.chip_sel()
+        self.dc(0)
+        self.spi.write(buf)
+        self.dc(1)
+        self.spi.write(payload)
+        self.chip_desel()
 
-        self.write_cmd(0x22)
-        self._write_bytes(lut_22_bw)
+    def _set_reg(self, cmd: int, payload):
+        # 控制器已持有相同参数时跳过
+        if self._regs.get(cmd) == payload:
+            return False
+        self.write_cmd_data(cmd, payload)
+        self._regs[cmd] = bytes(payload)
+        return True
 
-        self.write_cmd(0x23)
-        self._write_bytes(lut_23_wb)
+    def _write_table(self, table):
+        for cmd, payload in table:
+            self._set_reg(cmd, payload)
 
-        self.write_cmd(0x24)
-        self._write_bytes(lut_24_bb)
+    def _Init_FullUpdate(self):
+        start = ticks_us()
+        self._write_table(lut_full_table)
+        self._lut_mode = 'full'
+        self._timed("lut", start)
+
+    def _Init_PartialUpdate(self):
+        start = ticks_us()
+        self._write_table(lut_partial_table)
+        self._lut_mode = 'partial'
+        self._timed("lut", start)
+
+    def _Init_GrayUpdate(self):
+        start = ticks_us()
+        self._write_table(lut_gray_table)
+        self._lut_mode = 'gray'
+        self._timed("lut", start)
 
     def _write_bytes(self, data_bytes: bytearray):
         self.chip_sel()
@@ -459,85 +1530,492 @@ class IL0373():
         self.chip_desel()
         
     def _wakeUp(self):
-        print("Waking up EPD (IL0373 initialization sequence)...")
-        self.hw_rst()
+        self._run(self._wakeUp_steps())
 
-        self.write_cmd(0x01)
-        self.write_data(0x03)
-        self.write_data(0x00)
-        self.write_data(0x2b)
-        self.write_data(0x2b)
-        self.write_data(0x03)
+    def _wakeUp_steps(self):
+        if self.log_level >= LogLevel.VERBOSE:
+            print("Waking up EPD (IL0373 initialization sequence)...")
+        start = ticks_us()
+        self.hw_rst()
 
-        self.write_cmd(0x06)
-        self.write_data(0x17)
-        self.write_data(0x17)
-        self.write_data(0x17)
+        self._write_table(init_power_table)
 
         self.write_cmd(0x04)
-        self.read_busy("_wakeUp Power On timeout!")
-
-        self.write_cmd(0x00)
-        self.write_data(0xbf)
-        self.write_data(0x0d)
-
-        self.write_cmd(0x30)
-        self.write_data(0x3a)
-
-        self.write_cmd(0x61)
-        self.write_data(self.screen.width)
-        self.write_data(self.screen.height >> 8)
-        self.write_data(self.screen.height & 0xFF)
+        yield "power_on", "_wakeUp Power On timeout!"
+        self.is_powered = True
 
+        self._write_table(init_panel_table)
+        self._set_reg(0x61, self._resolution)
+        self._timed("wake", start)
         self._Init_FullUpdate()
-        print("EPD woke up.")
+        if self.log_level >= LogLevel.VERBOSE:
+            print("EPD woke up.")
         self.is_sleeping = False
 
     def _sleep(self):
-        print("Putting EPD to sleep...")
-        self.write_cmd(0x02)
-        self.read_busy("_sleep Power Off timeout!")
+        self._run(self._sleep_steps())
+
+    def _sleep_steps(self):
+        if self.log_level >= LogLevel.VERBOSE:
+            print("Putting EPD to sleep...")
+        start = ticks_us()
+        if self.is_powered:
+            self.write_cmd(0x02)
+            yield "power_off", "_sleep Power Off timeout!"
+            self.is_powered = False
         
-        self.write_cmd(0x07)
-        self.write_data(0xa5)
-        print("EPD is in deep sleep.")
+        self.write_cmd_data(0x07, b'\xa5') # DEEP SLEEP
+        self._timed("sleep", start)
+        if self.log_level >= LogLevel.VERBOSE:
+            print("EPD is in deep sleep.")
         self.is_sleeping = True
+
+    def _power_on_steps(self):
+        # 深度睡眠后需要复位并完整初始化；只关闭了高压时寄存器和 LUT 仍然有效，重新上电即可 (热启动)
+        if self.is_sleeping:
+            yield from self._wakeUp_steps()
+        elif not self.is_powered:
+            if self.log_level >= LogLevel.VERBOSE:
+                print("Powering on EPD (warm start)...")
+            start = ticks_us()
+            self.write_cmd(0x04) # POWER ON
+            yield "power_on", "Power On timeout!"
+            self.is_powered = True
+            self._timed("wake", start)
+
+    def _power_off_steps(self):
+        # 刷新完成后按电源策略处理：ALWAYS_SLEEP 深度睡眠，其余策略只关闭高压
+        self._last_refresh = ticks_ms()
+        if self.power_policy == PowerPolicy.ALWAYS_SLEEP:
+            yield from self._sleep_steps()
+            return
+        if self.log_level >= LogLevel.VERBOSE:
+            print("Powering off EPD (controller stays configured)...")
+        start = ticks_us()
+        self.write_cmd(0x02) # POWER OFF
+        yield "power_off", "Power Off timeout!"
+        self.is_powered = False
+        self._timed("sleep", start)
+
+    def sleep(self):
+        """立即让控制器进入深度睡眠，下次刷新时重新复位和初始化"""
+        if not self.is_sleeping:
+            self._sleep()
+
+    def sleep_if_idle(self):
+        """
+        TIMEOUT / UNTIL_IDLE 策略下空闲超过 sleep_after 秒时进入深度睡眠，返回控制器当前是否处于深度睡眠。
+        TIMEOUT 从上次刷新开始计时；UNTIL_IDLE 在 paint 上有尚未刷新的绘制时重新计时。
+        使用 update_async() 时由后台任务自动调用；只用同步 update() 时需要在主循环中周期调用。
+        """
+        if (not self.is_sleeping and self.power_policy != PowerPolicy.ALWAYS_SLEEP
+                and self._idle_left() <= 0):
+            self._sleep()
+        return self.is_sleeping
+
+    def _idle_left(self):
+        # 还要空闲多少毫秒才深度睡眠 (<= 0 表示已经空闲)
+        if self.power_policy == PowerPolicy.UNTIL_IDLE and self.paint.dirty is not None:
+            # 有尚未刷新的绘制：重新计时，sleep_after 为 0 时也不算空闲
+            self._last_refresh = ticks_ms()
+            return max(self.sleep_after * 1000, 1)
+        return self.sleep_after * 1000 - ticks_diff(ticks_ms(), self._last_refresh)
+
+    def _schedule_idle_sleep(self):
+        # 异步刷新结束后调用：TIMEOUT / UNTIL_IDLE 策略下启动 (最多一个) 空闲检查任务
+        if self.power_policy != PowerPolicy.ALWAYS_SLEEP and self._idle_task is None and not self.is_sleeping:
+            self._idle_task = _import_asyncio().create_task(self._idle_sleep())
+
+    async def _idle_sleep(self):
+        # 等到空闲满 sleep_after 秒后深度睡眠；期间有新的刷新 (UNTIL_IDLE 下还有新的绘制) 则继续等待。
+        # 高压已在刷新后关闭，进入深度睡眠只需写一条命令，不会等待 BUSY
+        asyncio = _import_asyncio()
+        try:
+            while not self.is_sleeping and self.power_policy != PowerPolicy.ALWAYS_SLEEP:
+                left = self._idle_left()
+                if left <= 0 and not self._async_running and not self.is_powered:
+                    self.sleep_if_idle()
+                    break
+                await asyncio.sleep(max(left, 100) / 1000)
+        finally:
+            self._idle_task = None
         
     def init(self):
         self._wakeUp()
         
-    def update_mem(self):
-        print("updating the memory...")
-        self.write_cmd(0x10)
-        self.chip_sel()
-        self.dc(1)
-        for _ in range(self.paint.screen.height_bytes * self.paint.screen.width_bytes):
-            self.spi.write(b'\xFF')
-        self.chip_desel()
-            
-        self.write_cmd(0x13)
-        self.chip_sel()
-        self.dc(1)
-        for k in range(self.paint.screen.height_bytes * self.paint.screen.width_bytes):
-            byte = ~self.paint.img[k] & 0xFF
-            self.spi.write(byte.to_bytes(1, 'big'))
-        self.chip_desel()
-        print("updating memory successful")
+    def update_mem(self, frame=None):
+        if self.log_level >= LogLevel.VERBOSE:
+            print("updating the memory...")
+        # Paint.img is kept in panel polarity (1 = white), so both RAM planes
+        # are streamed with a single spi.write each, without per-byte inversion
+        start = ticks_us()
+        self.write_cmd_data(0x10, self._shown) # DATA START TRANSMISSION 1 (previously displayed data)
+        start = self._timed("ram1", start)
+
+        self.write_cmd_data(0x13, self.paint.img if frame is None else frame) # DATA START TRANSMISSION 2 (new data)
+        self._timed("ram2", start)
+        if self.log_level >= LogLevel.VERBOSE:
+            print("updating memory successful")
         
     def update_screen(self):
-        print("updating the screen (display refresh)...")
+        self._run(self._update_screen_steps())
+
+    def _update_screen_steps(self):
+        if self.log_level >= LogLevel.VERBOSE:
+            print("updating the screen (display refresh)...")
+        start = ticks_us()
         self.write_cmd(0x12)
-        self.read_busy("update screen timeout!")
-        print("update screen successful")
-        self._sleep()
+        self.refreshing = True
+        yield "refresh", "update screen timeout!"
+        self.refreshing = False
+        self._timed("refresh", start)
+        if self.log_level >= LogLevel.VERBOSE:
+            print("update screen successful")
+        yield from self._power_off_steps()
         
-    def update(self):
-        if self.is_sleeping:
-            print("Waking up EPD for update...")
-            self._wakeUp()
+    def _set_partial_window(self, x_start, y_start, x_end, y_end):
+        # Physical coordinates, x is rounded out to whole bytes as required by the controller
+        # PARTIAL OUT 之后窗口不保证保留，不经过寄存器影子，每次都写入
+        buf = self._window_buf
+        buf[0] = x_start & 0xF8
+        buf[1] = (x_end | 0x07) & 0xFF
+        buf[2] = y_start >> 8
+        buf[3] = y_start & 0xFF
+        buf[4] = y_end >> 8
+        buf[5] = y_end & 0xFF
+        buf[6] = 0x01 # Scan inside and outside of the partial window
+        self.write_cmd_data(0x90, buf) # PARTIAL WINDOW
+
+    def _write_window(self, buf, x_start, y_start, x_end, y_end):
+        # Stream the byte columns of a physical window, one spi.write per row
+        mv = memoryview(buf)
+        width_bytes = self.screen.width_bytes
+        col_start = x_start // 8
+        col_end = x_end // 8 + 1
+        self.chip_sel()
+        self.dc(1)
+        for row in range(y_start, y_end + 1):
+            offset = row * width_bytes
+            self.spi.write(mv[offset + col_start:offset + col_end])
+        self.chip_desel()
+
+    def update_partial(self, x_start, y_start, x_end, y_end):
+        """
+        使用局刷波形只刷新物理坐标窗口 (x_start, y_start)-(x_end, y_end)，包含端点，超出屏幕的部分被裁掉。
+        RAM1 写入上一次显示的画面，RAM2 写入当前画面，控制器据此只驱动变化的像素。
+        上电后或灰度刷新之后还不知道屏幕上的画面 (RAM1 没有可用的旧数据)，这时改为全刷。
+        """
+        started = self._begin_record()
+        try:
+            x_start, x_end = max(0, min(x_start, x_end)), min(self.screen.width - 1, max(x_start, x_end))
+            y_start, y_end = max(0, min(y_start, y_end)), min(self.screen.height - 1, max(y_start, y_end))
+            if x_start > x_end or y_start > y_end: # 窗口完全在屏幕外
+                self._note("mode", "skipped")
+                return
+            if not self._shown_valid:
+                self._run(self._update_steps(False))
+                return
+            # 窗口按字节对齐后才是实际刷新的区域 (见 _update_partial_steps)
+            window = (x_start & 0xF8, y_start, min(x_end | 0x07, self.screen.width - 1), y_end)
+            frame, _ = self._take_frame(window)
+            self._run(self._update_partial_steps(frame, x_start, y_start, x_end, y_end))
+        finally:
+            if started:
+                self._end_record()
+
+    def _update_partial_steps(self, frame, x_start, y_start, x_end, y_end):
+        yield from self._power_on_steps()
+        if self._lut_mode != 'partial':
+            self._Init_PartialUpdate()
+
+        x_start &= 0xF8
+        x_end |= 0x07
+        if x_end >= self.screen.width:
+            x_end = self.screen.width - 1
+        self._note("mode", "partial")
+        self._note("window", (x_start, y_start, x_end, y_end))
+        if self.log_level >= LogLevel.VERBOSE:
+            print(f"partial update window: ({x_start}, {y_start})-({x_end}, {y_end})")
+
+        start = ticks_us()
+        self.write_cmd(0x91) # PARTIAL IN
+        self._set_partial_window(x_start, y_start, x_end, y_end)
+        self.write_cmd(0x10) # DATA START TRANSMISSION 1 (previously displayed data)
+        self._write_window(self._shown, x_start, y_start, x_end, y_end)
+        start = self._timed("ram1", start)
+        self.write_cmd(0x13) # DATA START TRANSMISSION 2 (new data)
+        self._write_window(frame, x_start, y_start, x_end, y_end)
+        start = self._timed("ram2", start)
+
+        # 数据已进入控制器 RAM，先更新记账：只有窗口内的字节列真正被刷新
+        frame = memoryview(frame)
+        width_bytes = self.screen.width_bytes
+        col_start = x_start // 8
+        col_end = x_end // 8 + 1
+        for row in range(y_start, y_end + 1):
+            offset = row * width_bytes
+            self._shown[offset + col_start:offset + col_end] = frame[offset + col_start:offset + col_end]
+        self._partial_count += 1
+
+        self.write_cmd(0x12) # DISPLAY REFRESH
+        self.refreshing = True
+        yield "partial", "partial update timeout!"
+        self.refreshing = False
+        self._timed("refresh", start)
+        self.write_cmd(0x92) # PARTIAL OUT
+        yield from self._power_off_steps()
+
+    def update_window(self, x_start, y_start, x_end, y_end):
+        # 逻辑坐标 (考虑旋转) 转换为物理窗口后局部刷新
+        x_start, x_end = max(0, min(x_start, x_end)), min(self.paint.width - 1, max(x_start, x_end))
+        y_start, y_end = max(0, min(y_start, y_end)), min(self.paint.height - 1, max(y_start, y_end))
+        px0, py0 = self.paint._convert_coor(x_start, y_start)
+        px1, py1 = self.paint._convert_coor(x_end, y_end)
+        self.update_partial(min(px0, px1), min(py0, py1), max(px0, px1), max(py0, py1))
+
+    def get_dirty_rect(self):
+        """返回自上次 update() 以来被修改的物理区域 (x_start, y_start, x_end, y_end)，没有修改时返回 None"""
+        dirty = self.paint.dirty
+        return None if dirty is None else tuple(dirty)
+
+    def _diff_rect(self, frame, dirty):
+        """
+        与上一次显示的画面逐字节比较，返回变化区域的物理坐标 (x_start, y_start, x_end, y_end)，
+        x 方向按字节对齐；画面完全相同时返回 None。有脏区域时只在脏区域内查找。
+        这依赖于一个不变量：_shown 有效时，画面与 _shown 不同的字节都在 paint 的脏区域内。
+        全刷把整帧写入 _shown，局刷把窗口写入 _shown，并且只在脏区域完全被窗口覆盖时才清除它
+        (见 _take_frame)；show_frame() 和 load_frame() 把整个画布标记为脏。
+        """
+        img = memoryview(frame)
+        shown = memoryview(self._shown)
+        width_bytes = self.screen.width_bytes
+        if dirty is None:
+            row_start, row_end = 0, self.screen.height - 1
+            col_start, col_end = 0, width_bytes - 1
+        else:
+            row_start, row_end = dirty[1], dirty[3]
+            col_start, col_end = dirty[0] // 8, dirty[2] // 8
+
+        # 先整行比较缓冲区，找出第一行和最后一行变化
+        while row_start <= row_end:
+            offset = row_start * width_bytes
+            if img[offset + col_start:offset + col_end + 1] != shown[offset + col_start:offset + col_end + 1]:
+                break
+            row_start += 1
+        else:
+            return None
+        while row_end > row_start:
+            offset = row_end * width_bytes
+            if img[offset + col_start:offset + col_end + 1] != shown[offset + col_start:offset + col_end + 1]:
+                break
+            row_end -= 1
+
+        # 再逐字节收缩左右边界，每行只需检查当前边界以外的字节
+        left, right = col_end + 1, col_start - 1
+        for row in range(row_start, row_end + 1):
+            offset = row * width_bytes
+            for col in range(col_start, left):
+                if img[offset + col] != shown[offset + col]:
+                    left = col
+                    break
+            for col in range(col_end, right, -1):
+                if img[offset + col] != shown[offset + col]:
+                    right = col
+                    break
+        return left * 8, row_start, right * 8 + 7, row_end
+
+    def update(self, partial=False):
+        started = self._begin_record()
+        try:
+            self._run(self._update_steps(partial))
+        finally:
+            if started:
+                self._end_record()
+
+    async def update_async(self, partial=False):
+        """
+        与 update() 相同，但在等待 BUSY (上电、刷新、断电) 时把控制权让给其他 asyncio 任务，
+        例如在刷新的几秒内获取天气或同步时间。单缓冲时要等画面写入控制器 (refreshing 为 True) 后
+        才能在 paint 上绘制下一帧；启用 double_buffer 后任务开始运行即可绘制。
+        """
+        started = self._begin_record()
+        try:
+            await self._run_async(self._update_steps(partial))
+        finally:
+            if started:
+                self._end_record()
+
+    def gray_paint(self, bg_color=Color.WHITE):
+        """创建一个与本屏幕尺寸和旋转方向相同的 GrayPaint，供 update_gray() 使用"""
+        return GrayPaint(self.screen, rotate=self.paint.rotate, bg_color=bg_color)
+
+    def update_gray(self, gray):
+        """
+        用 4 级灰度波形全刷 GrayPaint 的画面。灰度刷新总是全屏的；刷新之后屏幕上不再是 1 位画面，
+        下一次黑白 update() 会自动改为全刷。
+        """
+        started = self._begin_record()
+        try:
+            self._run(self._update_gray_steps(gray))
+        finally:
+            if started:
+                self._end_record()
+
+    async def update_gray_async(self, gray):
+        # 与 update_gray() 相同，但等待 BUSY 时把控制权让给其他 asyncio 任务
+        started = self._begin_record()
+        try:
+            await self._run_async(self._update_gray_steps(gray))
+        finally:
+            if started:
+                self._end_record()
+
+    def _update_gray_steps(self, gray):
+        self._note("mode", "gray")
+        yield from self._power_on_steps()
+        if self._lut_mode != 'gray':
+            self._Init_GrayUpdate()
+
+        start = ticks_us()
+        self.write_cmd_data(0x10, gray.hi.img) # DATA START TRANSMISSION 1: 灰度码高位
+        start = self._timed("ram1", start)
+        self.write_cmd_data(0x13, gray.lo.img) # DATA START TRANSMISSION 2: 灰度码低位
+        start = self._timed("ram2", start)
+        gray.reset_dirty()
+        # RAM1 中不再是上一帧的黑白画面，之后的黑白刷新不能做差分或局刷
+        self._shown_valid = False
+        self._partial_count = 0
+
+        self.write_cmd(0x12) # DISPLAY REFRESH
+        self.refreshing = True
+        yield "gray", "gray update timeout!"
+        self.refreshing = False
+        self._timed("refresh", start)
+        yield from self._power_off_steps()
+
+    def _frame_header(self):
+        width = self.screen.width
+        height = self.screen.height
+        return _FRAME_MAGIC + bytes((width >> 8, width & 0xFF, height >> 8, height & 0xFF))
+
+    def _open_frame(self, path):
+        # 打开快照文件并校验文件头和长度，文件指针停在帧缓冲数据开头
+        f = open(path, "rb")
+        header = self._frame_header()
+        if f.read(len(header)) != header or f.seek(0, 2) != len(header) + len(self._shown):
+            f.close()
+            raise TypeError("画面快照格式或尺寸不匹配: " + path)
+        f.seek(len(header))
+        return f
+
+    def _read_frame(self, f, buf, path):
+        if f.readinto(buf) != len(buf):
+            raise TypeError("画面快照数据不完整: " + path)
+
+    def save_frame(self, path, frame=None):
+        """
+        把画面 (默认 paint.img) 连同文件头保存为快照文件。之后用 load_frame() / show_frame() 恢复时
+        只需一次文件读取，不必加载字体、布局和绘制，适合启动时的静态画面和最后一帧。
+        """
+        with open(path, "wb") as f:
+            f.write(self._frame_header())
+            f.write(self.paint.img if frame is None else frame)
+
+    def load_frame(self, path):
+        """把快照直接读入 paint.img 并把整个画布标记为脏，之后可以继续绘制，再用 update() 显示"""
+        with self._open_frame(path) as f:
+            self._read_frame(f, self.paint.img, path)
+        self.paint.dirty = [0, 0, self.screen.width - 1, self.screen.height - 1]
+
+    def show_frame(self, path):
+        """
+        把快照读入"已显示画面"缓冲区，一次 spi.write 写入 RAM 并全刷，不经过 paint。
+        paint 上的内容保持不变并整体标记为脏，下一次 update() 与快照比较，只刷新不同的区域。
+        """
+        f = self._open_frame(path) # 先校验文件，格式不对时不唤醒面板
+        started = self._begin_record()
+        try:
+            self._run(self._show_frame_steps(f, path))
+        finally:
+            f.close()
+            if started:
+                self._end_record()
+
+    def _show_frame_steps(self, f, path):
+        yield from self._power_on_steps()
+        if self._lut_mode != 'full':
+            self._Init_FullUpdate()
+
+        self._note("mode", "frame")
+        start = ticks_us()
+        self.write_cmd_data(0x10, self._shown) # DATA START TRANSMISSION 1 (previously displayed data)
+        start = self._timed("ram1", start)
+        self._shown_valid = False # 读取失败时 _shown 内容不可信
+        try:
+            self._read_frame(f, self._shown, path)
+        except (OSError, TypeError):
+            # 文件在校验之后读取失败 (被截断或存储出错)：屏幕没有刷新，按电源策略关闭高压再抛出
+            yield from self._power_off_steps()
+            raise
+        self.write_cmd_data(0x13, self._shown) # DATA START TRANSMISSION 2 (new data)
+        self._timed("ram2", start)
+        self._shown_valid = True
+        self._partial_count = 0
+        self.paint.dirty = [0, 0, self.screen.width - 1, self.screen.height - 1]
+        yield from self._update_screen_steps()
+
+    def _run(self, steps):
+        # 刷新流程写成生成器，需要等待 BUSY 时产出 (busy_timing 中的等待类型, 超时提示信息)，同步和异步两种方式共用同一流程
+        for kind, info in steps:
+            self.read_busy(info, kind=kind)
+
+    async def _run_async(self, steps):
+        self._async_running = True
+        try:
+            for kind, info in steps:
+                await self.read_busy_async(info, kind=kind)
+        finally:
+            self._async_running = False
+        self._schedule_idle_sleep()
+
+    def _take_frame(self, window=None):
+        """
+        取出本次要推送的画面及其脏区域，并清除 paint 的脏区域。
+        给出 window (本次只刷新的物理窗口) 时，脏区域不完全在窗口内就原样保留，
+        窗口外的修改留给下一次 update() 比较和刷新，不会丢失。
+        双缓冲时把后台缓冲区一次性拷贝到前台缓冲区 (不会被其他 asyncio 任务打断)，
+        之后在 paint 上的绘制只影响下一帧，不会改变正在上传和刷新的画面。
+        """
+        dirty = self.paint.dirty
+        if (window is None or dirty is None or (window[0] <= dirty[0] and window[1] <= dirty[1]
+                                                and dirty[2] <= window[2] and dirty[3] <= window[3])):
+            self.paint.reset_dirty()
+        if self._front is None:
+            return self.paint.img, dirty
+        self._front[:] = self.paint.img
+        return self._front, dirty
+
+    def _update_steps(self, partial):
+        frame, dirty = self._take_frame()
+        if self._shown_valid:
+            window = self._diff_rect(frame, dirty)
+            if window is None:
+                self._note("mode", "skipped")
+                return
+            if partial and self._partial_count < self.full_refresh_every:
+                yield from self._update_partial_steps(frame, *window)
+                return
+
+        yield from self._power_on_steps()
+        if self._lut_mode != 'full':
+            self._Init_FullUpdate()
         
-        self.update_mem()
-        self.update_screen()
+        self._note("mode", "full")
+        self.update_mem(frame)
+        self._shown[:] = frame
+        self._shown_valid = True
+        self._partial_count = 0
+        yield from self._update_screen_steps()
 
     def chip_sel(self):
         self.cs(0)
@@ -545,77 +2023,125 @@ class IL0373():
     def chip_desel(self):
         self.cs(1)
 
+    # --- 性能记录 ---
+    PHASES = ("wake", "lut", "ram1", "ram2", "refresh", "sleep")
+
+    def _timed(self, phase, start):
+        # 把 start 以来的耗时 (微秒) 累加到当前刷新记录的 phase 阶段，返回当前时刻以便连续计时
+        now = ticks_us()
+        record = self._record
+        if record is not None:
+            record[phase] += ticks_diff(now, start)
+        return now
+
+    def _note(self, key, value):
+        if self._record is not None:
+            self._record[key] = value
+
+    def _begin_record(self):
+        # 已有进行中的记录 (update 内部调用 update_partial) 或禁用了记录时返回 False
+        if self._records is None or self._record is not None:
+            return False
+        record = {"mode": None, "window": None, "busy": 0, "waits": [], "total": 0,
+                  "text_calls": self._text_calls, "text": self._text_us}
+        for phase in self.PHASES:
+            record[phase] = 0
+        self._text_calls = 0
+        self._text_us = 0
+        self._record = record
+        self._record_start = ticks_us()
+        return True
+
+    def _end_record(self):
+        record = self._record
+        self._record = None
+        record["total"] = ticks_diff(ticks_us(), self._record_start)
+        self._records[self._record_index % len(self._records)] = record
+        self._record_index += 1
+        if self.log_level >= LogLevel.SUMMARY:
+            self._print_record(record)
+
+    def _print_record(self, record):
+        if record["mode"] == "skipped":
+            print("update skipped: frame unchanged")
+            return
+        phases = ", ".join(f"{phase} {record[phase] / 1000:.1f}" for phase in self.PHASES)
+        print(f"update {record['mode']}: {record['total'] / 1000:.1f} ms ({phases}; busy {record['busy'] / 1000:.1f}; "
+              f"text {record['text_calls']} calls {record['text'] / 1000:.1f})")
+
+    def get_update_records(self):
+        """
+        返回最近几次刷新的记录 (从旧到新)，每条记录是一个字典：
+        mode 为 "full" / "partial" / "gray" / "skipped"，window 为局刷的物理窗口 (x_start, y_start, x_end, y_end)；
+        wake / lut / ram1 / ram2 / refresh / sleep 为各阶段耗时，busy 为其中等待 BUSY 的总时长，
+        waits 为每次 BUSY 等待的 (等待类型, 耗时) 列表，total 为整次 update 的耗时，
+        text_calls / text 为这次刷新之前 show_string 的调用次数和总耗时。时间单位均为微秒。
+        """
+        if self._records is None:
+            return []
+        count = len(self._records)
+        ordered = (self._records[(self._record_index + i) % count] for i in range(count))
+        return [record for record in ordered if record is not None]
+
+    def clear_update_records(self):
+        if self._records is not None:
+            self._records = [None] * len(self._records)
+            self._record_index = 0
+
     # --- 统一的文本显示方法 ---
     def show_string(self, text, x_start, y_start, multiplier=1, color=Color.BLACK):
         if not self.bmf_font:
-            print("BMF font not loaded. Cannot display text.")
+            if self.log_level >= LogLevel.SUMMARY:
+                print("BMF font not loaded. Cannot display text.")
             return
+        start = ticks_us()
 
         original_font_size = self.font_width 
-        # displayed_font_size = original_font_size * multiplier # 不再直接使用此值作为步进
+        bytes_per_row = (original_font_size + 7) // 8
+        ADDITIONAL_SPACING_PIXELS = 1 # 每个字符之间额外增加 1 像素间距 (在原始字体大小下)
 
         current_x = x_start
 
-        for char_idx, char in enumerate(text):
+        for char in text:
             byte_data = self.bmf_font.get_bitmap(char)
-            char_bitmap_2d = _bmf_byte_to_bit(byte_data, original_font_size)
 
             # --- 计算字符的实际内容宽度 ---
-            min_pixel_x = original_font_size # 最左边的有效像素列
-            max_pixel_x = -1                  # 最右边的有效像素列
-            has_pixel = False
-
-            for r_offset in range(original_font_size):
-                for c_offset in range(original_font_size):
-                    if char_bitmap_2d[r_offset][c_offset] == 1:
-                        has_pixel = True
-                        if c_offset < min_pixel_x:
-                            min_pixel_x = c_offset
-                        if c_offset > max_pixel_x:
-                            max_pixel_x = c_offset
-            
-            # 字符的实际内容宽度 (在原始字体大小下)
-            # 对于完全空白的字符 (如空格 ' ')，has_pixel 会是 False
-            if has_pixel:
-                char_content_width_original = max_pixel_x - min_pixel_x + 1
+            min_pixel_x, char_content_width_original = self.bmf_font.get_ink(char)
+
+            # --- 绘制字符 ---
+            # 打包的行字节直接按位写入缓冲区，从 `min_pixel_x` 列开始以削减左侧空白
+            if char_content_width_original:
+                self.paint.show_packed(byte_data, char_content_width_original,
+                                       min(original_font_size, len(byte_data) // bytes_per_row),
+                                       current_x, y_start, multiplier, color,
+                                       src_x=min_pixel_x, stride=bytes_per_row)
             else:
                 # 对于空格或无法识别的字符，给一个默认的宽度，例如半个字体宽度
                 char_content_width_original = original_font_size // 2 # 12 // 2 = 6
-                min_pixel_x = 0 # 对于空白字符，从0开始绘制 (虽然不会画任何东西)
-
-            # 确保内容宽度至少为1，避免步进为0
-            if char_content_width_original <= 0:
-                char_content_width_original = 1
-            
-            # --- 绘制字符 ---
-            # 绘制时，从 `min_pixel_x` 开始，而不是从 0 开始，以削减左侧空白
-            for r_offset in range(original_font_size):
-                for c_offset in range(original_font_size):
-                    if char_bitmap_2d[r_offset][c_offset] == 1:
-                        for mr in range(multiplier):
-                            for mc in range(multiplier):
-                                # 绘制的 X 坐标 = 当前字符起始 X + (原始像素列 - 最小像素列) * 放大倍数 + 放大像素内的偏移
-                                self.paint.draw_point(
-                                    current_x + (c_offset - min_pixel_x) * multiplier + mc,
-                                    y_start + r_offset * multiplier + mr,
-                                    color
-                                )
             
             # --- 计算下一个字符的起始 X 坐标 (步进) ---
             # 字符的实际步进 = 放大后的内容宽度 + 额外间距
-            # 额外间距可以在放大后设定，例如 1 * multiplier 像素
-            ADDITIONAL_SPACING_PIXELS = 1 # 每个字符之间额外增加 1 像素间距 (在原始字体大小下)
-            
-            # 计算下一个字符的起始 X 坐标
-            next_char_advance = (char_content_width_original + ADDITIONAL_SPACING_PIXELS) * multiplier
+            current_x += (char_content_width_original + ADDITIONAL_SPACING_PIXELS) * multiplier
             
-            # 确保步进不会过小，至少要保证能够显示字符
-            if next_char_advance <= 0: # 避免步进为0或负数导致字符重叠
-                next_char_advance = 1 * multiplier # 强制最小步进
-                
-            current_x += next_char_advance
-            
-        print(f"show_string: finished '{text}'.")
+        elapsed = ticks_diff(ticks_us(), start)
+        self._text_calls += 1
+        self._text_us += elapsed
+        if self.log_level >= LogLevel.VERBOSE:
+            print(f"show_string: finished '{text}' in {elapsed} us.")
+
+    def glyph_atlas(self, chars="0123456789:°C%", multiplier=2, style=GlyphStyle.NORMAL):
+        """用已加载的 BMF 字体创建预渲染字形图集，字体未加载时返回 None"""
+        if not self.bmf_font:
+            return None
+        return GlyphAtlas(self.bmf_font, chars, multiplier, style)
+
+    def show_glyphs(self, atlas, text, x_start, y_start, color=Color.BLACK):
+        # 用预渲染图集绘制文本，计入与 show_string 相同的文本耗时统计
+        start = ticks_us()
+        width = atlas.draw(self.paint, text, x_start, y_start, color)
+        self._text_calls += 1
+        self._text_us += ticks_diff(ticks_us(), start)
+        return width
 
     # --- 新增：计算字符串总显示宽度的方法 ---
     def get_string_display_width(self, text, multiplier=1):
@@ -627,35 +2153,12 @@ class IL0373():
         ADDITIONAL_SPACING_PIXELS = 1 # 对应 show_string 中的 ADDITIONAL_SPACING_PIXELS
         
         for char in text:
-            byte_data = self.bmf_font.get_bitmap(char)
-            char_bitmap_2d = _bmf_byte_to_bit(byte_data, original_font_size)
-
-            min_pixel_x = original_font_size
-            max_pixel_x = -1
-            has_pixel = False
-
-            for r_offset in range(original_font_size):
-                for c_offset in range(original_font_size):
-                    if char_bitmap_2d[r_offset][c_offset] == 1:
-                        has_pixel = True
-                        if c_offset < min_pixel_x:
-                            min_pixel_x = c_offset
-                        if c_offset > max_pixel_x:
-                            max_pixel_x = c_offset
-            
-            if has_pixel:
-                char_content_width_original = max_pixel_x - min_pixel_x + 1
-            else:
+            # 只查度量表，不读取也不解码点阵
+            char_content_width_original = self.bmf_font.get_ink_width(char)
+            if not char_content_width_original:
                 char_content_width_original = original_font_size // 2
 
-            if char_content_width_original <= 0:
-                char_content_width_original = 1
-                
-            next_char_advance = (char_content_width_original + ADDITIONAL_SPACING_PIXELS) * multiplier
-            if next_char_advance <= 0:
-                next_char_advance = 1 * multiplier
-                
-            total_width += next_char_advance
+            total_width += (char_content_width_original + ADDITIONAL_SPACING_PIXELS) * multiplier
             
         return total_width
 
@@ -663,6 +2166,9 @@ class IL0373():
     def clear(self, *args, **kwargs):
         self.paint.clear(*args, **kwargs)
         
+    def set_rotate(self, *args, **kwargs):
+        self.paint.set_rotate(*args, **kwargs)
+        
     def draw_point(self, *args, **kwargs):
         self.paint.draw_point(*args, **kwargs)
         
@@ -683,6 +2189,8 @@ class IL0373():
     
 
 if __name__ == "__main__": # test block
+    from machine import Pin, SPI
+
     # --- ESP32-S3 Pin Definitions (ADJUST AS NEEDED) ---
     spi_id = 1
     sck_pin = 13
@@ -718,7 +2226,8 @@ if __name__ == "__main__": # test block
             width=152,
             height=152,
             rotate=Rotate.ROTATE_0,
-            bg_color=Color.WHITE
+            bg_color=Color.WHITE,
+            log_level=LogLevel.SUMMARY # 每次刷新输出一行各阶段耗时
             )
 
     epd.init()
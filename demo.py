@@ -1,7 +1,7 @@
 # main.py
 import time
 from machine import Pin, SPI
-from il0373 import IL0373, Color, Rotate # 导入修改后的驱动和相关常量
+from il0373 import IL0373, Color, Rotate, LogLevel # 导入修改后的驱动和相关常量
 
 # --- 定义引脚 (请根据你的ESP32-S3开发板实际连接修改这些引脚) ---
 # 以下是一些常见的ESP32-S3 GPIO引脚，但请务必查阅你开发板的引脚图！
@@ -45,7 +45,8 @@ epd = IL0373(
     width=152,  # 1.54寸墨水屏的宽度
     height=152, # 1.54寸墨水屏的高度
     rotate=Rotate.ROTATE_0, # 0度旋转，直接映射像素到缓冲区
-    bg_color=Color.WHITE # 背景色为白色
+    bg_color=Color.WHITE, # 背景色为白色
+    log_level=LogLevel.SUMMARY # 每次刷新输出一行各阶段耗时
 )
 
 print("EPD Driver initialized.")
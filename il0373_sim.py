@@ -0,0 +1,389 @@
+# il0373_sim.py
+# 主机端 (CPython) 的 IL0373 模拟后端：不需要开发板即可运行、计时和比对驱动的渲染与传输代码。
+#
+# 用法:
+#     from il0373_sim import SimPanel
+#     from il0373 import IL0373
+#     panel = SimPanel()
+#     epd = IL0373(*panel.pins())
+#     epd.update()
+#     panel.save_png("frame.png")
+import sys
+import time
+
+# 各命令的 BUSY 时长 (毫秒)，为 1.54 寸 IL0373 面板的近似值，可通过 busy_ms 参数覆盖
+DEFAULT_BUSY_MS = {
+    0x04: 80,   # POWER ON
+    0x12: 3000, # DISPLAY REFRESH (全刷)
+    0x02: 40,   # POWER OFF
+}
+DEFAULT_PARTIAL_REFRESH_MS = 400 # 局刷模式下 (0x91 之后) 的 DISPLAY REFRESH
+
+_COMMAND_NAMES = {
+    0x00: "PANEL SETTING",
+    0x01: "POWER SETTING",
+    0x02: "POWER OFF",
+    0x04: "POWER ON",
+    0x06: "BOOSTER SOFT START",
+    0x07: "DEEP SLEEP",
+    0x10: "DATA START TRANSMISSION 1",
+    0x12: "DISPLAY REFRESH",
+    0x13: "DATA START TRANSMISSION 2",
+    0x20: "VCOM LUT",
+    0x21: "WW LUT",
+    0x22: "BW LUT",
+    0x23: "WB LUT",
+    0x24: "BB LUT",
+    0x30: "PLL CONTROL",
+    0x50: "VCOM AND DATA INTERVAL SETTING",
+    0x61: "RESOLUTION SETTING",
+    0x82: "VCOM_DC SETTING",
+    0x90: "PARTIAL WINDOW",
+    0x91: "PARTIAL IN",
+    0x92: "PARTIAL OUT",
+}
+
+
+def _now_ms():
+    if hasattr(time, "ticks_ms"): # MicroPython 上也可以运行模拟器
+        return time.ticks_ms()
+    return time.monotonic() * 1000
+
+
+class SimPin():
+    """与 machine.Pin 调用方式相同的输出引脚：pin(v) 设置电平，pin() / pin.value() 读取电平"""
+    def __init__(self, value=1, on_change=None):
+        self._value = value
+        self._on_change = on_change
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        value = 1 if value else 0
+        if value != self._value:
+            self._value = value
+            if self._on_change:
+                self._on_change(value)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+
+class SimBusyPin():
+    """BUSY 输入引脚：面板忙时为低电平"""
+    def __init__(self, panel):
+        self._panel = panel
+
+    def __call__(self, value=None):
+        return self.value()
+
+    def value(self, value=None):
+        return 0 if self._panel.is_busy() else 1
+
+
+class SimSPI():
+    """与 machine.SPI 的 write 接口相同，把数据交给 SimPanel 解码"""
+    def __init__(self, panel):
+        self._panel = panel
+
+    def write(self, buf):
+        self._panel._spi_write(buf)
+
+
+class SimPanel():
+    """
+    IL0373 控制器模型：记录每一个命令和数据字节，按命令时长模拟 BUSY，
+    维护两个 RAM 平面 (0x10 / 0x13，支持局刷窗口) 以及刷新后屏幕实际显示的画面。
+
+    time_scale 为 0 时 BUSY 立即空闲，但时长仍计入 busy_ms_total，便于在 CI 上快速运行；
+    为 1 时按真实时间保持 BUSY，驱动的等待逻辑会真正经历这些时长。
+    """
+    def __init__(self, width=152, height=152, busy_ms=None, partial_refresh_ms=DEFAULT_PARTIAL_REFRESH_MS,
+                 time_scale=0.0, keep_log=True):
+        self.width = width
+        self.height = height
+        self.width_bytes = (width + 7) // 8
+        self.busy_ms = dict(DEFAULT_BUSY_MS)
+        if busy_ms:
+            self.busy_ms.update(busy_ms)
+        self.partial_refresh_ms = partial_refresh_ms
+        self.time_scale = time_scale
+        self.keep_log = keep_log
+
+        self.spi = SimSPI(self)
+        self.dc = SimPin(1)
+        self.cs = SimPin(1, on_change=self._on_cs_change)
+        self.res = SimPin(1, on_change=self._on_reset_change)
+        self.busy = SimBusyPin(self)
+
+        size = self.width_bytes * height
+        self.ram1 = bytearray(b'\xff' * size)
+        self.ram2 = bytearray(b'\xff' * size)
+        self.display = bytearray(b'\xff' * size) # 面板上实际显示的画面 (面板极性，1 为白色)
+        self.registers = {} # 命令 -> 最近一次写入的参数
+        self.reset_stats()
+        self._reset_controller()
+
+    # --- 驱动使用的引脚 ---
+    def pins(self):
+        """按 IL0373(spi, dc, busy, cs, res) 的参数顺序返回模拟的总线对象"""
+        return self.spi, self.dc, self.busy, self.cs, self.res
+
+    # --- 统计 ---
+    def reset_stats(self):
+        self.log = [] # [(命令, 参数字节), ...]
+        self.command_count = 0
+        self.data_bytes = 0
+        self.spi_writes = 0
+        self.cs_frames = 0
+        self.refresh_count = 0
+        self.partial_refresh_count = 0
+        self.busy_ms_total = 0
+        self.busy_events = [] # [(命令, 时长 ms), ...]
+        self.writes_while_asleep = 0
+        self.errors = [] # 违反时序的操作，例如未上电就刷新
+
+    def summary(self):
+        return {
+            "commands": self.command_count,
+            "data_bytes": self.data_bytes,
+            "spi_writes": self.spi_writes,
+            "cs_frames": self.cs_frames,
+            "refreshes": self.refresh_count,
+            "partial_refreshes": self.partial_refresh_count,
+            "busy_ms_total": self.busy_ms_total,
+            "errors": len(self.errors),
+        }
+
+    def commands(self):
+        """按顺序返回所有命令字节"""
+        return [cmd for cmd, _ in self.log]
+
+    def dump_log(self):
+        for cmd, payload in self.log:
+            name = _COMMAND_NAMES.get(cmd, "?")
+            if len(payload) > 16:
+                print(f"0x{cmd:02X} {name}: {len(payload)} bytes")
+            else:
+                print(f"0x{cmd:02X} {name}: {bytes(payload).hex()}")
+
+    # --- BUSY 模拟 ---
+    def is_busy(self):
+        return _now_ms() < self._busy_until
+
+    def _start_busy(self, cmd, duration_ms):
+        self.busy_ms_total += duration_ms
+        self.busy_events.append((cmd, duration_ms))
+        self._busy_until = _now_ms() + duration_ms * self.time_scale
+
+    # --- 控制器状态 ---
+    def _reset_controller(self):
+        self.asleep = False
+        self.powered = False
+        self.partial_mode = False
+        self.window = (0, 0, self.width - 1, self.height - 1)
+        self.registers = {}
+        self._cmd = None
+        self._payload = bytearray()
+        self._ram = None
+        self._ram_pos = 0
+        self._busy_until = 0
+
+    def _on_reset_change(self, value):
+        if value == 0:
+            self._finish_command()
+            self._reset_controller()
+
+    def _on_cs_change(self, value):
+        if value == 0:
+            self.cs_frames += 1
+
+    def _spi_write(self, buf):
+        self.spi_writes += 1
+        if self.cs.value() != 0:
+            return # 未选中芯片，数据被忽略
+        if self.asleep:
+            self.writes_while_asleep += 1 # 深度睡眠中只有硬件复位能唤醒
+            return
+        if self.dc.value() == 0:
+            for cmd in bytes(buf):
+                self._command(cmd)
+        else:
+            self._data(buf)
+
+    def _command(self, cmd):
+        self._finish_command()
+        self.command_count += 1
+        self._cmd = cmd
+        self._payload = bytearray()
+
+        if cmd == 0x10 or cmd == 0x13:
+            self._ram = self.ram1 if cmd == 0x10 else self.ram2
+            self._ram_pos = 0
+        elif cmd == 0x91:
+            self.partial_mode = True
+        elif cmd == 0x92:
+            self.partial_mode = False
+            self.window = (0, 0, self.width - 1, self.height - 1)
+        elif cmd == 0x04:
+            self.powered = True
+            self._start_busy(cmd, self.busy_ms.get(cmd, 0))
+        elif cmd == 0x02:
+            self.powered = False
+            self._start_busy(cmd, self.busy_ms.get(cmd, 0))
+        elif cmd == 0x12:
+            self._refresh()
+
+    def _data(self, buf):
+        self.data_bytes += len(buf)
+        if self._cmd == 0x10 or self._cmd == 0x13:
+            self._write_ram(buf)
+        if self.keep_log or (self._cmd != 0x10 and self._cmd != 0x13):
+            self._payload.extend(buf)
+        if self._cmd == 0x07 and self._payload[:1] == b'\xa5':
+            self.asleep = True # 校验字节一到就进入深度睡眠，不等下一个命令
+
+    def _finish_command(self):
+        cmd = self._cmd
+        if cmd is None:
+            return
+        payload = self._payload
+        if cmd != 0x10 and cmd != 0x13:
+            self.registers[cmd] = bytes(payload)
+        if cmd == 0x90 and len(payload) >= 6:
+            x_start = payload[0] & 0xF8
+            x_end = payload[1] | 0x07
+            y_start = (payload[2] << 8) | payload[3]
+            y_end = (payload[4] << 8) | payload[5]
+            self.window = (x_start, y_start, min(x_end, self.width - 1), min(y_end, self.height - 1))
+        elif cmd == 0x07 and payload[:1] == b'\xa5':
+            self.asleep = True
+        if self.keep_log:
+            self.log.append((cmd, bytes(payload)))
+        self._cmd = None
+        self._payload = bytearray()
+
+    def _ram_window(self):
+        if self.partial_mode:
+            return self.window
+        return 0, 0, self.width - 1, self.height - 1
+
+    def _write_ram(self, buf):
+        x_start, y_start, x_end, y_end = self._ram_window()
+        col_start = x_start // 8
+        cols = x_end // 8 - col_start + 1
+        rows = y_end - y_start + 1
+        ram = self._ram
+        pos = self._ram_pos
+        for b in bytes(buf):
+            if pos >= cols * rows:
+                break # 超出窗口的数据被控制器丢弃
+            row, col = divmod(pos, cols)
+            ram[(y_start + row) * self.width_bytes + col_start + col] = b
+            pos += 1
+        self._ram_pos = pos
+
+    def _refresh(self):
+        if not self.powered:
+            self.errors.append("DISPLAY REFRESH while powered off")
+        # 刷新只改变窗口内的像素：显示内容变为 RAM2 (新数据)
+        x_start, y_start, x_end, y_end = self._ram_window()
+        col_start = x_start // 8
+        col_end = x_end // 8 + 1
+        for row in range(y_start, y_end + 1):
+            offset = row * self.width_bytes
+            self.display[offset + col_start:offset + col_end] = self.ram2[offset + col_start:offset + col_end]
+        self.refresh_count += 1
+        if self.partial_mode:
+            self.partial_refresh_count += 1
+            self._start_busy(0x12, self.partial_refresh_ms)
+        else:
+            self._start_busy(0x12, self.busy_ms.get(0x12, 0))
+
+    # --- 画面解码 ---
+    def frame(self, plane="display"):
+        """返回画面缓冲区的副本 (面板极性)：plane 可为 "display"、"ram1" 或 "ram2" """
+        return bytes(getattr(self, plane))
+
+    def pixel(self, x, y, plane="display"):
+        """返回物理坐标 (x, y) 的像素：1 为白色，0 为黑色"""
+        buf = getattr(self, plane)
+        return (buf[y * self.width_bytes + x // 8] >> (7 - x % 8)) & 1
+
+    def to_pbm(self, plane="display"):
+        """编码为二进制 PBM (P4)，PBM 中 1 为黑色，因此需要取反"""
+        buf = getattr(self, plane)
+        header = f"P4\n{self.width} {self.height}\n".encode()
+        return header + bytes((~b) & 0xFF for b in buf)
+
+    def to_png(self, plane="display"):
+        """编码为 1 位灰度 PNG，PNG 中 1 为白色，与面板极性一致"""
+        import struct
+        import zlib
+
+        def chunk(kind, data):
+            body = kind + data
+            return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+        buf = getattr(self, plane)
+        raw = bytearray()
+        for row in range(self.height):
+            raw.append(0) # 过滤类型: None
+            raw.extend(buf[row * self.width_bytes:(row + 1) * self.width_bytes])
+        ihdr = struct.pack(">IIBBBBB", self.width, self.height, 1, 0, 0, 0, 0)
+        return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr)
+                + chunk(b"IDAT", zlib.compress(bytes(raw), 9)) + chunk(b"IEND", b""))
+
+    def save_pbm(self, path, plane="display"):
+        with open(path, "wb") as f:
+            f.write(self.to_pbm(plane))
+
+    def save_png(self, path, plane="display"):
+        with open(path, "wb") as f:
+            f.write(self.to_png(plane))
+
+
+class _SimRTC():
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def datetime(self, *args):
+        if not args:
+            t = time.localtime()
+            return (t[0], t[1], t[2], t[6], t[3], t[4], t[5], 0)
+
+
+def install_machine(panel, busy=8, cs=9, dc=10, res=11):
+    """
+    注册一个模拟的 machine 模块，让直接使用 machine.Pin / machine.SPI 的脚本 (如 weather_dock/main.py)
+    不经修改即可在主机上运行。引脚编号默认与 weather_dock/config.py 一致，对应编号的 Pin 会映射到面板的引脚。
+    """
+    roles = {busy: panel.busy, cs: panel.cs, dc: panel.dc, res: panel.res}
+
+    class Pin():
+        IN = 0
+        OUT = 1
+        PULL_UP = 2
+        IRQ_RISING = 1
+        IRQ_FALLING = 2
+
+        def __new__(cls, pin_id, *args, **kwargs):
+            if pin_id in roles:
+                return roles[pin_id]
+            return SimPin(0)
+
+    def SPI(*args, **kwargs):
+        return panel.spi
+
+    module = type(sys)("machine")
+    module.Pin = Pin
+    module.SPI = SPI
+    module.RTC = _SimRTC
+    sys.modules["machine"] = module
+    return module
@@ -0,0 +1,33 @@
+# 测试在主机 (CPython) 上通过 il0373_sim.SimPanel 运行，不需要开发板：
+#     python -m pytest -q
+# 每个用例都分别在英文版 (il0373) 和中文版 (il0373_cn) 驱动上运行。
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHINESE = os.path.join(ROOT, "chinese")
+for path in (CHINESE, ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from il0373_sim import SimPanel
+
+
+@pytest.fixture(params=["il0373", "il0373_cn"])
+def driver(request, monkeypatch):
+    # 中文版构造 IL0373 时从当前目录加载 BMF 字体
+    monkeypatch.chdir(CHINESE)
+    return importlib.import_module(request.param)
+
+
+@pytest.fixture
+def make_epd(driver):
+    """返回 make(**kwargs) -> (epd, panel)，epd 连接到一块新的模拟面板"""
+    def make(panel=None, **kwargs):
+        panel = panel or SimPanel()
+        kwargs.setdefault("log_level", driver.LogLevel.OFF)
+        return driver.IL0373(*panel.pins(), **kwargs), panel
+    return make
@@ -0,0 +1,14 @@
+# 测试共用的像素工具函数
+
+
+def black(img, width, height):
+    """帧缓冲 (面板极性，1 为白色) 中所有黑色像素的物理坐标集合"""
+    width_bytes = (width + 7) // 8
+    return {(x, y) for y in range(height) for x in range(width)
+            if not (img[y * width_bytes + (x >> 3)] >> (7 - (x & 7))) & 1}
+
+
+def inside(rect, pixels):
+    """pixels 中的每个坐标是否都在矩形 (x_start, y_start, x_end, y_end) 内 (含端点)"""
+    x0, y0, x1, y1 = rect
+    return all(x0 <= x <= x1 and y0 <= y <= y1 for x, y in pixels)
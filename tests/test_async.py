@@ -0,0 +1,50 @@
+# update_async：等待 BUSY 时让出控制权，结束后画面与同步 update() 相同
+import asyncio
+
+from il0373_sim import SimPanel
+from test_update import draw_frames
+
+
+def test_update_async_matches_paint(make_epd, driver):
+    epd, panel = make_epd()
+
+    async def run():
+        await epd.update_async()
+        for i, draw in enumerate(draw_frames(epd, driver.Color)):
+            draw()
+            await epd.update_async(partial=i % 2 == 0)
+            assert bytes(panel.display) == bytes(epd.paint.img)
+
+    asyncio.run(run())
+    assert not panel.errors
+
+
+def test_other_tasks_run_during_busy(make_epd, driver):
+    # 全刷在模拟面板上保持 BUSY 30 ms，期间另一个任务应当多次运行
+    epd, panel = make_epd(panel=SimPanel(time_scale=0.01))
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(epd.refreshing)
+            await asyncio.sleep(0.002)
+
+    async def run():
+        task = asyncio.create_task(ticker())
+        epd.draw_point(5, 5)
+        await epd.update_async()
+        task.cancel()
+
+    asyncio.run(run())
+    assert ticks.count(True) >= 3 # 刷新进行中仍在运行
+    assert bytes(panel.display) == bytes(epd.paint.img) and not panel.errors
+
+
+def test_update_gray_async(make_epd, driver):
+    epd, panel = make_epd()
+    gray = epd.gray_paint()
+    gray.draw_rectangle(0, 0, 40, 40, driver.Color.DARK_GRAY, filled=True)
+    asyncio.run(epd.update_gray_async(gray))
+    assert epd.get_update_records()[-1]["mode"] == "gray"
+    assert panel.frame("ram1") == bytes(gray.hi.img) and panel.frame("ram2") == bytes(gray.lo.img)
+    assert not panel.errors
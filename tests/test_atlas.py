@@ -0,0 +1,80 @@
+# 预渲染字形图集：NORMAL / BOLD / OUTLINE 与 show_string 绘制的结果一致
+import pytest
+
+import il0373_cn
+from il0373_cn import Color, GlyphStyle
+from conftest import CHINESE
+from il0373_sim import SimPanel
+from pixels import black, inside
+
+WIDTH = HEIGHT = 152
+TEXT = "23.4°C 晴%"
+X, Y = 5, 30
+
+
+@pytest.fixture
+def make_epd(monkeypatch):
+    monkeypatch.chdir(CHINESE)
+    epds = []
+
+    def make():
+        panel = SimPanel()
+        epd = il0373_cn.IL0373(*panel.pins(), rotate=il0373_cn.Rotate.ROTATE_0)
+        epds.append(epd)
+        return epd
+    yield make
+    for epd in epds:
+        epd.bmf_font.font.close()
+
+
+def drawn(epd):
+    return black(epd.paint.img, WIDTH, HEIGHT)
+
+
+def reference(make_epd, multiplier, offsets=((0, 0),), text=TEXT):
+    epd = make_epd()
+    for dx, dy in offsets:
+        epd.show_string(text, X + dx, Y + dy, multiplier=multiplier)
+    return drawn(epd)
+
+
+@pytest.mark.parametrize("multiplier", [1, 2, 3])
+def test_normal_matches_show_string(make_epd, multiplier):
+    epd = make_epd()
+    atlas = epd.glyph_atlas("0123456789.°C", multiplier)
+    width = epd.show_glyphs(atlas, TEXT, X, Y) # "晴" 和 "%" 不在图集中，第一次绘制时渲染
+    assert drawn(epd) == reference(make_epd, multiplier)
+    assert width == atlas.text_width(TEXT) == epd.get_string_display_width(TEXT, multiplier=multiplier)
+    assert inside(atlas.bounds(TEXT, X, Y), drawn(epd))
+
+
+@pytest.mark.parametrize("multiplier", [1, 2])
+def test_bold_matches_four_offsets(make_epd, multiplier):
+    epd = make_epd()
+    atlas = epd.glyph_atlas(TEXT, multiplier, GlyphStyle.BOLD)
+    epd.show_glyphs(atlas, TEXT, X, Y)
+    assert drawn(epd) == reference(make_epd, multiplier, ((0, 0), (1, 0), (0, 1), (1, 1)))
+    assert inside(atlas.bounds(TEXT, X, Y), drawn(epd))
+
+
+@pytest.mark.parametrize("multiplier", [1, 2])
+def test_outline_is_dilation_minus_glyph(make_epd, multiplier):
+    epd = make_epd()
+    atlas = epd.glyph_atlas(TEXT, multiplier, GlyphStyle.OUTLINE)
+    epd.show_glyphs(atlas, TEXT, X, Y)
+    glyphs = reference(make_epd, multiplier)
+    grown = {(x + dx, y + dy) for x, y in glyphs for dx in (-1, 0, 1) for dy in (-1, 0, 1)}
+    assert drawn(epd) == grown - glyphs
+    assert inside(atlas.bounds(TEXT, X, Y), drawn(epd))
+
+
+def test_white_glyphs_and_size(make_epd):
+    epd = make_epd()
+    atlas = epd.glyph_atlas("0123456789", 2)
+    size = atlas.size_bytes()
+    assert size > 0
+    epd.clear(Color.BLACK)
+    epd.show_glyphs(atlas, "42", X, Y, color=Color.WHITE)
+    white = {(x, y) for x in range(WIDTH) for y in range(HEIGHT)} - drawn(epd)
+    assert white == reference(make_epd, 2, text="42")
+    assert atlas.size_bytes() == size # 图集中已有的字符不再渲染
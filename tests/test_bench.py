@@ -0,0 +1,35 @@
+# 基准测试脚本能在模拟面板上运行，并且两个驱动都被测量
+import os
+import sys
+
+import pytest
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+@pytest.fixture
+def bench(monkeypatch):
+    # bench._host_setup() 会切换工作目录并注册模拟的 machine 和网络模块，测试结束后全部还原
+    monkeypatch.chdir(os.getcwd())
+    monkeypatch.setattr(sys, "path", [BENCHMARKS] + sys.path)
+    before = set(sys.modules)
+    import bench
+    yield bench
+    for name in set(sys.modules) - before:
+        del sys.modules[name]
+
+
+def test_run_measures_both_drivers(bench):
+    report = bench.run(only=["fill_screen", "draw_circle_filled", "cjk_100", "update_mem"], repeat=1,
+                       sim=True, verbose=False)
+    names = [result["name"] for result in report["results"]]
+    assert names == ["fill_screen", "fill_screen_en", "draw_circle_filled", "draw_circle_filled_en", "cjk_100",
+                     "update_mem", "update_mem_en"]
+    for result in report["results"]:
+        assert "skipped" not in result and result["us_per_op"] > 0
+    assert report["backend"] == "sim" and report["panel"]["errors"] == 0 and report["panel_en"]["errors"] == 0
+
+
+def test_only_accepts_suffixed_names(bench):
+    report = bench.run(only=["draw_line_en"], repeat=1, sim=True, verbose=False)
+    assert [result["name"] for result in report["results"]] == ["draw_line_en"]
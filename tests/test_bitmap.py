@@ -0,0 +1,69 @@
+# 位图：按行打包的 1bpp 数据 (pack_bitmap / load_pbm) 与 0/1 列表绘制结果相同
+import random
+
+import pytest
+
+W, H = 24, 16
+
+
+def random_bitmap(width, height, seed):
+    rng = random.Random(seed)
+    return [[rng.randrange(2) for _ in range(width)] for _ in range(height)]
+
+
+def write_pbm(path, bitmap, binary=True):
+    height, width = len(bitmap), len(bitmap[0])
+    with open(path, "wb") as f:
+        if binary:
+            f.write(b"P4\n# test\n%d %d\n" % (width, height))
+            for row in bitmap:
+                for i in range(0, width, 8):
+                    chunk = row[i:i + 8]
+                    f.write(bytes((sum(b << (7 - j) for j, b in enumerate(chunk)),)))
+        else:
+            f.write(b"P1\n%d %d\n" % (width, height))
+            for row in bitmap:
+                f.write(b" ".join(b"1" if b else b"0" for b in row) + b"\n")
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_load_pbm_matches_pack_bitmap(driver, tmp_path, binary):
+    bitmap = random_bitmap(21, 7, binary)
+    path = str(tmp_path / "icon.pbm")
+    write_pbm(path, bitmap, binary)
+    assert driver.load_pbm(path) == driver.pack_bitmap(bitmap)
+
+
+@pytest.mark.parametrize("rotate", range(4))
+@pytest.mark.parametrize("multiplier", [1, 2, 3])
+@pytest.mark.parametrize("x_start, y_start", [(0, 0), (5, 3), (-4, -2), (20, 12)])
+def test_packed_matches_list(driver, rotate, multiplier, x_start, y_start):
+    Color = driver.Color
+    bitmap = random_bitmap(11, 5, rotate * 100 + multiplier * 10 + x_start)
+    data, width, height = driver.pack_bitmap(bitmap)
+    assert (width, height) == (11, 5)
+    for color in (Color.BLACK, Color.WHITE):
+        background = Color.WHITE if color == Color.BLACK else Color.BLACK
+        packed = driver.Paint(driver.Screen(W, H), rotate=rotate, bg_color=background)
+        listed = driver.Paint(driver.Screen(W, H), rotate=rotate, bg_color=background)
+        expected = driver.Paint(driver.Screen(W, H), rotate=rotate, bg_color=background)
+        packed.show_bitmap(data, x_start, y_start, multiplier, color, width=width)
+        listed.show_bitmap(bitmap, x_start, y_start, multiplier, color)
+        # 逐像素的参考实现：1 画成 color，0 保持背景，超出画布的部分裁掉
+        for y, row in enumerate(bitmap):
+            for x, b in enumerate(row):
+                for dy in range(multiplier):
+                    for dx in range(multiplier):
+                        px, py = x_start + x * multiplier + dx, y_start + y * multiplier + dy
+                        if b and 0 <= px < expected.width and 0 <= py < expected.height:
+                            expected.draw_point(px, py, color)
+        assert bytes(packed.img) == bytes(expected.img)
+        assert bytes(listed.img) == bytes(expected.img)
+
+
+def test_empty_bitmap_draws_nothing(driver):
+    paint = driver.Paint(driver.Screen(W, H))
+    paint.reset_dirty()
+    paint.show_bitmap([], 0, 0)
+    paint.show_bitmap(b"", 0, 0, width=8)
+    assert paint.dirty is None and set(paint.img) == {0xFF}
@@ -0,0 +1,129 @@
+# BMF 字体：点阵 LRU 缓存、内存中的码位索引以及墨迹度量表
+import os
+
+import pytest
+
+import il0373_cn
+from il0373_cn import BMFont
+from il0373_sim import SimPanel
+from pixels import black
+
+FONT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "chinese",
+                    "fusion-pixel-12-6881-12.v3.bmf")
+SAMPLE = "温度23.4°C 晴天 Hello!"
+
+
+@pytest.fixture
+def font():
+    font = BMFont(FONT, cache_bytes=0)
+    yield font
+    font.font.close()
+
+
+def test_cached_bitmaps_match_file(font):
+    cached = BMFont(FONT, cache_bytes=4096)
+    for char in SAMPLE * 2:
+        assert cached.get_bitmap(char) == font.get_bitmap(char)
+    info = cached.cache_info()
+    assert info["misses"] == len(set(SAMPLE)) and info["hits"] == len(SAMPLE) * 2 - info["misses"]
+    assert info["entries"] == len(set(SAMPLE)) and info["used_bytes"] <= info["budget_bytes"]
+    cached.font.close()
+
+
+def test_lru_eviction(font):
+    size = font.bitmap_size
+    cache = BMFont(FONT, cache_bytes=3 * size)
+    for char in "温度晴":
+        cache.get_bitmap(char)
+    cache.get_bitmap("温") # 最近使用，不会被淘汰
+    cache.get_bitmap("天") # 超出预算，淘汰最久未使用的 "度"
+    assert cache.cache_info()["entries"] == 3 and cache.cache_used == 3 * size
+    misses = cache.cache_misses
+    cache.get_bitmap("温")
+    cache.get_bitmap("晴")
+    assert cache.cache_misses == misses
+    cache.get_bitmap("度")
+    assert cache.cache_misses == misses + 1
+    cache.font.close()
+
+
+def test_cache_budget_limits(font):
+    # 预算为 0 时不缓存；比预算大的点阵直接返回
+    for char in "温温":
+        font.get_bitmap(char)
+    assert font.cache_info()["entries"] == 0 and font.cache_misses == 2
+    small = BMFont(FONT, cache_bytes=font.bitmap_size - 1)
+    assert small.get_bitmap("温") == font.get_bitmap("温")
+    assert small.cache_used == 0
+    small.clear_cache()
+    assert small.cache_info()["entries"] == 0
+    small.font.close()
+
+
+def test_epd_glyph_cache_budget(monkeypatch):
+    monkeypatch.chdir(os.path.dirname(FONT))
+    panel = SimPanel()
+    epd = il0373_cn.IL0373(*panel.pins(), glyph_cache_bytes=5 * 24)
+    epd.show_string("温度温度温度", 0, 0)
+    info = epd.bmf_font.cache_info()
+    # 每个字第一次用到时读取一次点阵，之后绘制和墨迹度量都命中缓存
+    assert info["budget_bytes"] == 120 and info["misses"] == 2 and info["entries"] == 2
+    epd.bmf_font.font.close()
+
+
+def test_index_in_ram_matches_file(font):
+    # 内存中的码位索引 (连续段直接计算 + 二分查找) 与逐次读文件的查找结果相同
+    in_ram = BMFont(FONT, cache_bytes=0, index_in_ram=True)
+    with open(os.path.join(os.path.dirname(FONT), "text_6881.txt"), encoding="utf-8") as f:
+        chars = f.read()
+    indexes = set()
+    for char in chars:
+        index = in_ram._get_index(char)
+        assert index == font._get_index(char) and index >= 0, char
+        indexes.add(index)
+    assert len(indexes) == len(chars)
+    for char in "\x01龘\uffff": # 字体中没有的字
+        assert in_ram._get_index(char) == font._get_index(char) == -1
+    assert any(first <= ord("A") <= last for first, last, _ in in_ram._dense_ranges)
+    assert in_ram.get_bitmap("温") == font.get_bitmap("温")
+    in_ram.font.close()
+
+
+def reference_ink(font, char):
+    # 逐像素找出有墨迹的列
+    size = font.font_size
+    stride = (size + 7) // 8
+    bitmap = font.get_bitmap(char)
+    cols = [col for col in range(size)
+            if any((bitmap[row * stride + col // 8] >> (7 - col % 8)) & 1 for row in range(size))]
+    return (cols[0], cols[-1] - cols[0] + 1) if cols else (0, 0)
+
+
+def test_ink_metrics_are_memoized(font, monkeypatch):
+    for char in SAMPLE + "龘":
+        assert font.get_ink(char) == reference_ink(font, char), char
+        assert font.get_ink_width(char) == reference_ink(font, char)[1]
+    assert font.get_ink(" ") == (0, 0)
+    # 度量表建立之后测量不再读取点阵
+    monkeypatch.setattr(font, "get_bitmap", lambda char: pytest.fail("bitmap read for " + char))
+    for char in SAMPLE:
+        font.get_ink(char)
+        font.get_ink_width(char)
+    monkeypatch.undo()
+    font.clear_cache()
+    assert not font._metrics
+
+
+def test_string_width_matches_show_string(monkeypatch):
+    # 宽度只查度量表：等于各字墨迹宽度 (空白字符为半个字宽) 加 1 像素间距，最后一个字的墨迹紧挨着间距
+    monkeypatch.chdir(os.path.dirname(FONT))
+    panel = SimPanel()
+    epd = il0373_cn.IL0373(*panel.pins())
+    text = "温度 23.4°C"
+    for multiplier in (1, 2):
+        width = epd.get_string_display_width(text, multiplier)
+        assert width == sum(((reference_ink(epd.bmf_font, c)[1] or 6) + 1) * multiplier for c in text)
+        epd.clear(il0373_cn.Color.WHITE)
+        epd.show_string(text, 0, 0, multiplier=multiplier)
+        assert max(x for x, _ in black(epd.paint.img, 152, 152)) == width - multiplier - 1
+    epd.bmf_font.font.close()
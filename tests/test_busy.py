@@ -0,0 +1,55 @@
+# BUSY 等待：按 busy_timing 自适应轮询、超时和每次等待的记录
+import pytest
+
+from il0373_sim import SimPanel
+
+
+def count_polls(epd, monkeypatch):
+    polls = []
+    value = epd.busy.value
+    monkeypatch.setattr(epd.busy, "value", lambda: (polls.append(1), value())[1])
+    return polls
+
+
+def test_waits_are_recorded_per_kind(make_epd, driver):
+    epd, _ = make_epd()
+    epd.draw_point(1, 1)
+    epd.update()
+    epd.draw_point(2, 2)
+    epd.update(partial=True)
+    full, partial = epd.get_update_records()[-2:]
+    assert [kind for kind, _ in full["waits"]] == ["power_on", "refresh", "power_off"]
+    assert [kind for kind, _ in partial["waits"]] == ["power_on", "partial", "power_off"]
+    for record in (full, partial):
+        assert record["busy"] == sum(waited for _, waited in record["waits"])
+
+
+def test_overrunning_refresh_backs_off(make_epd, monkeypatch):
+    # 面板刷新比 busy_timing 预计的慢得多：超过预计时间后轮询间隔要重新变长，而不是一直 1ms
+    epd, panel = make_epd(SimPanel(busy_ms={0x12: 600}, time_scale=1.0))
+    epd.busy_timing["refresh"] = (50, 30000)
+    epd.update() # 先完成一次刷新，只统计下面这次
+    polls = count_polls(epd, monkeypatch)
+    epd.draw_point(1, 1)
+    epd.update()
+    assert len(polls) < 80
+    assert bytes(panel.display) == bytes(epd.paint.img)
+    assert not panel.errors
+
+
+def test_poll_interval_bounds(make_epd):
+    epd, _ = make_epd()
+    for expected in (0, 40, 400, 3000):
+        for elapsed in range(0, 5000, 7):
+            interval = epd._poll_interval(elapsed, expected)
+            assert 1 <= interval <= 100
+            if elapsed > expected + 200:
+                assert interval == 50
+
+
+def test_busy_timeout_raises(make_epd, driver):
+    epd, panel = make_epd(SimPanel(busy_ms={0x12: 1000}, time_scale=1.0))
+    epd.busy_timing["refresh"] = (50, 100)
+    epd.draw_point(1, 1)
+    with pytest.raises(driver.TimeoutError):
+        epd.update()
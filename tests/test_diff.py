@@ -0,0 +1,57 @@
+# 与上一次显示的画面比较：相同的画面跳过，变化区域按实际不同的字节收缩
+import random
+
+from pixels import inside
+
+
+def test_identical_frame_is_skipped(make_epd, driver):
+    epd, panel = make_epd()
+    epd.draw_circle(50, 50, 10, driver.Color.BLACK)
+    epd.update()
+    panel.reset_stats()
+
+    epd.update()
+    assert epd.get_update_records()[-1]["mode"] == "skipped"
+    # 画了又擦掉：脏区域不为空，但画面与已显示的相同
+    epd.draw_rectangle(0, 0, 30, 30, driver.Color.BLACK, filled=True)
+    epd.draw_rectangle(0, 0, 30, 30, driver.Color.WHITE, filled=True)
+    epd.update(partial=True)
+    assert epd.get_update_records()[-1]["mode"] == "skipped"
+    assert panel.command_count == 0 and panel.refresh_count == 0
+
+
+def test_window_shrinks_to_changed_bytes(make_epd, driver):
+    epd, _ = make_epd()
+    epd.update()
+    epd.draw_rectangle(0, 0, 100, 100, driver.Color.BLACK, filled=True)
+    epd.draw_rectangle(0, 0, 100, 100, driver.Color.WHITE, filled=True)
+    epd.draw_point(42, 77)
+    assert epd.get_dirty_rect() == (0, 0, 100, 100)
+    epd.update(partial=True)
+    assert epd.get_update_records()[-1]["window"] == (40, 77, 47, 77)
+
+
+def test_changes_stay_inside_dirty_box(make_epd, driver):
+    # 不变量：_shown 有效时，与 _shown 不同的字节都在脏区域内，只在脏区域内比较不会漏掉修改
+    epd, panel = make_epd()
+    epd.update()
+    rng = random.Random(4)
+    width_bytes = epd.screen.width_bytes
+    for step in range(30):
+        x, y = rng.randrange(152), rng.randrange(152)
+        kind = rng.randrange(4)
+        if kind == 0:
+            epd.draw_rectangle(x, y, x + rng.randrange(30), y + rng.randrange(30), driver.Color.BLACK, filled=True)
+        elif kind == 1:
+            epd.draw_circle(x, y, rng.randrange(1, 20), driver.Color.WHITE, filled=True)
+        elif kind == 2:
+            epd.update_partial(x, y, x + rng.randrange(40), y + rng.randrange(40))
+        else:
+            epd.update(partial=rng.randrange(2) == 1)
+        changed = {(col * 8, row) for row in range(152) for col in range(width_bytes)
+                   if epd.paint.img[row * width_bytes + col] != epd._shown[row * width_bytes + col]}
+        if changed:
+            x0, y0, x1, y1 = epd.get_dirty_rect()
+            assert inside((x0 & 0xF8, y0, x1, y1), changed), step
+    epd.update(partial=True)
+    assert bytes(panel.display) == bytes(epd.paint.img)
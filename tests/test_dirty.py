@@ -0,0 +1,84 @@
+# 脏区域：必须覆盖每一个被修改的像素，显式窗口的局刷不能丢掉窗口外的修改
+import random
+
+import pytest
+
+from pixels import black, inside
+
+W, H = 24, 16
+
+
+@pytest.mark.parametrize("rotate", range(4))
+def test_dirty_box_covers_changes(driver, rotate):
+    Color = driver.Color
+    paint = driver.Paint(driver.Screen(W, H), rotate=rotate)
+    w, h = paint.width, paint.height
+    rng = random.Random(rotate)
+    data = bytes(rng.randrange(256) for _ in range(2 * 4))
+    ops = [
+        lambda: paint.draw_point(w - 1, h - 1),
+        lambda: paint.draw_point(-1, 3), # 画布外，不改变任何像素
+        lambda: paint.draw_line(-5, 2, w + 4, h - 3),
+        lambda: paint.draw_line(3, h + 2, 3, -2),
+        lambda: paint.draw_rectangle(w - 3, -2, w + 5, 4, filled=True),
+        lambda: paint.draw_rectangle(2, 2, w - 3, h - 3),
+        lambda: paint.draw_circle(w // 2, h // 2, 6, filled=True),
+        lambda: paint.draw_circle(0, 0, 5, Color.WHITE),
+        lambda: paint.show_packed(data, 12, 4, -3, h - 2, multiplier=2),
+        lambda: paint.show_packed(data, 12, 4, 5, 5, invert=True, color=Color.WHITE),
+        lambda: paint.show_bitmap([[1, 1], [1, 0]], w - 1, 0, multiplier=3),
+        lambda: paint.clear(Color.BLACK),
+    ]
+    for op in ops:
+        before = bytes(paint.img)
+        paint.reset_dirty()
+        op()
+        changed = black(before, W, H) ^ black(paint.img, W, H)
+        if changed:
+            assert paint.dirty is not None and inside(paint.dirty, changed)
+
+
+def test_text_marks_dirty(make_epd):
+    epd, _ = make_epd(rotate=1)
+    epd.update()
+    before = bytes(epd.paint.img)
+    epd.show_string("12:34", 30, 50, multiplier=2)
+    changed = black(before, 152, 152) ^ black(epd.paint.img, 152, 152)
+    assert changed and inside(epd.get_dirty_rect(), changed)
+
+
+def test_update_clears_dirty(make_epd):
+    epd, _ = make_epd()
+    assert epd.get_dirty_rect() is None
+    epd.draw_point(10, 20)
+    assert epd.get_dirty_rect() == (10, 20, 10, 20)
+    epd.update()
+    assert epd.get_dirty_rect() is None
+
+
+@pytest.mark.parametrize("double_buffer", [False, True])
+def test_partial_window_keeps_outside_changes(make_epd, double_buffer):
+    # 显式窗口的局刷只刷新窗口内；窗口外的修改必须留给下一次 update()
+    epd, panel = make_epd(double_buffer=double_buffer)
+    epd.update()
+    epd.draw_point(0, 0)
+    epd.draw_point(100, 100)
+    epd.update_partial(0, 0, 23, 23)
+    assert epd.get_dirty_rect() is not None
+    epd.update(partial=True)
+    assert epd.get_update_records()[-1]["mode"] == "partial"
+    assert bytes(panel.display) == bytes(epd.paint.img)
+
+    epd.draw_point(2, 2)
+    epd.draw_point(140, 5)
+    epd.update_window(0, 0, 10, 10)
+    epd.update(partial=True)
+    assert bytes(panel.display) == bytes(epd.paint.img)
+
+    # 脏区域完全在窗口内时会被清除，下一次 update() 跳过
+    epd.draw_point(5, 5)
+    epd.update_partial(0, 0, 7, 7)
+    assert epd.get_dirty_rect() is None
+    epd.update(partial=True)
+    assert epd.get_update_records()[-1]["mode"] == "skipped"
+    assert bytes(panel.display) == bytes(epd.paint.img)
@@ -0,0 +1,41 @@
+# 双缓冲：刷新期间在 paint 上绘制下一帧不会影响正在上传和刷新的画面
+import asyncio
+
+import pytest
+
+from il0373_sim import SimPanel
+from test_update import draw_frames
+
+
+@pytest.mark.parametrize("partial", [False, True])
+def test_double_buffered_updates_match_paint(make_epd, driver, partial):
+    epd, panel = make_epd(double_buffer=True)
+    epd.update()
+    for draw in draw_frames(epd, driver.Color):
+        draw()
+        epd.update(partial=partial)
+        assert bytes(panel.display) == bytes(epd.paint.img)
+    assert not panel.errors
+
+
+@pytest.mark.parametrize("partial", [False, True])
+def test_double_buffer_does_not_tear(make_epd, driver, partial):
+    # 刷新任务一开始运行就可以绘制下一帧
+    epd, panel = make_epd(panel=SimPanel(time_scale=0.01), double_buffer=True)
+    epd.update()
+    Color = driver.Color
+
+    async def run():
+        epd.draw_rectangle(0, 0, 40, 40, Color.BLACK, filled=True)
+        expected = bytes(epd.paint.img)
+        task = asyncio.create_task(epd.update_async(partial=partial))
+        await asyncio.sleep(0)
+        assert not task.done()
+        epd.clear(Color.BLACK) # 刷新进行中修改整个画布
+        await task
+        assert bytes(panel.display) == expected
+        await epd.update_async(partial=partial)
+        assert bytes(panel.display) == bytes(epd.paint.img)
+
+    asyncio.run(run())
+    assert not panel.errors
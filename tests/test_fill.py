@@ -0,0 +1,56 @@
+# 按扫描线填充的矩形和圆必须与逐点绘制的结果相同
+import random
+
+import pytest
+
+W, H = 40, 24
+
+
+def reference(driver, rotate, spans, color):
+    # 用 draw_point 逐点画出逻辑坐标的水平线段 [(y, x_start, x_end), ...]
+    paint = driver.Paint(driver.Screen(W, H), rotate=rotate)
+    paint.clear(driver.Color.BLACK if color == driver.Color.WHITE else driver.Color.WHITE)
+    for y, x_start, x_end in spans:
+        for x in range(x_start, x_end + 1):
+            paint.draw_point(x, y, color)
+    return paint
+
+
+def circle_spans(x_center, y_center, radius):
+    # 与 draw_circle 相同的中点圆算法，产生填充所需的水平线段
+    spans = []
+    x, y, d = 0, radius, 3 - 2 * radius
+    while x <= y:
+        spans += [(y_center + y, x_center - x, x_center + x), (y_center - y, x_center - x, x_center + x),
+                  (y_center + x, x_center - y, x_center + y), (y_center - x, x_center - y, x_center + y)]
+        if d < 0:
+            d += 4 * x + 6
+        else:
+            d += 4 * (x - y) + 10
+            y -= 1
+        x += 1
+    return spans
+
+
+@pytest.mark.parametrize("rotate", range(4))
+def test_filled_rectangles(driver, rotate):
+    rng = random.Random(rotate)
+    for _ in range(40):
+        x0, x1 = rng.randrange(-5, W + 5), rng.randrange(-5, W + 5)
+        y0, y1 = rng.randrange(-5, H + 5), rng.randrange(-5, H + 5)
+        color = rng.choice((driver.Color.BLACK, driver.Color.WHITE))
+        expected = reference(driver, rotate, [(y, min(x0, x1), max(x0, x1)) for y in range(min(y0, y1), max(y0, y1) + 1)],
+                             color)
+        paint = driver.Paint(driver.Screen(W, H), rotate=rotate)
+        paint.clear(driver.Color.BLACK if color == driver.Color.WHITE else driver.Color.WHITE)
+        paint.draw_rectangle(x0, y0, x1, y1, color, filled=True)
+        assert bytes(paint.img) == bytes(expected.img), (x0, y0, x1, y1)
+
+
+@pytest.mark.parametrize("rotate", range(4))
+@pytest.mark.parametrize("x_center, y_center, radius", [(12, 12, 0), (12, 12, 1), (12, 11, 9), (2, 20, 7), (30, 3, 12)])
+def test_filled_circles(driver, rotate, x_center, y_center, radius):
+    paint = driver.Paint(driver.Screen(W, H), rotate=rotate)
+    paint.draw_circle(x_center, y_center, radius, driver.Color.BLACK, filled=True)
+    expected = reference(driver, rotate, circle_spans(x_center, y_center, radius), driver.Color.BLACK)
+    assert bytes(paint.img) == bytes(expected.img)
@@ -0,0 +1,62 @@
+# 画面快照文件：save_frame / load_frame / show_frame
+import pytest
+
+
+def test_save_and_load_frame(make_epd, driver, tmp_path):
+    path = str(tmp_path / "frame.epf")
+    epd, panel = make_epd()
+    epd.draw_circle(76, 76, 50, driver.Color.BLACK, filled=True)
+    epd.show_string("12:34", 46, 64, multiplier=2, color=driver.Color.WHITE)
+    epd.save_frame(path)
+    saved = bytes(epd.paint.img)
+
+    other, other_panel = make_epd()
+    other.load_frame(path)
+    assert bytes(other.paint.img) == saved
+    assert other.get_dirty_rect() == (0, 0, 151, 151)
+    other.update()
+    assert bytes(other_panel.display) == saved
+
+    # show_frame 不经过 paint 直接全刷快照；之后的 update() 与快照比较
+    third, third_panel = make_epd()
+    third.show_frame(path)
+    assert bytes(third_panel.display) == saved
+    third.update(partial=True)
+    assert bytes(third_panel.display) == bytes(third.paint.img)
+    assert not third_panel.errors
+
+
+def test_bad_frame_file_does_not_wake_panel(make_epd, tmp_path):
+    path = tmp_path / "bad.epf"
+    epd, panel = make_epd()
+    epd.save_frame(str(path))
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(TypeError):
+        epd.show_frame(str(path))
+    with pytest.raises(TypeError):
+        epd.load_frame(str(path))
+    assert panel.command_count == 0
+
+
+@pytest.mark.parametrize("policy", ["ALWAYS_SLEEP", "TIMEOUT"])
+def test_read_error_powers_off(make_epd, driver, tmp_path, policy):
+    # 校验通过之后读取失败：不能让高压一直开着，也不能把读了一半的 _shown 当作屏幕上的画面
+    path = str(tmp_path / "frame.epf")
+    epd, panel = make_epd(power_policy=getattr(driver.PowerPolicy, policy), sleep_after=3600)
+    epd.draw_point(3, 3)
+    epd.update()
+    epd.save_frame(path)
+
+    def fail(f, buf, path):
+        raise OSError(5)
+    epd._read_frame = fail
+    with pytest.raises(OSError):
+        epd.show_frame(path)
+    assert not epd.is_powered and not epd._shown_valid
+    assert epd.is_sleeping == (policy == "ALWAYS_SLEEP")
+    del epd._read_frame
+    epd.draw_point(5, 5)
+    epd.update(partial=True)
+    assert epd.get_update_records()[-1]["mode"] == "full"
+    assert bytes(panel.display) == bytes(epd.paint.img)
+    assert panel.writes_while_asleep == 0 and not panel.errors
@@ -0,0 +1,94 @@
+# 4 级灰度：split_gray、GrayPaint 的两个位平面和 update_gray
+import random
+
+import pytest
+
+from pixels import black
+
+
+def gray_code(data, width, x, y):
+    # 2bpp 位图中 (x, y) 的灰度码
+    return (data[y * ((width + 3) // 4) + x // 4] >> (6 - 2 * (x % 4))) & 3
+
+
+def bit(plane, x, y):
+    # GrayPaint 平面上逻辑坐标 (x, y) 的位
+    px, py = plane._convert_coor(x, y)
+    return (plane.img[py * plane.screen.width_bytes + px // 8] >> (7 - px % 8)) & 1
+
+
+def levels(Color):
+    return (Color.WHITE, Color.LIGHT_GRAY, Color.DARK_GRAY, Color.BLACK)
+
+
+@pytest.mark.parametrize("width", [1, 3, 4, 7, 8, 13, 48])
+def test_split_gray_matches_pixels(driver, width):
+    rng = random.Random(width)
+    height = 5
+    data = bytes(rng.randrange(256) for _ in range(((width + 3) // 4) * height))
+    hi, lo = driver.split_gray(data, width, height)
+    stride = (width + 7) // 8
+    for y in range(height):
+        for x in range(width):
+            code = gray_code(data, width, x, y)
+            assert (hi[y * stride + x // 8] >> (7 - x % 8)) & 1 == code >> 1
+            assert (lo[y * stride + x // 8] >> (7 - x % 8)) & 1 == code & 1
+
+
+@pytest.mark.parametrize("rotate", range(4))
+def test_gray_paint_planes(make_epd, driver, rotate):
+    epd, _ = make_epd(rotate=rotate)
+    gray = epd.gray_paint()
+    for i, color in enumerate(levels(driver.Color)):
+        gray.draw_rectangle(10 + i * 30, 10, 35 + i * 30, 40, color, filled=True)
+    for i, color in enumerate(levels(driver.Color)):
+        code = color & 3
+        assert bit(gray.hi, 20 + i * 30, 20) == code >> 1
+        assert bit(gray.lo, 20 + i * 30, 20) == code & 1
+    # split_gray 拆出的平面按原样绘制
+    width, height = 13, 6
+    rng = random.Random(rotate)
+    data = bytes(rng.randrange(256) for _ in range(((width + 3) // 4) * height))
+    hi, lo = driver.split_gray(data, width, height)
+    gray.show_planes(hi, lo, width, height, 100, 120, multiplier=2)
+    for y in range(height * 2):
+        for x in range(width * 2):
+            code = gray_code(data, width, x // 2, y // 2)
+            assert bit(gray.hi, 100 + x, 120 + y) << 1 | bit(gray.lo, 100 + x, 120 + y) == code
+
+
+@pytest.mark.parametrize("level", range(4))
+def test_gray_clear(make_epd, driver, level):
+    epd, _ = make_epd()
+    color = levels(driver.Color)[level]
+    gray = epd.gray_paint(bg_color=color)
+    code = color & 3
+    assert set(gray.hi.img) == {0xFF if code >> 1 else 0x00}
+    assert set(gray.lo.img) == {0xFF if code & 1 else 0x00}
+    # 1 位画布只有 BLACK 是黑色，灰度背景清成白色
+    epd.paint.clear(color)
+    width, height = epd.screen.width, epd.screen.height
+    assert bool(black(epd.paint.img, width, height)) == (color == driver.Color.BLACK)
+
+
+def test_update_gray(make_epd, driver):
+    epd, panel = make_epd()
+    epd.update()
+    assert epd._shown_valid
+    gray = epd.gray_paint()
+    for i, color in enumerate(levels(driver.Color)):
+        gray.draw_rectangle(10 + i * 30, 10, 35 + i * 30, 40, color, filled=True)
+    epd.update_gray(gray)
+    assert panel.frame("ram1") == bytes(gray.hi.img) and panel.frame("ram2") == bytes(gray.lo.img)
+    for cmd, payload in driver.lut_gray_table:
+        assert panel.registers[cmd] == bytes(payload), hex(cmd)
+    assert epd.get_update_records()[-1]["mode"] == "gray"
+    assert not epd._shown_valid and gray.hi.dirty is None
+    # 屏幕上不再是 1 位画面：下一次局刷改为全刷并换回全刷 LUT
+    epd.draw_point(5, 5)
+    epd.update(partial=True)
+    assert epd.get_update_records()[-1]["mode"] == "full"
+    for cmd, payload in driver.lut_full_table:
+        assert panel.registers[cmd] == bytes(payload), hex(cmd)
+    assert bytes(panel.display) == bytes(epd.paint.img)
+    assert not panel.errors
@@ -0,0 +1,77 @@
+# 局刷：窗口、局刷 LUT 以及何时必须改为全刷
+import pytest
+
+from test_update import draw_frames
+
+
+def last_mode(epd):
+    return epd.get_update_records()[-1]["mode"]
+
+
+@pytest.mark.parametrize("rotate", [0, 1])
+def test_partial_updates_match_paint(make_epd, driver, rotate):
+    epd, panel = make_epd(rotate=rotate)
+    epd.update()
+    for draw in draw_frames(epd, driver.Color):
+        draw()
+        epd.update(partial=True)
+        assert last_mode(epd) == "partial"
+        assert bytes(panel.display) == bytes(epd.paint.img)
+    assert panel.partial_refresh_count == 5 and not panel.errors
+
+
+def test_partial_update_only_sends_changed_window(make_epd):
+    epd, panel = make_epd()
+    epd.update()
+    epd.draw_rectangle(20, 30, 25, 33, filled=True)
+    epd.update(partial=True)
+    record = epd.get_update_records()[-1]
+    assert record["mode"] == "partial"
+    assert record["window"] == (16, 30, 31, 33) # x 方向按字节对齐
+    assert panel.registers[0x90][:6] == bytes((16, 31, 0, 30, 0, 33)) # PARTIAL WINDOW
+    assert panel.partial_refresh_count == 1
+
+
+def test_full_refresh_every(make_epd):
+    epd, panel = make_epd(full_refresh_every=2)
+    epd.update()
+    modes = []
+    for i in range(4):
+        epd.draw_point(i, i)
+        epd.update(partial=True)
+        modes.append(last_mode(epd))
+    assert modes == ["partial", "partial", "full", "partial"]
+    assert bytes(panel.display) == bytes(epd.paint.img)
+
+
+def test_update_partial_clamps_window(make_epd):
+    epd, panel = make_epd()
+    epd.update()
+    epd.draw_point(150, 150)
+    epd.update_partial(140, 120, 400, 500)
+    assert epd.get_update_records()[-1]["window"] == (136, 120, 151, 151)
+    assert panel.registers[0x90][:6] == bytes((136, 151, 0, 120, 0, 151))
+    assert bytes(panel.display) == bytes(epd.paint.img)
+
+    panel.reset_stats()
+    epd.update_partial(200, 0, 300, 10) # 完全在屏幕外
+    assert last_mode(epd) == "skipped" and panel.command_count == 0
+
+
+def test_update_partial_without_old_frame_is_full(make_epd, driver):
+    # 上电后屏幕上的画面未知，显式局刷也必须先全刷一次
+    epd, panel = make_epd()
+    epd.draw_point(5, 5)
+    epd.update_partial(0, 0, 7, 7)
+    assert last_mode(epd) == "full"
+    assert panel.partial_refresh_count == 0
+    assert bytes(panel.display) == bytes(epd.paint.img)
+
+    # 灰度刷新之后同样如此
+    gray = epd.gray_paint()
+    gray.draw_rectangle(0, 0, 30, 30, driver.Color.DARK_GRAY, filled=True)
+    epd.update_gray(gray)
+    epd.draw_point(6, 6)
+    epd.update_partial(0, 0, 7, 7)
+    assert last_mode(epd) == "full"
+    assert bytes(panel.display) == bytes(epd.paint.img)
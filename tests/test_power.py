@@ -0,0 +1,116 @@
+# 电源策略
+import asyncio
+import itertools
+
+import pytest
+
+DEEP_SLEEP = 0x07
+POWER_SETTING = 0x01
+POWER_ON = 0x04
+LUTS = (0x20, 0x21, 0x22, 0x23, 0x24)
+
+_points = itertools.count()
+
+
+def refresh(epd, partial=False):
+    # 每次画一个新的点，保证画面有变化、不会被跳过
+    epd.draw_point(next(_points) % 152, 7)
+    epd.update(partial=partial)
+
+
+def test_always_sleep(make_epd, driver):
+    epd, panel = make_epd()
+    refresh(epd)
+    assert epd.is_sleeping and not epd.is_powered
+    panel.reset_stats()
+    refresh(epd)
+    # 深度睡眠后每次刷新都要复位并完整初始化
+    # 模拟器在下一个命令或复位到来时才记录一个命令，上一次刷新结束时的深度睡眠出现在这里
+    commands = panel.commands()
+    assert DEEP_SLEEP in commands
+    assert POWER_SETTING in commands and set(LUTS) <= set(commands)
+    assert panel.writes_while_asleep == 0 and not panel.errors
+    assert bytes(panel.display) == bytes(epd.paint.img)
+
+
+@pytest.mark.parametrize("policy", ["TIMEOUT", "UNTIL_IDLE"])
+def test_warm_policies_only_power_off(make_epd, driver, policy):
+    epd, panel = make_epd(power_policy=getattr(driver.PowerPolicy, policy), sleep_after=3600)
+    refresh(epd)
+    assert not epd.is_sleeping and not epd.is_powered
+    panel.reset_stats()
+    refresh(epd)
+    # 热启动：不复位、不重写电源设置和 LUT，只重新打开高压
+    commands = panel.commands()
+    assert DEEP_SLEEP not in commands and POWER_SETTING not in commands
+    assert not set(LUTS) & set(commands)
+    assert commands.count(POWER_ON) == 1
+    assert not epd.sleep_if_idle() # 还没有空闲 sleep_after 秒
+    epd.sleep()
+    assert epd.is_sleeping
+    refresh(epd)
+    assert bytes(panel.display) == bytes(epd.paint.img)
+    assert panel.writes_while_asleep == 0 and not panel.errors
+
+
+def test_timeout_sleeps_when_idle(make_epd, driver):
+    epd, panel = make_epd(power_policy=driver.PowerPolicy.TIMEOUT, sleep_after=0)
+    refresh(epd)
+    assert not epd.is_sleeping
+    assert epd.sleep_if_idle()
+    refresh(epd)
+    assert bytes(panel.display) == bytes(epd.paint.img)
+
+    epd.draw_point(50, 50)
+    assert epd.sleep_if_idle() # TIMEOUT 不关心尚未刷新的绘制
+
+
+def test_until_idle_waits_for_pending_drawing(make_epd, driver):
+    epd, panel = make_epd(power_policy=driver.PowerPolicy.UNTIL_IDLE, sleep_after=0)
+    refresh(epd)
+    epd.draw_point(50, 50)
+    assert not epd.sleep_if_idle() # 画面还没刷新，不算空闲
+    epd.update()
+    assert not epd.is_sleeping
+    assert epd.sleep_if_idle()
+    refresh(epd)
+    assert bytes(panel.display) == bytes(epd.paint.img)
+    assert panel.writes_while_asleep == 0 and not panel.errors
+
+
+def test_until_idle_restarts_timer_while_drawing(make_epd, driver):
+    epd, panel = make_epd(power_policy=driver.PowerPolicy.UNTIL_IDLE, sleep_after=0.2)
+
+    async def run():
+        epd.draw_point(0, 0)
+        await epd.update_async()
+        for i in range(4):
+            epd.draw_point(i, 20) # 一直在准备下一帧
+            await asyncio.sleep(0.1)
+            assert not epd.is_sleeping
+        await epd.update_async(partial=True)
+        await asyncio.sleep(0.4)
+        assert epd.is_sleeping and epd._idle_task is None
+
+    asyncio.run(run())
+    assert panel.writes_while_asleep == 0 and not panel.errors
+
+
+def test_update_async_schedules_idle_sleep(make_epd, driver):
+    epd, panel = make_epd(power_policy=driver.PowerPolicy.TIMEOUT, sleep_after=0.2)
+
+    async def run():
+        for i in range(3):
+            epd.draw_point(i, i)
+            await epd.update_async(partial=True)
+            await asyncio.sleep(0.05)
+            assert not epd.is_sleeping # 每次刷新都重新计时
+        await asyncio.sleep(0.4)
+        assert epd.is_sleeping and epd._idle_task is None
+        epd.draw_point(50, 50)
+        await epd.update_async(partial=True)
+        assert bytes(panel.display) == bytes(epd.paint.img)
+
+    asyncio.run(run())
+    assert panel.writes_while_asleep == 0 and not panel.errors
+
@@ -0,0 +1,50 @@
+# 性能记录和调试输出
+import pytest
+
+from il0373_sim import SimPanel
+
+
+def test_log_level_off_is_silent(make_epd, capsys):
+    epd, _ = make_epd()
+    epd.show_string("12:34", 0, 0)
+    epd.update()
+    epd.update()
+    assert capsys.readouterr().out == ""
+
+
+def test_summary_prints_one_line_per_update(make_epd, driver, capsys):
+    epd, _ = make_epd(log_level=driver.LogLevel.SUMMARY)
+    epd.draw_point(1, 1)
+    epd.update()
+    epd.update()
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith("update full:") and lines[1] == "update skipped: frame unchanged"
+
+
+def test_verbose_logs_each_step_once(make_epd, driver, capsys):
+    epd, _ = make_epd(log_level=driver.LogLevel.VERBOSE)
+    epd.update()
+    out = capsys.readouterr().out
+    assert out.count("updating the memory...") == 1
+    assert out.count("updating memory successful") == 1
+
+
+def test_update_records(make_epd, driver):
+    epd, _ = make_epd(history=3)
+    epd.show_string("12", 0, 0)
+    epd.update()
+    record = epd.get_update_records()[-1]
+    assert record["mode"] == "full" and record["text_calls"] == 1
+    assert set(epd.PHASES) <= set(record) and record["total"] >= record["busy"] >= 0
+    for i in range(4):
+        epd.draw_point(i, 100)
+        epd.update(partial=True)
+    records = epd.get_update_records()
+    assert len(records) == 3 and [r["mode"] for r in records] == ["partial"] * 3
+    epd.clear_update_records()
+    assert epd.get_update_records() == []
+
+    no_history, _ = make_epd(history=0)
+    no_history.update()
+    assert no_history.get_update_records() == []
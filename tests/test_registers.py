@@ -0,0 +1,24 @@
+# 寄存器影子：热启动时只写入与控制器当前值不同的寄存器
+from test_power import LUTS, POWER_SETTING, refresh
+
+
+def test_register_shadow_matches_controller(make_epd, driver):
+    # 影子中的每个寄存器都必须与控制器实际持有的参数一致，相同的参数不重复写入
+    epd, panel = make_epd(power_policy=driver.PowerPolicy.TIMEOUT)
+    refresh(epd)
+    refresh(epd, partial=True) # 切换到局刷 LUT
+    panel.reset_stats()
+    refresh(epd, partial=True)
+    assert not set(LUTS) & set(panel.commands()) # 仍是局刷 LUT，不重写
+    refresh(epd) # 切换回全刷 LUT，只写入不同的部分
+    for cmd, payload in epd._regs.items():
+        assert panel.registers[cmd] == payload, hex(cmd)
+    written = [cmd for cmd in panel.commands() if cmd in LUTS]
+    assert written and len(written) == len(set(written))
+
+    epd.sleep()
+    refresh(epd) # 复位后影子清空，所有寄存器重新写入
+    assert POWER_SETTING in panel.commands()
+    for cmd, payload in epd._regs.items():
+        assert panel.registers[cmd] == payload, hex(cmd)
+    assert not panel.errors
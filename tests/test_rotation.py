@@ -0,0 +1,106 @@
+# 旋转：四个方向的绘图输出与参考位图只差一个坐标变换
+import random
+
+import pytest
+
+from pixels import black
+
+W, H = 24, 16 # 非正方形的物理尺寸，旋转后逻辑宽高互换
+
+# ROTATE_0 下 scene() 的参考画面，# 为黑色
+REFERENCE = """
+#..............#........
+..##.......###.#........
+....##.....#.#.#........
+...#..##...#.#.#........
+..###...##.#.#.#........
+...#.......#.#.#........
+...........###..........
+........................
+.#####....###...........
+.#####...#...#..........
+.#####..#.....#.........
+.##.##..#.....#.........
+.#####..#.....#.........
+.#####...#...#..........
+.#####....###...........
+........................
+"""
+
+
+def scene(paint, Color):
+    # 只使用逻辑坐标 0..15，四个旋转方向下都完整落在画布内
+    paint.draw_point(0, 0)
+    paint.draw_line(2, 1, 9, 4)
+    paint.draw_line(15, 0, 15, 5)
+    paint.draw_rectangle(11, 1, 13, 6)
+    paint.draw_rectangle(1, 8, 5, 14, filled=True)
+    paint.draw_point(3, 11, Color.WHITE)
+    paint.draw_circle(11, 11, 3)
+    paint.draw_circle(3, 4, 1, filled=True)
+
+
+def to_physical(rotate, x, y):
+    # 逻辑坐标到物理坐标 (与 GxEPD 的 rotation 1/2/3 相同)，独立于 Paint 的实现
+    return [(x, y), (W - 1 - y, x), (W - 1 - x, H - 1 - y), (y, H - 1 - x)][rotate]
+
+
+def parse(art):
+    return {(x, y) for y, row in enumerate(art.split()) for x, c in enumerate(row) if c == "#"}
+
+
+@pytest.mark.parametrize("rotate", range(4))
+def test_primitives_match_reference(driver, rotate):
+    paint = driver.Paint(driver.Screen(W, H), rotate=rotate)
+    scene(paint, driver.Color)
+    expected = {to_physical(rotate, x, y) for x, y in parse(REFERENCE)}
+    assert black(paint.img, W, H) == expected
+
+
+@pytest.mark.parametrize("rotate", range(1, 4))
+def test_bitmaps_follow_rotation(driver, rotate):
+    # 打包位图 (放大、src_x、stride、invert) 和文字在各方向上与 0 度的画面只差一个旋转
+    rng = random.Random(rotate)
+    data = bytes(rng.randrange(256) for _ in range(3 * 5))
+
+    def draw(paint):
+        paint.show_packed(data, 13, 5, 1, 0, multiplier=1)
+        paint.show_packed(data, 7, 5, 3, 6, multiplier=2, src_x=5, stride=3)
+        paint.show_packed(data, 5, 3, 9, 0, invert=True)
+        paint.show_bitmap([[1, 0, 1], [0, 1, 0]], 12, 12, multiplier=2, color=driver.Color.BLACK)
+
+    base = driver.Paint(driver.Screen(W, H))
+    draw(base)
+    paint = driver.Paint(driver.Screen(W, H), rotate=rotate)
+    draw(paint)
+    expected = set()
+    for x, y in black(base.img, W, H):
+        if x < paint.width and y < paint.height: # 旋转 90/270 度后逻辑宽度只有 16
+            expected.add(to_physical(rotate, x, y))
+    assert black(paint.img, W, H) == expected
+
+
+@pytest.mark.parametrize("rotate", range(1, 4))
+def test_text_follows_rotation(make_epd, rotate):
+    def draw(epd):
+        epd.show_string("12:34", 2, 3)
+        epd.show_string("7", 40, 20, multiplier=2)
+
+    base, _ = make_epd()
+    draw(base)
+    epd, _ = make_epd(rotate=rotate)
+    draw(epd)
+    size = 152
+    expected = set()
+    for x, y in black(base.paint.img, size, size):
+        expected.add([(x, y), (size - 1 - y, x), (size - 1 - x, size - 1 - y), (y, size - 1 - x)][rotate])
+    assert expected and black(epd.paint.img, size, size) == expected
+
+
+def test_set_rotate_swaps_logical_size(driver):
+    paint = driver.Paint(driver.Screen(W, H))
+    sizes = []
+    for rotate in range(4):
+        paint.set_rotate(rotate)
+        sizes.append((paint.width, paint.height))
+    assert sizes == [(W, H), (H, W), (W, H), (H, W)]
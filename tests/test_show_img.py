@@ -0,0 +1,68 @@
+# Paint.show_img：流式解码 PBM / BMP 文件，结果与逐像素绘制相同
+import pytest
+
+from pixels import black, inside
+from test_bitmap import random_bitmap, write_pbm
+
+W, H = 24, 16
+
+
+def write_bmp(path, bitmap, top_down=False, ones_black=False):
+    # 1 位未压缩 BMP；默认调色板 0 为黑色、1 为白色，行自下而上存储并按 4 字节补齐
+    height, width = len(bitmap), len(bitmap[0])
+    stride = (width + 31) // 32 * 4
+    rows = []
+    for row in bitmap:
+        line = bytearray(stride)
+        for x, b in enumerate(row):
+            if (b == 1) == ones_black: # b 为 1 表示黑色
+                line[x >> 3] |= 0x80 >> (x & 7)
+        rows.append(bytes(line))
+    if not top_down:
+        rows.reverse()
+    palette = b"\xff\xff\xff\x00\x00\x00\x00\x00" if ones_black else b"\x00\x00\x00\x00\xff\xff\xff\x00"
+    offset = 14 + 40 + len(palette)
+    size = offset + stride * height
+    with open(path, "wb") as f:
+        f.write(b"BM" + size.to_bytes(4, "little") + bytes(4) + offset.to_bytes(4, "little"))
+        f.write((40).to_bytes(4, "little") + width.to_bytes(4, "little")
+                + (height if not top_down else 0x100000000 - height).to_bytes(4, "little")
+                + (1).to_bytes(2, "little") + (1).to_bytes(2, "little") + bytes(24))
+        f.write(palette)
+        f.write(b"".join(rows))
+
+
+@pytest.mark.parametrize("fmt", ["pbm", "bmp", "bmp_top_down", "bmp_ones_black"])
+@pytest.mark.parametrize("rotate, x_start, y_start", [(0, 8, 3), (0, 3, -2), (0, -8, 10), (1, 5, 4), (3, 0, 0)])
+def test_show_img_round_trip(driver, tmp_path, fmt, rotate, x_start, y_start):
+    bitmap = random_bitmap(19, 9, fmt)
+    path = str(tmp_path / "img")
+    if fmt == "pbm":
+        write_pbm(path, bitmap)
+    else:
+        write_bmp(path, bitmap, top_down=fmt == "bmp_top_down", ones_black=fmt == "bmp_ones_black")
+
+    Color = driver.Color
+    paint = driver.Paint(driver.Screen(W, H), rotate=rotate)
+    paint.draw_rectangle(0, 0, paint.width - 1, paint.height - 1, filled=True) # 图像不透明：白色像素也要写入
+    expected = driver.Paint(driver.Screen(W, H), rotate=rotate)
+    expected.img[:] = paint.img
+    for y, row in enumerate(bitmap):
+        for x, b in enumerate(row):
+            expected.draw_point(x_start + x, y_start + y, Color.BLACK if b else Color.WHITE)
+
+    before = bytes(paint.img)
+    paint.reset_dirty()
+    paint.show_img(path, x_start, y_start)
+    assert bytes(paint.img) == bytes(expected.img)
+    x0, y0, x1, y1 = paint.dirty
+    changed = black(before, W, H) ^ black(paint.img, W, H)
+    assert inside((x0, y0, x1, y1), changed)
+
+
+def test_show_img_rejects_other_formats(driver, tmp_path):
+    path = tmp_path / "img.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(32))
+    paint = driver.Paint(driver.Screen(W, H))
+    with pytest.raises(TypeError):
+        paint.show_img(str(path), 0, 0)
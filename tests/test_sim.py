@@ -0,0 +1,41 @@
+# 模拟面板本身的行为：其余测试都以它为参照
+from il0373_sim import SimPanel
+
+
+def test_refresh_shows_ram2(make_epd, driver):
+    epd, panel = make_epd()
+    epd.draw_rectangle(0, 0, 20, 20, driver.Color.BLACK, filled=True)
+    epd.update()
+    assert bytes(panel.display) == bytes(epd.paint.img)
+    assert panel.frame("ram2") == bytes(epd.paint.img)
+    assert panel.pixel(0, 0) == 0 and panel.pixel(21, 21) == 1
+    assert panel.refresh_count == 1 and not panel.errors
+
+
+def test_refresh_while_powered_off_is_an_error():
+    panel = SimPanel()
+    spi, dc, busy, cs, res = panel.pins()
+    cs(0)
+    dc(0)
+    spi.write(b"\x12") # DISPLAY REFRESH 之前没有 POWER ON
+    cs(1)
+    assert panel.errors
+
+
+def test_writes_while_asleep_are_dropped(make_epd):
+    epd, panel = make_epd()
+    epd.update()
+    assert epd.is_sleeping
+    epd.write_cmd(0x04)
+    assert panel.writes_while_asleep == 1
+
+
+def test_save_pbm_round_trip(make_epd, driver, tmp_path):
+    epd, panel = make_epd()
+    epd.draw_circle(76, 76, 30, driver.Color.BLACK, filled=True)
+    epd.update()
+    path = str(tmp_path / "frame.pbm")
+    panel.save_pbm(path)
+    data, width, height = driver.load_pbm(path)
+    assert (width, height) == (152, 152)
+    assert data == bytes(~b & 0xFF for b in panel.display) # PBM 中 1 为黑色
@@ -0,0 +1,62 @@
+# 中文版 show_string：打包的点阵直接按位绘制，结果必须与逐像素解码的参考画面相同
+import os
+
+import pytest
+
+import il0373_cn
+from il0373_sim import SimPanel
+
+CHINESE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "chinese")
+
+
+@pytest.fixture
+def epd(monkeypatch):
+    monkeypatch.chdir(CHINESE)
+    panel = SimPanel()
+    epd = il0373_cn.IL0373(*panel.pins(), font_index_in_ram=True)
+    yield epd
+    epd.bmf_font.font.close()
+
+
+def reference_string(epd, text, x_start, y_start, multiplier, color):
+    # 逐像素解码点阵并用 draw_point 绘制，返回下一个字符的起始 x
+    font = epd.bmf_font
+    size = font.font_size
+    stride = (size + 7) // 8
+    x = x_start
+    for char in text:
+        bitmap = font.get_bitmap(char)
+        left, width = font.get_ink(char)
+        for row in range(min(size, len(bitmap) // stride)):
+            for col in range(left, left + width):
+                if (bitmap[row * stride + col // 8] >> (7 - col % 8)) & 1:
+                    for dy in range(multiplier):
+                        for dx in range(multiplier):
+                            epd.paint.draw_point(x + (col - left) * multiplier + dx,
+                                                 y_start + row * multiplier + dy, color)
+        x += ((width or size // 2) + 1) * multiplier
+    return x
+
+
+@pytest.mark.parametrize("rotate", [0, 1])
+@pytest.mark.parametrize("multiplier", [1, 2, 3])
+def test_show_string_matches_reference(epd, rotate, multiplier):
+    text = "温度 23.4°C！龘" # 龘 不在字体中，画默认的问号点阵
+    epd.set_rotate(rotate)
+    epd.show_string(text, 3, 5, multiplier=multiplier)
+    epd.show_string("晴", 140, 140, multiplier=multiplier) # 超出画布的部分被裁掉
+    drawn = bytes(epd.paint.img)
+
+    epd.clear(il0373_cn.Color.WHITE)
+    reference_string(epd, text, 3, 5, multiplier, il0373_cn.Color.BLACK)
+    reference_string(epd, "晴", 140, 140, multiplier, il0373_cn.Color.BLACK)
+    assert drawn == bytes(epd.paint.img)
+
+
+def test_white_text_on_black(epd):
+    epd.clear(il0373_cn.Color.BLACK)
+    epd.show_string("12:34", 10, 10, multiplier=2, color=il0373_cn.Color.WHITE)
+    drawn = bytes(epd.paint.img)
+    epd.clear(il0373_cn.Color.BLACK)
+    reference_string(epd, "12:34", 10, 10, 2, il0373_cn.Color.WHITE)
+    assert drawn == bytes(epd.paint.img)
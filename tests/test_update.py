@@ -0,0 +1,35 @@
+# 全刷：模拟面板上显示的画面必须始终与 paint.img 一致
+import pytest
+
+
+def draw_frames(epd, Color):
+    # 依次产生几帧不同的画面，覆盖跨越字节边界的修改和擦除
+    yield lambda: epd.draw_rectangle(10, 10, 60, 40, Color.BLACK, filled=True)
+    yield lambda: epd.draw_point(3, 3)
+    yield lambda: epd.draw_line(0, 151, 151, 0)
+    yield lambda: epd.draw_circle(100, 100, 20, Color.BLACK, filled=True)
+    yield lambda: epd.draw_rectangle(10, 10, 60, 40, Color.WHITE, filled=True)
+
+
+@pytest.mark.parametrize("rotate", range(4))
+def test_update_matches_paint(make_epd, driver, rotate):
+    epd, panel = make_epd(rotate=rotate)
+    epd.update()
+    assert bytes(panel.display) == bytes(epd.paint.img)
+    for draw in draw_frames(epd, driver.Color):
+        draw()
+        epd.update()
+        assert bytes(panel.display) == bytes(epd.paint.img)
+    assert not panel.errors
+
+
+def test_update_mem_streams_each_plane_at_once(make_epd, monkeypatch):
+    # 两个 RAM 平面各用一次 spi.write 整帧写出
+    epd, panel = make_epd()
+    sizes = []
+    write = panel.spi.write
+    monkeypatch.setattr(panel.spi, "write", lambda buf: (sizes.append(len(buf)), write(buf)))
+    epd.update()
+    assert sizes.count(len(epd.paint.img)) == 2
+    assert panel.frame("ram1") == b"\xff" * len(epd.paint.img)
+    assert panel.frame("ram2") == bytes(epd.paint.img)
@@ -0,0 +1,111 @@
+# weather_dock/widgets.py：Scene 只擦除并重绘值改变了的小部件
+import os
+import sys
+
+import pytest
+
+from conftest import CHINESE, ROOT
+from il0373_sim import SimPanel
+from pixels import black, inside
+
+sys.path.insert(0, os.path.join(ROOT, "weather_dock"))
+import il0373_cn
+import widgets
+from widgets import Box, Label, Line, Scene
+
+WIDTH = HEIGHT = 152
+ICON = [[1, 0, 1, 1], [0, 1, 1, 0], [1, 1, 0, 1]]
+
+
+@pytest.fixture
+def make_scene(monkeypatch):
+    # 中文版构造 IL0373 时从当前目录加载 BMF 字体
+    monkeypatch.chdir(CHINESE)
+    epds = []
+
+    def make():
+        panel = SimPanel()
+        epd = il0373_cn.IL0373(*panel.pins(), rotate=il0373_cn.Rotate.ROTATE_0)
+        epds.append(epd)
+        scene = Scene(epd)
+        parts = {
+            "title": scene.add(Label(76, 2, "天气", align=widgets.CENTER)),
+            "clock": scene.add(Label(76, 20, "12:34", align=widgets.CENTER, multiplier=2, bold=True)),
+            "temp": scene.add(Label(150, 60, "23°C", align=widgets.RIGHT)),
+            "icon": scene.add(widgets.Bitmap(4, 60, ICON, multiplier=3)),
+            "rule": scene.add(Line(0, 50, 151, 50)),
+            "frame": scene.add(Box(100, 55, 151, 80)),
+        }
+        return epd, scene, parts
+
+    yield make
+    for epd in epds:
+        epd.bmf_font.font.close()
+
+
+def same_as_fresh(make, epd, parts):
+    # 增量重绘的结果必须与按当前值从头绘制的画面一致
+    fresh, scene, fresh_parts = make()
+    for name, widget in parts.items():
+        fresh_parts[name].set(widget.value)
+    scene.render()
+    return bytes(epd.paint.img) == bytes(fresh.paint.img)
+
+
+def test_first_render_draws_everything(make_scene):
+    epd, scene, parts = make_scene()
+    assert scene.render() == len(parts)
+    assert all(widget.bounds is not None for widget in parts.values())
+    assert black(epd.paint.img, WIDTH, HEIGHT)
+    epd.paint.reset_dirty()
+    assert scene.render() == 0 # 没有改变，不重绘
+    assert epd.paint.dirty is None
+
+
+def test_changed_label_redraws_only_its_area(make_scene):
+    epd, scene, parts = make_scene()
+    scene.render()
+    epd.paint.reset_dirty()
+    old = parts["clock"].bounds
+    parts["clock"].set("7:05")
+    assert scene.render() == 1
+    new = parts["clock"].bounds
+    area = (min(old[0], new[0]), min(old[1], new[1]), max(old[2], new[2]), max(old[3], new[3]))
+    x0, y0, x1, y1 = epd.paint.dirty
+    assert inside(area, [(x0, y0), (x1, y1)])
+    assert same_as_fresh(make_scene, epd, parts)
+
+
+def test_erased_label_leaves_background(make_scene):
+    epd, scene, parts = make_scene()
+    scene.render()
+    bounds = parts["title"].bounds
+    parts["title"].set("")
+    scene.render()
+    assert parts["title"].bounds is None
+    assert not {p for p in black(epd.paint.img, WIDTH, HEIGHT) if inside(bounds, [p])}
+    assert same_as_fresh(make_scene, epd, parts)
+
+
+def test_overlapping_widgets_are_redrawn(make_scene):
+    epd, scene, parts = make_scene()
+    scene.render()
+    # 温度标签的擦除区域压在矩形框上，框也要重绘
+    parts["temp"].set("-5°C")
+    assert scene.render() == 2
+    assert same_as_fresh(make_scene, epd, parts)
+    # 位图按对象比较：换成内容相同的新对象也会重绘
+    parts["icon"].set([row[:] for row in ICON])
+    assert scene.render() == 1
+    parts["rule"].set(False)
+    scene.render()
+    assert same_as_fresh(make_scene, epd, parts)
+
+
+def test_invalidate_redraws_the_whole_scene(make_scene):
+    epd, scene, parts = make_scene()
+    scene.render()
+    epd.clear(il0373_cn.Color.BLACK) # 例如显示了启动画面
+    scene.invalidate()
+    assert scene.render() == len(parts)
+    assert same_as_fresh(make_scene, epd, parts)
@@ -1,11 +1,13 @@
 # main.py
 import time
+import asyncio # 刷新墨水屏的同时获取天气
 import urequests # 用于HTTP请求
 import json # 用于解析JSON
 import network # 用于检查Wi-Fi连接状态
 import ntptime # 用于时间同步
 from machine import Pin, SPI, RTC
-from il0373_cn import IL0373, Color, Rotate # 不再导入 fonts.py
+from il0373_cn import IL0373, Color, Rotate, LogLevel, PowerPolicy, GlyphStyle # 不再导入 fonts.py
+from widgets import Scene, Label, Bitmap, Line, LEFT, CENTER, RIGHT
 
 # 导入配置
 import config
@@ -41,112 +43,119 @@ epd = IL0373(
     width=152,
     height=152,
     rotate=Rotate.ROTATE_180, # 根据你的实际安装方向调整
-    bg_color=Color.WHITE
+    bg_color=Color.WHITE,
+    font_index_in_ram=True, # 字体索引常驻内存 (约 13KB)，每个字符查找不再读取闪存
+    # 每分钟刷新，两次刷新之间只关高压，不复位也不重写 LUT；
+    # 刷新停止超过 sleep_after 秒时，update_async() 安排的后台任务让控制器深度睡眠
+    power_policy=PowerPolicy.TIMEOUT,
+    sleep_after=90,
+    log_level=LogLevel.SUMMARY # 每次刷新输出一行各阶段耗时
 )
 
 print("EPD Driver initialized.")
 
-# --- 优化后的天气图标 bitmaps (16x16 像素) ---
+# --- 优化后的天气图标 bitmaps (16x16 像素，按行打包的 1bpp 数据，每行 2 字节，最高位在左) ---
+ICON_WIDTH = 16
 
 # 晴朗/太阳 ICON_SUNNY
-ICON_SUNNY = [
-    [0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0], # Top rays
-    [0,1,0,0,0,0,0,0,0,0,0,0,0,1,0,0],
-    [0,0,0,0,0,1,1,1,1,1,0,0,0,0,0,0],
-    [0,0,0,0,1,1,1,1,1,1,1,0,0,0,0,0],
-    [0,0,0,1,1,1,1,1,1,1,1,1,0,0,0,0],
-    [0,0,1,1,1,1,1,1,1,1,1,1,1,0,0,0], # Inner circle
-    [0,0,1,1,1,1,1,1,1,1,1,1,1,0,0,0],
-    [1,0,1,1,1,1,1,1,1,1,1,1,1,0,1,0],
-    [0,0,1,1,1,1,1,1,1,1,1,1,1,0,0,0],
-    [0,0,1,1,1,1,1,1,1,1,1,1,1,0,0,0],
-    [0,0,0,1,1,1,1,1,1,1,1,1,0,0,0,0],
-    [0,0,0,0,1,1,1,1,1,1,1,0,0,0,0,0],
-    [0,0,0,0,0,1,1,1,1,1,0,0,0,0,0,0],
-    [0,1,0,0,0,0,0,0,0,0,0,0,0,1,0,0],
-    [0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0], # Bottom rays
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-]
+ICON_SUNNY = bytes((
+    0b00000001, 0b00000000, # Top rays
+    0b01000000, 0b00000100,
+    0b00000111, 0b11000000,
+    0b00001111, 0b11100000,
+    0b00011111, 0b11110000,
+    0b00111111, 0b11111000, # Inner circle
+    0b00111111, 0b11111000,
+    0b10111111, 0b11111010,
+    0b00111111, 0b11111000,
+    0b00111111, 0b11111000,
+    0b00011111, 0b11110000,
+    0b00001111, 0b11100000,
+    0b00000111, 0b11000000,
+    0b01000000, 0b00000100,
+    0b00000001, 0b00000000, # Bottom rays
+    0b00000000, 0b00000000,
+))
 
 # 多云 ICON_CLOUDY
-ICON_CLOUDY = [
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,1,1,1,1,1,1,0,0,0,0,0], # Main cloud
-    [0,0,0,1,1,1,1,1,1,1,1,1,0,0,0,0],
-    [0,0,1,1,1,1,1,1,1,1,1,1,1,0,0,0],
-    [0,1,1,1,1,1,1,1,1,1,1,1,1,1,0,0],
-    [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0],
-    [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0],
-    [0,1,1,1,1,1,1,1,1,1,1,1,1,1,0,0],
-    [0,0,1,1,1,1,1,1,1,1,1,1,1,0,0,0],
-    [0,0,0,1,1,1,1,1,1,1,1,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-]
+ICON_CLOUDY = bytes((
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000111, 0b11100000, # Main cloud
+    0b00011111, 0b11110000,
+    0b00111111, 0b11111000,
+    0b01111111, 0b11111100,
+    0b11111111, 0b11111110,
+    0b11111111, 0b11111110,
+    0b01111111, 0b11111100,
+    0b00111111, 0b11111000,
+    0b00011111, 0b11100000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+))
 
 # 下雨 ICON_RAIN (云朵+雨滴)
-ICON_RAIN = [
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,1,1,1,1,1,1,0,0,0,0,0], # Cloud
-    [0,0,0,1,1,1,1,1,1,1,1,1,0,0,0,0],
-    [0,0,1,1,1,1,1,1,1,1,1,1,1,0,0,0],
-    [0,1,1,1,1,1,1,1,1,1,1,1,1,1,0,0],
-    [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0],
-    [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0],
-    [0,1,1,1,1,1,1,1,1,1,1,1,1,1,0,0],
-    [0,0,1,0,0,1,0,0,1,0,0,1,0,0,0,0], # Rain drops
-    [0,1,0,0,1,0,0,1,0,0,1,0,0,0,0,0],
-    [1,0,0,1,0,0,1,0,0,1,0,0,0,0,0,0],
-    [0,0,1,0,0,1,0,0,1,0,0,0,0,0,0,0],
-    [0,1,0,0,1,0,0,1,0,0,0,0,0,0,0,0],
-    [1,0,0,1,0,0,1,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-]
+ICON_RAIN = bytes((
+    0b00000000, 0b00000000,
+    0b00000111, 0b11100000, # Cloud
+    0b00011111, 0b11110000,
+    0b00111111, 0b11111000,
+    0b01111111, 0b11111100,
+    0b11111111, 0b11111110,
+    0b11111111, 0b11111110,
+    0b01111111, 0b11111100,
+    0b00100100, 0b10010000, # Rain drops
+    0b01001001, 0b00100000,
+    0b10010010, 0b01000000,
+    0b00100100, 0b10000000,
+    0b01001001, 0b00000000,
+    0b10010010, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+))
 
 # 下雪 ICON_SNOW (云朵+雪花)
-ICON_SNOW = [
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,1,1,1,1,1,1,0,0,0,0,0], # Cloud
-    [0,0,0,1,1,1,1,1,1,1,1,1,0,0,0,0],
-    [0,0,1,1,1,1,1,1,1,1,1,1,1,0,0,0],
-    [0,1,1,1,1,1,1,1,1,1,1,1,1,1,0,0],
-    [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0],
-    [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,0],
-    [0,1,1,1,1,1,1,1,1,1,1,1,1,1,0,0],
-    [0,0,1,0,1,0,1,0,1,0,1,0,0,0,0,0], # Snowflakes
-    [0,1,0,1,0,1,0,1,0,1,0,1,0,0,0,0],
-    [0,0,1,0,1,0,1,0,1,0,1,0,0,0,0,0],
-    [0,1,0,1,0,1,0,1,0,1,0,1,0,0,0,0],
-    [0,0,1,0,1,0,1,0,1,0,1,0,0,0,0,0],
-    [0,1,0,1,0,1,0,1,0,1,0,1,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-]
+ICON_SNOW = bytes((
+    0b00000000, 0b00000000,
+    0b00000111, 0b11100000, # Cloud
+    0b00011111, 0b11110000,
+    0b00111111, 0b11111000,
+    0b01111111, 0b11111100,
+    0b11111111, 0b11111110,
+    0b11111111, 0b11111110,
+    0b01111111, 0b11111100,
+    0b00101010, 0b10100000, # Snowflakes
+    0b01010101, 0b01010000,
+    0b00101010, 0b10100000,
+    0b01010101, 0b01010000,
+    0b00101010, 0b10100000,
+    0b01010101, 0b01010000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+))
 
 # 晴朗夜晚 ICON_CLEAR_NIGHT (月亮+星星)
-ICON_CLEAR_NIGHT = [
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,1,1,1,0,0,0,0,0,0,0,0], # Moon
-    [0,0,0,0,1,1,1,1,1,0,0,0,0,0,0,0],
-    [0,0,0,1,1,1,0,1,1,0,0,0,0,0,0,0],
-    [0,0,0,1,1,1,1,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,1,1,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-    [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-]
+ICON_CLEAR_NIGHT = bytes((
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000111, 0b00000000, # Moon
+    0b00001111, 0b10000000,
+    0b00011101, 0b10000000,
+    0b00011110, 0b00000000,
+    0b00001100, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+    0b00000000, 0b00000000,
+))
 
 # 映射天气描述到图标
 weather_icon_map = {
@@ -170,6 +179,29 @@ def get_weather_icon(description, current_hour):
     description_lower = description.lower()
     return weather_icon_map[description_lower]
 
+# --- 画面快照 ---
+# 快照文件保存渲染好的帧缓冲，启动时一次读取即可显示，不需要布局和绘制
+LAST_FRAME_PATH = "last_frame.epf" # 最近一次带有新天气数据的画面
+CONNECTING_FRAME_PATH = "connecting.epf" # "正在连接"画面，第一次启动时绘制并保存
+
+def show_boot_frame(epd):
+    # 启动时先显示上次保存的画面，没有时显示"正在连接"画面；之后的第一次局刷只更新与快照不同的区域
+    for path in (LAST_FRAME_PATH, CONNECTING_FRAME_PATH):
+        try:
+            epd.show_frame(path)
+            return
+        except (OSError, TypeError): # 没有快照，或是其他尺寸屏幕的快照
+            pass
+    text = "正在连接 WiFi..."
+    epd.clear(Color.WHITE)
+    epd.show_string(text, (epd.paint.width - epd.get_string_display_width(text)) // 2,
+                    (epd.paint.height - epd.font_height) // 2, color=Color.BLACK)
+    try:
+        epd.save_frame(CONNECTING_FRAME_PATH)
+    except OSError as e:
+        print(f"Failed to save boot frame: {e}")
+    epd.update()
+
 # --- 功能函数 ---
 
 def do_connect():
@@ -232,174 +264,182 @@ def get_weather_data():
         print(f"Network or JSON error: {e}")
         return None
 
-def display_clock_and_weather(epd, weather_data):
-    epd.clear(Color.WHITE)
-    
-    current_time_tuple = time.localtime()
-    year = current_time_tuple[0]
-    month = current_time_tuple[1]
-    day = current_time_tuple[2]
-    hour = current_time_tuple[3]
-    minute = current_time_tuple[4]
-    weekday = current_time_tuple[6]
-    
-    weekdays_zh = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
-    
-    date_str = f"{year}-{month:02d}-{day:02d}"
-    time_str = f"{hour:02d}:{minute:02d}"
-    weekday_str = weekdays_zh[weekday]
-    
-    # 获取字体基本尺寸 (12x12)
-    BASE_FONT_SIZE = epd.font_width # This will be 12 if fusion-pixel-12 is loaded
-    LINE_HEIGHT = BASE_FONT_SIZE + 2 # 每行文本的垂直间距，比字体高一点
-    
-    # 定义一些常用的 X 坐标
-    LEFT_MARGIN = 5
-    RIGHT_MARGIN = epd.paint.width - 5
-    CENTER_X = epd.paint.width // 2
-    
-    # --- 布局设计 (152x152 像素) ---
-    # 所有文本都使用 12x12 BMF 字体
-    # ---------------------------------------|
-    # | 日期 (左)                  星期 (右)  | (y=5, 12x12)
-    # | ------------------------------------ |
-    # |            城市名称 (居中)            | (y=20, 12x12)
-    # | ------------------------------------ |
-    # |             HH:MM (居中,大)           | (y=40, 12x12, 放大2倍)
-    # | -------------------------------------| (y=70, 分隔线)
-    # | 图标 (左)         温度 (右, 大)       | (y=75, 图标32x32, 温度 12x12 放大2倍)
-    # | 天气描述 (12x12)   体感温度 (右, 12x12)| (y=98)
-    # |                                      | (y=110)
-    # | 湿度 (左, 12x12)     气压 (右, 12x12) | (y=125)
-    # | 风速 (左, 12x12) 日出/日落 (右, 12x12) | (y=138)
-    # ------------------------------------
-
-    # --- 垂直位置计算 ---
-    y_current = 5 # 初始 Y 坐标
-    
-    # 1. 日期和星期 (12x12 BMF 字体)
-    epd.show_string(date_str, LEFT_MARGIN, y_current, color=Color.BLACK)
-    weekday_width = epd.get_string_display_width(weekday_str)
-    epd.show_string(weekday_str, RIGHT_MARGIN - weekday_width, y_current, color=Color.BLACK)
-    y_current += LINE_HEIGHT # 移动到下一行
-
-    # 2. 城市名称 (12x12 BMF 字体)
-    city_name = weather_data.get('name', "城市 N/A") if weather_data else "城市 N/A"
-    city_name_width = epd.get_string_display_width(city_name)
-    epd.show_string(city_name, CENTER_X - (city_name_width // 2), y_current, color=Color.BLACK)
-    y_current += LINE_HEIGHT # 移动到下一行
-
-    # 3. 时间 (12x12 BMF 字体，放大2倍 -> 24x24px)
-    TIME_MULTIPLIER = 2
-    time_displayed_font_size = BASE_FONT_SIZE * TIME_MULTIPLIER
-    time_width = epd.get_string_display_width(time_str, multiplier=TIME_MULTIPLIER)
-    epd.show_string(time_str, CENTER_X - (time_width // 2), y_current, multiplier=TIME_MULTIPLIER, color=Color.BLACK)
-    epd.show_string(time_str, CENTER_X - (time_width // 2), y_current + 1, multiplier=TIME_MULTIPLIER, color=Color.BLACK)
-    epd.show_string(time_str, CENTER_X - (time_width // 2) + 1, y_current, multiplier=TIME_MULTIPLIER, color=Color.BLACK)
-    epd.show_string(time_str, CENTER_X - (time_width // 2) + 1, y_current + 1, multiplier=TIME_MULTIPLIER, color=Color.BLACK)
-
-    y_current += time_displayed_font_size + 5 # 加上放大后的高度和额外间距
-
-    # 4. 分隔线
-    epd.draw_line(LEFT_MARGIN, y_current, RIGHT_MARGIN, y_current, Color.BLACK)
-    y_current += 5 # 分隔线下方留白
-
-    # 5. 天气信息
-    if weather_data:
-        weather_info = weather_data.get('weather', [{}])[0]
-        weather_main = weather_info.get('main', "few clouds")
-        weather_main_desc = weather_info.get('description', "未知")
-        
-        main_data = weather_data.get('main', {})
-        current_temp = main_data.get('temp', 0.0)
-        feels_like_temp = main_data.get('feels_like', 0.0)
-        humidity = main_data.get('humidity', 0)
-        pressure = main_data.get('pressure', 0)
-        
-        wind_data = weather_data.get('wind', {})
-        wind_speed = wind_data.get('speed', 0.0)
-        
-        sys_data = weather_data.get('sys', {})
-        sunrise_ts = sys_data.get('sunrise', 0)
-        sunset_ts = sys_data.get('sunset', 0)
-        
-        rain_1h = weather_data.get('rain', {}).get('1h')
-        
-        sunrise_str = "N/A"
-        sunset_str = "N/A"
-        if sunrise_ts > 0:
-            sunrise_local = time.localtime(sunrise_ts + (config.TIMEZONE_OFFSET * 3600))
-            sunrise_str = f"{sunrise_local[3]:02d}:{sunrise_local[4]:02d}"
-        if sunset_ts > 0:
-            sunset_local = time.localtime(sunset_ts + (config.TIMEZONE_OFFSET * 3600))
-            sunset_str = f"{sunset_local[3]:02d}:{sunset_local[4]:02d}"
-
-        # 5.1 天气图标 (16x16, multiplier=2 -> 32x32) 和 当前温度 (12x12 BMF 字体，放大2倍 -> 24x24px)
-        ICON_SIZE = 16 * 2 # 原始16x16，放大2倍
-        icon_x = LEFT_MARGIN
-        icon_y = y_current
-        epd.show_bitmap(get_weather_icon(weather_main, hour), icon_x, icon_y, multiplier=2, color=Color.BLACK)
-        
-        # 5.2 天气描述 (12x12)，放置在体感温度下方
-        desc_str = weather_main_desc
-        DESC_MULTIPLIER = 1
-        desc_str_display_width = epd.get_string_display_width(desc_str, multiplier=DESC_MULTIPLIER)
-        epd.show_string(desc_str, LEFT_MARGIN + ICON_SIZE + 2, y_current + 8, multiplier=DESC_MULTIPLIER, color=Color.BLACK)
-
-        # 5.3 当前温度 (放大2倍 -> 24x24px)，放置在图标右侧
-        TEMP_MULTIPLIER = 2
-        temp_str = f"{current_temp:.1f}°C"
-        temp_str_display_width = epd.get_string_display_width(temp_str, multiplier=TEMP_MULTIPLIER)
-        
-        temp_x = RIGHT_MARGIN - temp_str_display_width
-        temp_y = y_current
-        epd.show_string(temp_str, temp_x, temp_y, multiplier=TEMP_MULTIPLIER, color=Color.BLACK)
+# --- 布局设计 (152x152 像素) ---
+# 所有文本都使用 12x12 BMF 字体
+# ---------------------------------------|
+# | 日期 (左)                  星期 (右)  | (y=5, 12x12)
+# | ------------------------------------ |
+# |            城市名称 (居中)            | (y=19, 12x12)
+# | ------------------------------------ |
+# |             HH:MM (居中,大)           | (y=33, 12x12, 放大2倍)
+# | -------------------------------------| (y=62, 分隔线)
+# | 图标 (左)         温度 (右, 大)       | (y=67, 图标32x32, 温度 12x12 放大2倍)
+# | 天气描述 (12x12)   体感温度 (右, 12x12)| (y=75 / y=89)
+# |                                      |
+# | 湿度 (左, 12x12)     气压 (右, 12x12) | (y=107)
+# | 风速 (左, 12x12)     雨量 (右, 12x12) | (y=121)
+# | 日出 (左, 12x12)     日落 (右, 12x12) | (y=135)
+# ------------------------------------
+
+class WeatherScene():
+    """天气钟画面的小部件，每个小部件只在自己的值改变时重绘"""
+    def __init__(self, epd):
+        self.epd = epd
+        scene = Scene(epd, Color.WHITE)
+        self.scene = scene
+
+        # 获取字体基本尺寸 (12x12)
+        BASE_FONT_SIZE = epd.font_width # This will be 12 if fusion-pixel-12 is loaded
+        LINE_HEIGHT = BASE_FONT_SIZE + 2 # 每行文本的垂直间距，比字体高一点
+
+        # 定义一些常用的 X 坐标
+        LEFT_MARGIN = 5
+        RIGHT_MARGIN = epd.paint.width - 5
+        CENTER_X = epd.paint.width // 2
+
+        # --- 垂直位置计算 ---
+        y_current = 5 # 初始 Y 坐标
+
+        # 1. 日期和星期
+        self.date = scene.add(Label(LEFT_MARGIN, y_current))
+        self.weekday = scene.add(Label(RIGHT_MARGIN, y_current, align=RIGHT))
+        y_current += LINE_HEIGHT
 
-        # 5.4 体感温度 (12x12)，放置在温度下方
-        y_current_weather_info = y_current + (BASE_FONT_SIZE * TEMP_MULTIPLIER) # 从温度下方开始
-        
-        feels_str = f"体感: {feels_like_temp:.1f}°C"
-        feels_str_display_width = epd.get_string_display_width(feels_str)
-        epd.show_string(feels_str, RIGHT_MARGIN - feels_str_display_width, y_current_weather_info - 2, color=Color.BLACK)
-        y_current = y_current_weather_info + LINE_HEIGHT +2
+        # 2. 城市名称
+        self.city = scene.add(Label(CENTER_X, y_current, align=CENTER))
+        y_current += LINE_HEIGHT
 
-        
-        # 5.5 湿度和气压 (12x12)
-        humidity_str = f"湿度: {humidity}%"
-        pressure_str = f"气压: {pressure}hPa"
-        pressure_str_display_width = epd.get_string_display_width(pressure_str)
-        
-        epd.show_string(humidity_str, LEFT_MARGIN, y_current, color=Color.BLACK)
-        epd.show_string(pressure_str, RIGHT_MARGIN - pressure_str_display_width, y_current, color=Color.BLACK)
+        # 3. 时间 (放大2倍 -> 24x24px，加粗)
+        # 时钟每分钟都要重绘，数字和冒号在启动时预渲染成加粗的字形图集，绘制时只需按行写入字节
+        TIME_MULTIPLIER = 2
+        clock_atlas = epd.glyph_atlas("0123456789:", TIME_MULTIPLIER, GlyphStyle.BOLD)
+        self.clock = scene.add(Label(CENTER_X, y_current, align=CENTER, multiplier=TIME_MULTIPLIER, bold=True,
+                                     atlas=clock_atlas))
+        y_current += BASE_FONT_SIZE * TIME_MULTIPLIER + 5 # 加上放大后的高度和额外间距
+
+        # 4. 分隔线
+        scene.add(Line(LEFT_MARGIN, y_current, RIGHT_MARGIN, y_current))
+        y_current += 5 # 分隔线下方留白
+
+        # 5. 天气信息
+        # 5.1 天气图标 (16x16, multiplier=2 -> 32x32)
+        ICON_SIZE = ICON_WIDTH * 2
+        self.icon = scene.add(Bitmap(LEFT_MARGIN, y_current, multiplier=2, width=ICON_WIDTH))
+        # 5.2 天气描述，放置在图标右侧
+        self.desc = scene.add(Label(LEFT_MARGIN + ICON_SIZE + 2, y_current + 8))
+        # 5.3 当前温度 (放大2倍 -> 24x24px)，右对齐
+        TEMP_MULTIPLIER = 2
+        temp_atlas = epd.glyph_atlas("0123456789.-°C", TEMP_MULTIPLIER)
+        self.temp = scene.add(Label(RIGHT_MARGIN, y_current, align=RIGHT, multiplier=TEMP_MULTIPLIER, atlas=temp_atlas))
+        # 5.4 体感温度，放置在温度下方
+        y_current_weather_info = y_current + BASE_FONT_SIZE * TEMP_MULTIPLIER
+        self.feels = scene.add(Label(RIGHT_MARGIN, y_current_weather_info - 2, align=RIGHT))
+
+        # 没有天气数据时的提示，与天气信息互斥显示
+        self.notice = [scene.add(Label(LEFT_MARGIN, y_current + 10 + i * LINE_HEIGHT)) for i in range(3)]
+
+        y_current = y_current_weather_info + LINE_HEIGHT + 2
+        # 5.5 湿度和气压
+        self.humidity = scene.add(Label(LEFT_MARGIN, y_current))
+        self.pressure = scene.add(Label(RIGHT_MARGIN, y_current, align=RIGHT))
+        y_current += LINE_HEIGHT
+        # 5.6 风速和雨量
+        self.wind = scene.add(Label(LEFT_MARGIN, y_current))
+        self.rain = scene.add(Label(RIGHT_MARGIN, y_current, align=RIGHT))
         y_current += LINE_HEIGHT
+        # 5.7 日出和日落
+        self.sunrise = scene.add(Label(LEFT_MARGIN, y_current))
+        self.sunset = scene.add(Label(RIGHT_MARGIN, y_current, align=RIGHT))
 
-        # 5.6 风速和日出/日落 (12x12)
-        wind_str = f"风速: {wind_speed:.1f}m/s"
-        epd.show_string(wind_str, LEFT_MARGIN, y_current, color=Color.BLACK)
+    def update(self, weather_data):
+        # 根据当前时间和天气数据设置各小部件的值，只重绘值改变的部分；返回显示的时间字符串
+        current_time_tuple = time.localtime()
+        year = current_time_tuple[0]
+        month = current_time_tuple[1]
+        day = current_time_tuple[2]
+        hour = current_time_tuple[3]
+        minute = current_time_tuple[4]
+        weekday = current_time_tuple[6]
+
+        weekdays_zh = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+
+        time_str = f"{hour:02d}:{minute:02d}"
+        self.date.set(f"{year}-{month:02d}-{day:02d}")
+        self.weekday.set(weekdays_zh[weekday])
+        self.city.set(weather_data.get('name', "城市 N/A") if weather_data else "城市 N/A")
+        self.clock.set(time_str)
+
+        if weather_data:
+            weather_info = weather_data.get('weather', [{}])[0]
+            weather_main = weather_info.get('main', "few clouds")
+            weather_main_desc = weather_info.get('description', "未知")
+
+            main_data = weather_data.get('main', {})
+            current_temp = main_data.get('temp', 0.0)
+            feels_like_temp = main_data.get('feels_like', 0.0)
+            humidity = main_data.get('humidity', 0)
+            pressure = main_data.get('pressure', 0)
+
+            wind_data = weather_data.get('wind', {})
+            wind_speed = wind_data.get('speed', 0.0)
+
+            sys_data = weather_data.get('sys', {})
+            sunrise_ts = sys_data.get('sunrise', 0)
+            sunset_ts = sys_data.get('sunset', 0)
+
+            rain_1h = weather_data.get('rain', {}).get('1h')
+
+            sunrise_str = "N/A"
+            sunset_str = "N/A"
+            if sunrise_ts > 0:
+                sunrise_local = time.localtime(sunrise_ts + (config.TIMEZONE_OFFSET * 3600))
+                sunrise_str = f"{sunrise_local[3]:02d}:{sunrise_local[4]:02d}"
+            if sunset_ts > 0:
+                sunset_local = time.localtime(sunset_ts + (config.TIMEZONE_OFFSET * 3600))
+                sunset_str = f"{sunset_local[3]:02d}:{sunset_local[4]:02d}"
+
+            self.icon.set(get_weather_icon(weather_main, hour))
+            self.desc.set(weather_main_desc)
+            self.temp.set(f"{current_temp:.1f}°C")
+            self.feels.set(f"体感: {feels_like_temp:.1f}°C")
+            self.humidity.set(f"湿度: {humidity}%")
+            self.pressure.set(f"气压: {pressure}hPa")
+            self.wind.set(f"风速: {wind_speed:.1f}m/s")
+            self.rain.set(f"雨量: {rain_1h:.1f}mm" if rain_1h is not None and rain_1h > 0 else "")
+            self.sunrise.set(f"日出: {sunrise_str}")
+            self.sunset.set(f"日落: {sunset_str}")
+            notice = ("", "", "")
+        else:
+            for widget in (self.desc, self.temp, self.feels, self.humidity, self.pressure,
+                           self.wind, self.rain, self.sunrise, self.sunset):
+                widget.set("")
+            self.icon.set(None)
+            notice = ("天气数据 N/A", "请检查WiFi/API", "或等待刷新")
+        for widget, text in zip(self.notice, notice):
+            widget.set(text)
+
+        self.scene.render()
+        return time_str
+
+_weather_scene = None
+
+def draw_clock_and_weather(epd, weather_data):
+    # 只在缓冲区中绘制画面，返回显示的时间字符串；刷新由调用者决定同步还是异步进行。
+    # 画面由保留的小部件组成，每分钟通常只有时钟需要重绘，脏区域随之缩小到时钟附近
+    global _weather_scene
+    if _weather_scene is None or _weather_scene.epd is not epd:
+        _weather_scene = WeatherScene(epd)
+    return _weather_scene.update(weather_data)
 
-        if rain_1h is not None and rain_1h > 0:
-            rain_str = f"雨量: {rain_1h:.1f}mm"
-            set_str_display_width = epd.get_string_display_width(set_str)
-            epd.show_string(rain_str, RIGHT_MARGIN - set_str_display_width, y_current, color=Color.BLACK)
-        y_current += LINE_HEIGHT
-        
-        rise_str = f"日出: {sunrise_str}"
-        set_str = f"日落: {sunset_str}"
-        set_str_display_width = epd.get_string_display_width(set_str)
-        epd.show_string(rise_str, LEFT_MARGIN, y_current, color=Color.BLACK)
-        epd.show_string(set_str, RIGHT_MARGIN - set_str_display_width, y_current, color=Color.BLACK)
-        
-    else:
-        epd.show_string("天气数据 N/A", LEFT_MARGIN, y_current + 10, color=Color.BLACK)
-        epd.show_string("请检查WiFi/API", LEFT_MARGIN, y_current + 10 + LINE_HEIGHT, color=Color.BLACK)
-        epd.show_string("或等待刷新", LEFT_MARGIN, y_current + 10 + 2 * LINE_HEIGHT, color=Color.BLACK)
-        
-    epd.update()
+def display_clock_and_weather(epd, weather_data):
+    time_str = draw_clock_and_weather(epd, weather_data)
+    # 每分钟使用局刷，驱动会每隔 full_refresh_every 次自动全刷一次消除残影
+    epd.update(partial=True)
     print(f"Display updated at {time_str}")
 
-def main_weather_clock():
+async def main_weather_clock():
     print("Starting desktop weather clock...")
-    epd.init()
+    show_boot_frame(epd)
     last_weather_update_time = 0
     weather_update_interval_sec = 30 * 60
 
@@ -410,10 +450,19 @@ def main_weather_clock():
         last_weather_update_time = time.time()
     else:
         print("WiFi not connected, skipping initial weather and time update.")
+    save_pending = weather_data is not None # 第一帧就带有天气数据，刷新后保存为快照
 
     while True:
+        fetched = False
+        time_str = draw_clock_and_weather(epd, weather_data)
+        # 局刷需要约 1 秒 (全刷约 3 秒)。面板在硬件中自行刷新，不需要 CPU 参与，
+        # 所以画面数据写入控制器、面板开始刷新后就可以进行网络请求。urequests 是阻塞的，
+        # 请求期间事件循环也会停住，重叠的收益来自面板刷新与网络请求同时进行，而不是来自 read_busy_async
+        refresh = asyncio.create_task(epd.update_async(partial=True))
+        while not refresh.done() and not epd.refreshing:
+            await asyncio.sleep(0.01)
+
         current_unix_time = time.time()
-        
         if current_unix_time - last_weather_update_time >= weather_update_interval_sec:
             if not network.WLAN(network.STA_IF).isconnected():
                 print("Wi-Fi disconnected, attempting to reconnect...")
@@ -421,13 +470,26 @@ def main_weather_clock():
                     sync_time()
                 else:
                     print("Could not reconnect to Wi-Fi. Skipping weather update.")
-                    time.sleep(60)
-                    continue
-            
-            weather_data = get_weather_data()
-            last_weather_update_time = current_unix_time
-            
-        display_clock_and_weather(epd, weather_data)
+            if network.WLAN(network.STA_IF).isconnected():
+                weather_data = get_weather_data()
+                last_weather_update_time = current_unix_time
+                fetched = True
+
+        await refresh
+        print(f"Display updated at {time_str}")
+        if fetched:
+            # 新的天气数据不等到下一分钟：当前刷新结束后立即重绘并局刷 (通常只有天气相关的小部件改变)
+            time_str = draw_clock_and_weather(epd, weather_data)
+            await epd.update_async(partial=True)
+            print(f"Weather updated at {time_str}")
+            save_pending = weather_data is not None
+        if save_pending:
+            # 只在天气更新后保存 (约 30 分钟一次)，避免每分钟写闪存
+            try:
+                epd.save_frame(LAST_FRAME_PATH)
+            except OSError as e:
+                print(f"Failed to save last frame: {e}")
+            save_pending = False
         
         current_seconds = time.localtime()[5]
         sleep_seconds = 60 - current_seconds
@@ -435,8 +497,7 @@ def main_weather_clock():
             sleep_seconds = 60
         
         print(f"Sleeping for {sleep_seconds} seconds until next minute...")
-        time.sleep(sleep_seconds)
+        await asyncio.sleep(sleep_seconds)
 
 if __name__ == "__main__":
-    main_weather_clock()
-
+    asyncio.run(main_weather_clock())
@@ -0,0 +1,181 @@
+# widgets.py
+# 保留模式的小部件层：每个小部件记住自己上次绘制的值和占用区域，
+# 值改变时只擦除并重绘这一块，Paint 的脏区域随之累积，交给 epd.update(partial=True) 局刷。
+#
+#     scene = Scene(epd)
+#     clock = scene.add(Label(76, 33, align=CENTER, multiplier=2, bold=True))
+#     clock.set("12:34")
+#     scene.render()            # 只重绘值改变了的小部件
+#     epd.update(partial=True)
+from il0373_cn import Color
+
+LEFT = 0
+CENTER = 1
+RIGHT = 2
+
+_UNDRAWN = object() # 尚未绘制过，任何值都视为改变
+
+class Widget():
+    """
+    小部件的公共状态：当前值、颜色以及上次绘制的值和区域。
+    具体的小部件 (Label、Bitmap、Line、Box) 提供 draw(epd)：在画布上绘制当前值，
+    返回占用的逻辑矩形 (x_start, y_start, x_end, y_end)，没有内容时返回 None。
+    """
+    def __init__(self, value=None, color=Color.BLACK):
+        self.value = value
+        self.color = color
+        self.bounds = None # 上次绘制占用的逻辑矩形 (x_start, y_start, x_end, y_end)，None 表示没有内容
+        self._drawn = _UNDRAWN
+
+    def set(self, value):
+        self.value = value
+
+    def changed(self):
+        return self._drawn is _UNDRAWN or self.value != self._drawn
+
+class Label(Widget):
+    """
+    一行文本。x 为对齐基准：LEFT 为左边缘，CENTER 为中心，RIGHT 为右边缘 (字符宽度按字形实际宽度计算，
+    文本改变后位置会随宽度变化)。bold 时按 (0,0) (1,0) (0,1) (1,1) 偏移绘制四次加粗。
+    给出 atlas (GlyphAtlas) 时用预渲染的字形绘制，倍数和样式由图集决定，忽略 multiplier 和 bold。
+    """
+    def __init__(self, x, y, text="", align=LEFT, multiplier=1, bold=False, color=Color.BLACK, atlas=None):
+        super().__init__(text, color)
+        self.x = x
+        self.y = y
+        self.align = align
+        self.multiplier = multiplier
+        self.bold = bold
+        self.atlas = atlas
+
+    def draw(self, epd):
+        text = self.value
+        if not text:
+            return None
+        atlas = self.atlas
+        if atlas is not None:
+            width = atlas.text_width(text)
+        else:
+            width = epd.get_string_display_width(text, multiplier=self.multiplier)
+        x = self.x
+        if self.align == CENTER:
+            x -= width // 2
+        elif self.align == RIGHT:
+            x -= width
+        y = self.y
+        if atlas is not None:
+            epd.show_glyphs(atlas, text, x, y, color=self.color)
+            return atlas.bounds(text, x, y)
+        epd.show_string(text, x, y, multiplier=self.multiplier, color=self.color)
+        extra = 0
+        if self.bold:
+            epd.show_string(text, x, y + 1, multiplier=self.multiplier, color=self.color)
+            epd.show_string(text, x + 1, y, multiplier=self.multiplier, color=self.color)
+            epd.show_string(text, x + 1, y + 1, multiplier=self.multiplier, color=self.color)
+            extra = 1
+        return (x, y, x + width - 1 + extra, y + epd.font_height * self.multiplier - 1 + extra)
+
+class Bitmap(Widget):
+    # 位图，值为位图对象本身；None 表示不显示。给出 width 时值为按行打包的 1bpp 数据，否则为 0/1 二维列表
+    def __init__(self, x, y, bitmap=None, multiplier=1, color=Color.BLACK, width=None):
+        super().__init__(bitmap, color)
+        self.x = x
+        self.y = y
+        self.multiplier = multiplier
+        self.width = width
+
+    def changed(self):
+        # 位图按对象比较，避免逐行比较列表内容
+        return self._drawn is _UNDRAWN or self.value is not self._drawn
+
+    def draw(self, epd):
+        bitmap = self.value
+        if not bitmap:
+            return None
+        epd.show_bitmap(bitmap, self.x, self.y, multiplier=self.multiplier, color=self.color, width=self.width)
+        if self.width is None:
+            width = max(len(row) for row in bitmap)
+            height = len(bitmap)
+        else:
+            width = self.width
+            height = len(bitmap) // ((width + 7) // 8)
+        return (self.x, self.y, self.x + width * self.multiplier - 1, self.y + height * self.multiplier - 1)
+
+class Line(Widget):
+    # 直线，值为是否显示
+    def __init__(self, x_start, y_start, x_end, y_end, color=Color.BLACK):
+        super().__init__(True, color)
+        self.coords = (x_start, y_start, x_end, y_end)
+
+    def draw(self, epd):
+        if not self.value:
+            return None
+        x_start, y_start, x_end, y_end = self.coords
+        epd.draw_line(x_start, y_start, x_end, y_end, self.color)
+        return (min(x_start, x_end), min(y_start, y_end), max(x_start, x_end), max(y_start, y_end))
+
+class Box(Widget):
+    # 矩形框或实心矩形，值为是否显示
+    def __init__(self, x_start, y_start, x_end, y_end, filled=False, color=Color.BLACK):
+        super().__init__(True, color)
+        self.coords = (x_start, y_start, x_end, y_end)
+        self.filled = filled
+
+    def draw(self, epd):
+        if not self.value:
+            return None
+        x_start, y_start, x_end, y_end = self.coords
+        epd.draw_rectangle(x_start, y_start, x_end, y_end, self.color, filled=self.filled)
+        return (min(x_start, x_end), min(y_start, y_end), max(x_start, x_end), max(y_start, y_end))
+
+def _overlaps(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+class Scene():
+    """
+    一组小部件。第一次 render() (或 invalidate() 之后) 清屏并绘制全部小部件，
+    之后只擦除并重绘值改变了的小部件；被擦除区域压到的其他小部件也会重绘。
+    """
+    def __init__(self, epd, bg_color=Color.WHITE):
+        self.epd = epd
+        self.bg_color = bg_color
+        self.widgets = []
+        self._full = True
+
+    def add(self, widget):
+        self.widgets.append(widget)
+        return widget
+
+    def invalidate(self):
+        # 画布被其他代码改写过 (例如显示了启动画面) 时调用，下一次 render() 重绘整个场景
+        self._full = True
+
+    def render(self):
+        """重绘需要更新的小部件，返回重绘的数量；脏区域由 Paint 自动记录"""
+        epd = self.epd
+        if self._full:
+            self._full = False
+            epd.clear(self.bg_color)
+            redraw = list(self.widgets)
+        else:
+            redraw = [widget for widget in self.widgets if widget.changed()]
+            if not redraw:
+                return 0
+            # 先擦除旧内容，再找出被擦除区域压到的未改变小部件
+            cleared = []
+            for widget in redraw:
+                if widget.bounds is not None:
+                    x_start, y_start, x_end, y_end = widget.bounds
+                    epd.draw_rectangle(x_start, y_start, x_end, y_end, self.bg_color, filled=True)
+                    cleared.append(widget.bounds)
+            for widget in self.widgets:
+                if widget not in redraw and widget.bounds is not None:
+                    for rect in cleared:
+                        if _overlaps(widget.bounds, rect):
+                            redraw.append(widget)
+                            break
+
+        for widget in redraw:
+            widget.bounds = widget.draw(epd)
+            widget._drawn = widget.value
+        return len(redraw)